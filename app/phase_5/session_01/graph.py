@@ -56,8 +56,8 @@ class IdeaExpansion:
         self.graph_builder.add_edge("PROBLEM_DOCUMENT", END)
     
 
-    def compile(self):
-        checkpointer = InMemorySaver()
+    def compile(self, checkpointer: Any = None):
+        checkpointer = checkpointer or InMemorySaver()
         return self.graph_builder.compile(checkpointer=checkpointer)
     
 
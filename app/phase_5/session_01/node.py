@@ -4,6 +4,7 @@ import re, yaml, json
 
 from app import ColoredLogger, Model, load_file, log_error
 from app.phase_5.session_01 import STEP_PATH, State, ResponseType
+from utils.model_streaming import StreamingNodeMixin
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import (
@@ -23,7 +24,7 @@ def count_tokens(text: str) -> int:
 
 
 
-class BaseNode:
+class BaseNode(StreamingNodeMixin):
     """Base class containing common methods for all node classes."""
     
     def __init__(self, 
@@ -160,7 +161,7 @@ class ProductRequirement(BaseNode):
         try:
             self._log_section_header("Problem Analysis")
 
-            response = self.model_chain.invoke(
+            response = self._stream_model_response(
                 self.prompt + state["messages"]
             )
             self.node_logger.debug(response.tool_calls)
@@ -212,7 +213,7 @@ class ProblemDocument(BaseNode):
         try:
             self._log_section_header("Problem Doc Generator")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "conversation": state["messages"]
             })
             self.node_logger.debug(response.content)
@@ -67,8 +67,8 @@ class IdeaExpansion:
         self.graph_builder.add_edge("tool_node_1", "USER_STORY_DOC")
     
 
-    def compile(self):
-        checkpointer = InMemorySaver()
+    def compile(self, checkpointer: Any = None):
+        checkpointer = checkpointer or InMemorySaver()
         return self.graph_builder.compile(checkpointer=checkpointer)
     
 
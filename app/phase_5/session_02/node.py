@@ -4,6 +4,7 @@ import re, yaml, json
 
 from app import ColoredLogger, Model, load_file, log_error
 from app.phase_5.session_02 import STEP_PATH, State, ResponseType
+from utils.model_streaming import StreamingNodeMixin
 from utils.file_management import load_yaml
 
 from langchain_core.prompts import PromptTemplate
@@ -23,7 +24,7 @@ def count_tokens(text: str) -> int:
 
 
 
-class BaseNode:
+class BaseNode(StreamingNodeMixin):
     """Base class containing common methods for all node classes."""
     
     def __init__(self, 
@@ -153,7 +154,7 @@ class UserStoryRequirement(BaseNode):
 
             self._log_section_header("User Story Analysis")
 
-            response = self.model_chain.invoke(
+            response = self._stream_model_response(
                 self.prompt + state["messages"]
             )
             self.node_logger.debug(f"Reason: {response.response_metadata}")
@@ -210,7 +211,7 @@ class UserStoryDocument(BaseNode):
         try:
             self._log_section_header("User Story Doc Generator")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "conversation": state["messages"]
             })
             self.node_logger.debug(response.content)
@@ -82,8 +82,8 @@ class IdeaExpansion:
     
 
 
-    def compile(self):
-        checkpointer = InMemorySaver()
+    def compile(self, checkpointer: Any = None):
+        checkpointer = checkpointer or InMemorySaver()
         return self.graph_builder.compile(checkpointer=checkpointer)
     
 
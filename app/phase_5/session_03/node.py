@@ -4,6 +4,7 @@ import re, yaml, json
 
 from app import ColoredLogger, Model, load_file, log_error
 from app.phase_5.session_03 import STEP_PATH, State, ResponseType
+from utils.model_streaming import StreamingNodeMixin
 from utils.file_management import load_yaml, save_json
 
 from langchain_core.tools import tool
@@ -27,7 +28,7 @@ def count_tokens(text: str) -> int:
 
 
 
-class BaseNode:
+class BaseNode(StreamingNodeMixin):
     """Base class containing common methods for all node classes."""
     
     def __init__(self, 
@@ -182,7 +183,7 @@ class SystemRequirement(BaseNode):
             self._save_state_message(state=state)
             self._log_section_header("User Story Analysis")
 
-            response = self.model_chain.invoke(
+            response = self._stream_model_response(
                 self.prompt + state["messages"]
             )
             self.node_logger.debug(response.tool_calls)
@@ -255,7 +256,7 @@ class SystemDocument(BaseNode):
             self._save_state_message(state=state)
             self._log_section_header("User Story Doc Generator")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "user_ids": state["us_ids"],
                 "conversation": state["messages"],
                 "fr_index": state["total_frs"],
@@ -90,8 +90,8 @@ class IdeaExpansion:
     #     self.graph_builder.add_edge("test_diagram_3", END)
 
 
-    def compile(self):
-        checkpointer = InMemorySaver()
+    def compile(self, checkpointer: Any = None):
+        checkpointer = checkpointer or InMemorySaver()
         return self.graph_builder.compile(checkpointer=checkpointer)
     
 
@@ -4,6 +4,7 @@ import re, yaml, json
 
 from app import ColoredLogger, Model, load_file, log_error
 from app.phase_5.session_04 import STEP_PATH, State, ResponseType
+from utils.model_streaming import StreamingNodeMixin
 from utils.file_management import load_yaml, load_md
 
 from langchain_core.prompts import PromptTemplate
@@ -25,7 +26,7 @@ def count_tokens(text: str) -> int:
 
 
 
-class BaseNode:
+class BaseNode(StreamingNodeMixin):
     """Base class containing common methods for all node classes."""
     
     def __init__(self, 
@@ -157,7 +158,7 @@ class ArchitectureStep1(BaseNode):
 
             self._log_section_header("Architecture Part 1")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_solution":self.goal,
                 "user_stories":self.user_story,
                 "func_non_func_requirements":self.func_nonfunc
@@ -250,7 +251,7 @@ class ArchitectureStep21(BaseNode):
 
             self._log_section_header("Architecture Part 1")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_solution":self.goal,
                 "user_stories":self.user_story,
                 "func_non_func_requirements":self.func_nonfunc,
@@ -345,7 +346,7 @@ class ArchitectureStep22(BaseNode):
 
             self._log_section_header("Architecture Part 1")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_solution":self.goal,
                 "user_stories":self.user_story,
                 "func_non_func_requirements":self.func_nonfunc,
@@ -442,7 +443,7 @@ class ArchitectureStep23(BaseNode):
 
             self._log_section_header("Architecture Part 1")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_solution":self.goal,
                 "user_stories":self.user_story,
                 "func_non_func_requirements":self.func_nonfunc,
@@ -539,7 +540,7 @@ class ArchitectureStep24(BaseNode):
 
             self._log_section_header("Architecture Part 1")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_solution":self.goal,
                 "user_stories":self.user_story,
                 "func_non_func_requirements":self.func_nonfunc,
@@ -4,6 +4,7 @@ import re, yaml, json
 
 from app import ColoredLogger, Model, load_file, log_error
 from app.phase_5.session_05 import STEP_PATH, State, ResponseType
+from utils.model_streaming import StreamingNodeMixin
 from utils.file_management import load_yaml, load_md
 
 from langchain_core.prompts import PromptTemplate
@@ -27,7 +28,7 @@ def count_tokens(text: str) -> int:
 
 
 
-class BaseNode:
+class BaseNode(StreamingNodeMixin):
     """Base class containing common methods for all node classes."""
     
     def __init__(self, 
@@ -171,7 +172,7 @@ class TechnologyStackConvo(BaseNode):
             
             self._log_section_header("User Story Analysis")
 
-            response = self.model_chain.invoke(
+            response = self._stream_model_response(
                 self.prompt + state["messages"]
             )
             self.node_logger.debug(response.tool_calls)
@@ -269,7 +270,7 @@ class TechnologyStackDocument(BaseNode):
         try:
             self._log_section_header("User Story Doc Generator")
 
-            response = self.model_chain.invoke({
+            response = self._stream_model_response({
                 "problem_statement": self._simplified_problem_sol("app/docs/problem.yaml"),
                 "conversation": state["messages"],
                 "func_nonfunc_reqr": self.func_non_func_data,
@@ -0,0 +1,85 @@
+"""Broadcast throughput across bus backends.
+
+Run with `python -m benchmarks.broadcast_bus`. The Redis run is skipped unless
+REDIS_URL points at a reachable server and the `redis` package is installed.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from services.core.config import settings
+from services.websockets.bus import BroadcastBus, InProcessBus, LocalBroker, LocalBrokerBus, RedisBus
+from services.websockets.manager import ConnectionManager
+
+
+class _CountingSocket:
+    client_state = None
+
+    def __init__(self) -> None:
+        self.received = 0
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, payload: str) -> None:
+        self.received += 1
+
+    async def close(self) -> None:
+        return None
+
+
+async def _run(name: str, buses: list[BroadcastBus], frames: int, sockets_per_worker: int) -> None:
+    from starlette.websockets import WebSocketState
+
+    _CountingSocket.client_state = WebSocketState.CONNECTED
+    managers = [ConnectionManager(max_queue_size=frames + 1, bus=bus) for bus in buses]
+    sockets: list[_CountingSocket] = []
+    for manager in managers:
+        for _ in range(sockets_per_worker):
+            socket = _CountingSocket()
+            sockets.append(socket)
+            await manager.connect("bench", socket)
+
+    payload = json.dumps({"resp_type": "ai_response", "content": "x" * 256})
+    expected = frames * len(sockets)
+    started = time.perf_counter()
+    for _ in range(frames):
+        await managers[0].broadcast("bench", payload)
+    while sum(socket.received for socket in sockets) < expected:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<14} workers={len(managers)} sockets={len(sockets)} frames={frames} "
+        f"elapsed={elapsed:.3f}s publish_rate={frames / elapsed:,.0f}/s delivery_rate={expected / elapsed:,.0f}/s"
+    )
+    for manager in managers:
+        for socket in list(manager._rooms.get("bench", {})):
+            manager.disconnect("bench", socket)
+        await manager.close()
+
+
+async def _main(frames: int, sockets_per_worker: int, workers: int) -> None:
+    await _run("in-process", [InProcessBus()], frames, sockets_per_worker * workers)
+
+    broker = LocalBroker()
+    await _run("local-broker", [LocalBrokerBus(broker) for _ in range(workers)], frames, sockets_per_worker)
+
+    try:
+        buses = [RedisBus(settings.REDIS_URL, settings.WS_BROADCAST_CHANNEL_PREFIX) for _ in range(workers)]
+        await buses[0]._client.ping()
+    except Exception as exc:
+        print(f"{'redis':<14} skipped ({exc.__class__.__name__}: {exc})")
+        return
+    await _run("redis", buses, frames, sockets_per_worker)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--sockets", type=int, default=10, help="sockets per worker")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(_main(args.frames, args.sockets, args.workers))
@@ -0,0 +1,54 @@
+"""Document tree listing: per-object version listing vs one versioned listing.
+
+Run with `python -m benchmarks.document_tree`. Uses an in-memory MinIO stub that
+sleeps `--latency` seconds per round trip to stand in for network cost.
+"""
+
+import argparse
+import time
+
+from services.api.sessions.services import _documents_from_prefix
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+
+
+BUCKET = "user-1"
+PREFIX = "ws/proj/"
+
+
+def _per_object_listing(minio: MinioService, bucket: str, prefix: str) -> int:
+    """The previous access pattern: list keys, then list versions and sign a URL for each key."""
+    documents = 0
+    for obj in minio.list_objects(bucket=bucket, prefix=prefix, recursive=True):
+        versions = minio.list_object_versions(bucket, obj["object_name"])
+        version_id = versions[0]["version_id"] if versions else None
+        minio.presigned_download_url(bucket, obj["object_name"], version_id=version_id)
+        documents += 1
+    return documents
+
+
+def _build_client(documents: int, versions: int, latency: float) -> StubMinioClient:
+    client = StubMinioClient(latency=latency)
+    for doc in range(documents):
+        key = f"{PREFIX}phase-a/session-{doc % 5}/documents/doc-{doc}.md"
+        for version in range(versions):
+            client.add_version(BUCKET, key, f"v{doc}-{version}")
+    return client
+
+
+def _measure(name: str, client: StubMinioClient, run) -> None:
+    started = time.perf_counter()
+    run(MinioService(client), BUCKET, PREFIX)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} elapsed={elapsed * 1000:8.1f}ms list_calls={client.calls.get('list_objects', 0)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=300)
+    parser.add_argument("--versions", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds per simulated round trip")
+    args = parser.parse_args()
+
+    _measure("per-object listing", _build_client(args.documents, args.versions, args.latency), _per_object_listing)
+    _measure("single versioned pass", _build_client(args.documents, args.versions, args.latency), _documents_from_prefix)
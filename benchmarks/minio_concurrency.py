@@ -0,0 +1,66 @@
+"""Concurrent document fetches through AsyncMinioService.
+
+Run with `python -m benchmarks.minio_concurrency`. Uses the configured MinIO when
+`--live BUCKET` is given (objects are read from that bucket); otherwise an
+in-memory stub that sleeps `--latency` seconds per request.
+"""
+
+import argparse
+import asyncio
+import time
+
+from services.core.minio import AsyncMinioService, MinioService
+from tests.minio_stub import StubMinioClient
+
+
+BUCKET = "user-bench"
+
+
+def _stub_service(documents: int, latency: float) -> tuple[MinioService, str, list[str]]:
+    client = StubMinioClient(latency=latency)
+    keys = [f"bench/documents/doc-{index}.md" for index in range(documents)]
+    for key in keys:
+        client.add_version(BUCKET, key, f"{key}@1", payload=b"x" * 4096)
+    return MinioService(client), BUCKET, keys
+
+
+def _live_service(bucket: str, documents: int) -> tuple[MinioService, str, list[str]]:
+    service = MinioService.from_settings()
+    keys = [item["object_name"] for item in service.list_objects(bucket=bucket, prefix="")][:documents]
+    if not keys:
+        raise SystemExit(f"No objects found in bucket '{bucket}'")
+    return service, bucket, keys
+
+
+async def _run(service: MinioService, bucket: str, keys: list[str], concurrency: int, requests: int) -> None:
+    minio = AsyncMinioService(service, max_workers=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(index: int) -> int:
+        async with semaphore:
+            return len(await minio.get_object_bytes(bucket, keys[index % len(keys)]))
+
+    started = time.perf_counter()
+    sizes = await asyncio.gather(*(_fetch(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"concurrency={concurrency:<4} requests={requests} elapsed={elapsed:6.2f}s "
+        f"throughput={requests / elapsed:8.1f} req/s bytes={sum(sizes)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--documents", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.01, help="stub seconds per request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--live", metavar="BUCKET", help="read from this bucket on the configured MinIO")
+    args = parser.parse_args()
+
+    if args.live:
+        service, bucket, keys = _live_service(args.live, args.documents)
+    else:
+        service, bucket, keys = _stub_service(args.documents, args.latency)
+    for level in args.concurrency:
+        asyncio.run(_run(service, bucket, keys, level, args.requests))
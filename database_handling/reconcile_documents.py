@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Backfill the document index tables from the versioned objects in every user bucket."""
+
+import argparse
+
+from services.api.sessions.services import reconcile_document_index
+from services.core.database import SessionLocal, init_db
+from services.core.minio import MinioService
+
+
+def reconcile_documents(buckets: list[str] | None = None) -> dict[str, int]:
+    init_db()
+    minio = MinioService.from_settings()
+    results: dict[str, int] = {}
+    db = SessionLocal()
+    try:
+        for bucket in buckets or minio.list_user_buckets():
+            results[bucket] = reconcile_document_index(db, minio, bucket)
+    finally:
+        db.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("buckets", nargs="*", help="buckets to reconcile (default: every user bucket)")
+    args = parser.parse_args()
+
+    for bucket, indexed in reconcile_documents(args.buckets).items():
+        print(f"{bucket}: {indexed} documents indexed")
@@ -7,6 +7,7 @@ from services.core.database import Base, engine
 from services.api.projects import model as _project_models  # noqa: F401
 from services.api.sessions import model as _session_models  # noqa: F401
 from services.api.users import model as _user_models  # noqa: F401
+from services.core import checkpointer as _checkpointer_models  # noqa: F401
 
 
 def reset_database() -> None:
@@ -145,7 +145,7 @@ def create_workspace_project(
     project = create_project(db, project)
     from services.api.sessions.services import initialize_project_workflow
 
-    initialize_project_workflow(db, project.id, current_user.id)
+    initialize_project_workflow(db, project, current_user.id)
     return _project_to_response(project)
 
 
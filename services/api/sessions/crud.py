@@ -1,7 +1,19 @@
+import json
+from datetime import datetime
+from typing import Any
+
 from sqlalchemy import desc, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, undefer
 
-from services.api.sessions.model import ProjectPhaseState, ProjectSessionVersion
+from services.api.sessions.model import (
+    ConversationMessage,
+    ProjectDocument,
+    ProjectDocumentVersion,
+    ProjectPhaseState,
+    ProjectSessionVersion,
+    SessionOutputEntry,
+    SessionOutputSnapshot,
+)
 
 
 def get_phase_state(db: Session, project_id: str, phase_id: str) -> ProjectPhaseState | None:
@@ -54,8 +66,37 @@ def list_phase_states(db: Session, project_id: str) -> list[ProjectPhaseState]:
     return list(db.execute(stmt).scalars().all())
 
 
-def list_session_versions(db: Session, project_id: str) -> list[ProjectSessionVersion]:
-    stmt = select(ProjectSessionVersion).where(ProjectSessionVersion.project_id == project_id)
+def list_session_keys(db: Session, project_id: str) -> set[tuple[str, str]]:
+    stmt = (
+        select(ProjectSessionVersion.phase_id, ProjectSessionVersion.session_id)
+        .where(ProjectSessionVersion.project_id == project_id)
+        .distinct()
+    )
+    return {(row.phase_id, row.session_id) for row in db.execute(stmt)}
+
+
+def list_latest_session_versions(db: Session, project_id: str) -> list[ProjectSessionVersion]:
+    """Return only the newest version of each (phase_id, session_id); `output` stays deferred."""
+    latest = (
+        select(
+            ProjectSessionVersion.phase_id,
+            ProjectSessionVersion.session_id,
+            func.max(ProjectSessionVersion.version).label("version"),
+        )
+        .where(ProjectSessionVersion.project_id == project_id)
+        .group_by(ProjectSessionVersion.phase_id, ProjectSessionVersion.session_id)
+        .subquery()
+    )
+    stmt = (
+        select(ProjectSessionVersion)
+        .join(
+            latest,
+            (ProjectSessionVersion.phase_id == latest.c.phase_id)
+            & (ProjectSessionVersion.session_id == latest.c.session_id)
+            & (ProjectSessionVersion.version == latest.c.version),
+        )
+        .where(ProjectSessionVersion.project_id == project_id)
+    )
     return list(db.execute(stmt).scalars().all())
 
 
@@ -64,6 +105,7 @@ def list_session_versions_for_session(
     project_id: str,
     phase_id: str,
     session_id: str,
+    include_output: bool = False,
 ) -> list[ProjectSessionVersion]:
     stmt = (
         select(ProjectSessionVersion)
@@ -72,6 +114,186 @@ def list_session_versions_for_session(
             ProjectSessionVersion.phase_id == phase_id,
             ProjectSessionVersion.session_id == session_id,
         )
+        .options(selectinload(ProjectSessionVersion.approved_by))
         .order_by(desc(ProjectSessionVersion.version))
     )
+    if include_output:
+        stmt = stmt.options(undefer(ProjectSessionVersion.output))
+    return list(db.execute(stmt).scalars().all())
+
+
+def list_conversation_messages(
+    db: Session,
+    conversation_id: str,
+    before_seq: int | None = None,
+    limit: int | None = None,
+) -> list[ConversationMessage]:
+    """Return messages in conversation order, optionally the page of `limit` rows before `before_seq`."""
+    # Rows numbered below 1 were never linked into the conversation (see init_db) and stay hidden.
+    stmt = select(ConversationMessage).where(
+        ConversationMessage.conversation_id == conversation_id,
+        ConversationMessage.seq > 0,
+    )
+    if before_seq is not None:
+        stmt = stmt.where(ConversationMessage.seq < before_seq)
+    if limit is None:
+        return list(db.execute(stmt.order_by(ConversationMessage.seq)).scalars().all())
+
+    rows = list(db.execute(stmt.order_by(desc(ConversationMessage.seq)).limit(limit)).scalars().all())
+    rows.reverse()
+    return rows
+
+
+OUTPUT_ENTRY_KEY_LENGTH = 255
+
+
+def pointer_segment(key: Any) -> str:
+    """Escape one JSON-pointer reference token (RFC 6901)."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _pointer_tokens(pointer: str) -> list[str]:
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]]
+
+
+def split_session_output(payload: dict[str, Any], depth: int) -> dict[str, Any]:
+    """Flatten structured output into JSON-pointer entries, descending into objects down to `depth` levels.
+
+    Lists, scalars, empty objects and objects whose child pointers would not fit the key column stay whole.
+    """
+    entries: dict[str, Any] = {}
+
+    def _walk(pointer: str, value: Any, level: int) -> None:
+        if isinstance(value, dict) and value and level < depth:
+            children = {f"{pointer}/{pointer_segment(key)}": child for key, child in value.items()}
+            if all(len(child_pointer) <= OUTPUT_ENTRY_KEY_LENGTH for child_pointer in children):
+                for child_pointer, child in children.items():
+                    _walk(child_pointer, child, level + 1)
+                return
+        entries[pointer] = value
+
+    for key, value in payload.items():
+        _walk(f"/{pointer_segment(key)}", value, 1)
+    return entries
+
+
+def merge_session_output(output: str | None, entries: dict[str, Any]) -> str | None:
+    """Overlay JSON-pointer entries on the base `output` text, which is wrapped as {"output": ...} if not a JSON object.
+
+    Entries replace the whole top-level key they belong to, so stale values in `output` never leak through.
+    """
+    if not entries:
+        return output
+    merged: dict[str, Any] = {}
+    if output:
+        try:
+            parsed = json.loads(output)
+            merged = parsed if isinstance(parsed, dict) else {"output": parsed}
+        except json.JSONDecodeError:
+            merged = {"output": output}
+    paths = [(_pointer_tokens(pointer), value) for pointer, value in entries.items()]
+    for tokens, _ in paths:
+        merged.pop(tokens[0], None)
+    for tokens, value in paths:
+        target = merged
+        for token in tokens[:-1]:
+            child = target.get(token)
+            if not isinstance(child, dict):
+                child = target[token] = {}
+            target = child
+        target[tokens[-1]] = value
+    return json.dumps(merged, ensure_ascii=False)
+
+
+def get_session_output_entries(db: Session, session_version_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Return each session's output entries keyed by JSON pointer, in document order."""
+    if not session_version_ids:
+        return {}
+    stmt = (
+        select(SessionOutputEntry.session_version_id, SessionOutputEntry.key, SessionOutputEntry.value)
+        .where(SessionOutputEntry.session_version_id.in_(session_version_ids))
+        .order_by(SessionOutputEntry.position, SessionOutputEntry.key)
+    )
+    entries: dict[str, dict[str, Any]] = {}
+    for row in db.execute(stmt):
+        entries.setdefault(row.session_version_id, {})[row.key] = json.loads(row.value)
+    return entries
+
+
+def get_session_output_snapshot(db: Session, session_version_id: str, revision: int) -> SessionOutputSnapshot | None:
+    """Return the newest snapshot taken at or before `revision`."""
+    stmt = (
+        select(SessionOutputSnapshot)
+        .where(SessionOutputSnapshot.session_version_id == session_version_id, SessionOutputSnapshot.revision <= revision)
+        .order_by(desc(SessionOutputSnapshot.revision))
+        .limit(1)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def get_document_by_key(db: Session, bucket: str, object_key: str) -> ProjectDocument | None:
+    stmt = select(ProjectDocument).where(ProjectDocument.bucket == bucket, ProjectDocument.object_key == object_key)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def add_document_version(
+    db: Session,
+    *,
+    bucket: str,
+    object_key: str,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    filename: str,
+    version_id: str | None,
+    size: int | None,
+    last_modified: datetime,
+    created_by_user_id: int | None,
+    content_sha256: str | None = None,
+) -> ProjectDocument:
+    document = get_document_by_key(db, bucket, object_key)
+    if document is None:
+        document = ProjectDocument(
+            bucket=bucket,
+            object_key=object_key,
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            filename=filename,
+            current_version=0,
+        )
+        db.add(document)
+
+    document.current_version += 1
+    document.current_version_id = version_id
+    document.current_sha256 = content_sha256
+    document.last_modified = last_modified
+    db.add(
+        ProjectDocumentVersion(
+            document=document,
+            version=document.current_version,
+            version_id=version_id,
+            size=size,
+            content_sha256=content_sha256,
+            last_modified=last_modified,
+            created_by_user_id=created_by_user_id,
+        )
+    )
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+def list_documents(
+    db: Session,
+    bucket: str,
+    project_id: str,
+    phase_id: str | None = None,
+    session_id: str | None = None,
+) -> list[ProjectDocument]:
+    stmt = select(ProjectDocument).where(ProjectDocument.project_id == project_id, ProjectDocument.bucket == bucket)
+    if phase_id is not None:
+        stmt = stmt.where(ProjectDocument.phase_id == phase_id)
+    if session_id is not None:
+        stmt = stmt.where(ProjectDocument.session_id == session_id)
     return list(db.execute(stmt).scalars().all())
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from services.core.database import Base
@@ -46,7 +46,12 @@ class ProjectSessionVersion(Base):
         ForeignKey("conversation_messages.id", ondelete="SET NULL"),
         nullable=True,
     )
-    output: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Deferred: metadata queries (status, ownership checks) never pull the document body.
+    output: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+    # Set instead of `output` when the body exceeds SESSION_OUTPUT_OFFLOAD_BYTES and lives in MinIO.
+    output_bucket: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    output_object_key: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     approval_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
     remark: Mapped[str | None] = mapped_column(Text, nullable=True)
     approved_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -67,9 +72,11 @@ class ProjectSessionVersion(Base):
 
 class ConversationMessage(Base):
     __tablename__ = "conversation_messages"
+    __table_args__ = (UniqueConstraint("conversation_id", "seq", name="uq_conversation_message_seq"),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     conversation_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
     role: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     previous_message_id: Mapped[str | None] = mapped_column(
@@ -85,3 +92,98 @@ class ConversationMessage(Base):
         index=True,
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+
+
+class SessionOutputEntry(Base):
+    """One JSON-pointer entry of a session's structured output, written independently of the other entries."""
+
+    __tablename__ = "session_output_entries"
+    __table_args__ = (UniqueConstraint("session_version_id", "key", name="uq_session_output_entry_key"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    session_version_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("project_session_versions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    value: Mapped[str] = mapped_column(Text, nullable=False)
+    # Index of the entry in document order, so merged output keeps the producer's key order.
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+
+
+class SessionOutputSnapshot(Base):
+    """Full materialized output of a session at one revision, taken every SESSION_OUTPUT_SNAPSHOT_INTERVAL revisions."""
+
+    __tablename__ = "session_output_snapshots"
+    __table_args__ = (UniqueConstraint("session_version_id", "revision", name="uq_session_output_snapshot_revision"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    session_version_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("project_session_versions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    output: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set instead of `output` when the snapshot exceeds SESSION_OUTPUT_OFFLOAD_BYTES and lives in MinIO.
+    output_bucket: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    output_object_key: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+
+
+class ProjectDocument(Base):
+    """Index row for one document key in object storage; the tree endpoints read these instead of listing MinIO."""
+
+    __tablename__ = "documents"
+    __table_args__ = (
+        UniqueConstraint("bucket", "object_key", name="uq_document_bucket_key"),
+        Index("ix_documents_project_phase_session", "project_id", "phase_id", "session_id"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    bucket: Mapped[str] = mapped_column(String(120), nullable=False)
+    object_key: Mapped[str] = mapped_column(String(1024), nullable=False)
+    project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    phase_id: Mapped[str] = mapped_column(String(120), nullable=False)
+    session_id: Mapped[str] = mapped_column(String(120), nullable=False)
+    filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    current_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    current_version_id: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    current_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_modified: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+    versions: Mapped[list["ProjectDocumentVersion"]] = relationship(
+        "ProjectDocumentVersion",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        order_by="ProjectDocumentVersion.version",
+    )
+
+
+class ProjectDocumentVersion(Base):
+    __tablename__ = "document_versions"
+    __table_args__ = (UniqueConstraint("document_id", "version", name="uq_document_version"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    document_id: Mapped[str] = mapped_column(String(36), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    version_id: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    etag: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_modified: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_by_user_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    document: Mapped["ProjectDocument"] = relationship("ProjectDocument", back_populates="versions")
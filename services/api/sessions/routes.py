@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from services.api.sessions.schema import (
+    BulkUploadedDocumentsResponse,
     CreateTextDocumentRequest,
+    DocumentDiffResponse,
     FileContentResponse,
     FileVersionsResponse,
     PhaseDocumentsResponse,
@@ -14,6 +17,7 @@ from services.api.sessions.schema import (
     SessionVersionCreateRequest,
     SessionDocumentsResponse,
     SessionVersionHistoryResponse,
+    SessionVersionOutputResponse,
     SessionVersionResponse,
     UploadedDocumentResponse,
 )
@@ -23,20 +27,30 @@ from services.api.sessions.services import (
     create_new_session_version,
     create_text_document,
     get_document_content_by_version,
+    get_document_diff,
     get_document_versions,
     get_phase_documents,
     get_session_documents,
     get_project_document_tree,
     get_project_phase_session_status,
     get_session_version_history,
+    get_session_version_output,
+    open_document_download,
+    open_document_export,
     rename_session_title,
     upload_document_file,
+    upload_document_files,
 )
 from services.api.users.model import User
 from services.core.database import get_db
-from services.core.exceptions import PermissionDeniedError, ResourceNotFoundError
+from services.core.exceptions import (
+    InvalidUploadError,
+    PermissionDeniedError,
+    RangeNotSatisfiableError,
+    ResourceNotFoundError,
+)
 from services.dependencies.auth import get_current_user
-from services.dependencies.minio import get_minio_service
+from services.dependencies.minio import get_async_minio_service, get_minio_service
 
 
 router = APIRouter(prefix="/users", tags=["sessions"])
@@ -80,7 +94,7 @@ def create_document_from_text(
     response_model=UploadedDocumentResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def upload_document(
+def upload_document(
     project_id: str,
     phase_id: str,
     session_id: str,
@@ -89,8 +103,8 @@ async def upload_document(
     db: Session = Depends(get_db),
     minio=Depends(get_minio_service),
 ):
+    # Sync handler: the spooled upload is streamed to MinIO from the threadpool, never read into memory.
     try:
-        content = await file.read()
         return upload_document_file(
             db=db,
             minio=minio,
@@ -98,10 +112,55 @@ async def upload_document(
             phase_id=phase_id,
             session_id=session_id,
             filename=file.filename or "uploaded_file",
-            payload=content,
+            stream=file.file,
             content_type=file.content_type,
             current_user=current_user,
+            size=file.size,
+        )
+    except ResourceNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except PermissionDeniedError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+@router.post(
+    "/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/documents/bulk",
+    response_model=BulkUploadedDocumentsResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def upload_documents_bulk(
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    files: list[UploadFile] = File(...),
+    extract_archives: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+):
+    try:
+        return upload_document_files(
+            db=db,
+            minio=minio,
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            files=[
+                {
+                    "filename": file.filename or "uploaded_file",
+                    "stream": file.file,
+                    "content_type": file.content_type,
+                    "size": file.size,
+                }
+                for file in files
+            ],
+            current_user=current_user,
+            extract_archives=extract_archives,
         )
+    except InvalidUploadError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     except ResourceNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
     except PermissionDeniedError as exc:
@@ -174,6 +233,84 @@ def get_document_content(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
 
+@router.get(
+    "/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/documents/{filename}/diff",
+    response_model=DocumentDiffResponse,
+)
+def get_document_diff_route(
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    filename: str,
+    from_version_id: str,
+    to_version_id: str,
+    context_lines: int = 3,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+):
+    try:
+        return get_document_diff(
+            db=db,
+            minio=minio,
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            filename=filename,
+            from_version_id=from_version_id,
+            to_version_id=to_version_id,
+            current_user=current_user,
+            context_lines=context_lines,
+        )
+    except ResourceNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except PermissionDeniedError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+@router.get("/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/documents/{filename}/versions/{version_id}/download")
+def download_document(
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    filename: str,
+    version_id: str,
+    range_header: str | None = Header(default=None, alias="Range"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+):
+    try:
+        download = open_document_download(
+            db=db,
+            minio=minio,
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            filename=filename,
+            version_id=version_id,
+            current_user=current_user,
+            range_header=range_header,
+        )
+    except ResourceNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except PermissionDeniedError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RangeNotSatisfiableError as exc:
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        download["chunks"],
+        status_code=download["status_code"],
+        media_type=download["media_type"],
+        headers=download["headers"],
+    )
+
+
 @router.get("/projects/{project_id}/documents/tree", response_model=ProjectDocumentTreeResponse)
 def get_project_documents_tree(
     project_id: str,
@@ -191,6 +328,32 @@ def get_project_documents_tree(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
 
+@router.get("/projects/{project_id}/documents/export")
+def export_project_documents(
+    project_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+    async_minio=Depends(get_async_minio_service),
+):
+    try:
+        export = open_document_export(
+            db=db,
+            minio=minio,
+            async_minio=async_minio,
+            project_id=project_id,
+            current_user=current_user,
+        )
+    except ResourceNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except PermissionDeniedError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    return StreamingResponse(export["chunks"], media_type=export["media_type"], headers=export["headers"])
+
+
 @router.get("/projects/{project_id}/phases/{phase_id}/documents", response_model=PhaseDocumentsResponse)
 def get_phase_documents_route(
     project_id: str,
@@ -247,8 +410,10 @@ def get_session_versions_route(
     phase_id: str,
     session_id: str,
     previous_only: bool = True,
+    include_output: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
 ):
     try:
         return get_session_version_history(
@@ -258,11 +423,48 @@ def get_session_versions_route(
             session_id=session_id,
             current_user=current_user,
             previous_only=previous_only,
+            include_output=include_output,
+            minio=minio,
         )
     except ResourceNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
     except PermissionDeniedError as exc:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+@router.get(
+    "/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/versions/{version}/output",
+    response_model=SessionVersionOutputResponse,
+)
+def get_session_version_output_route(
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    version: int,
+    revision: int | None = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+):
+    try:
+        return get_session_version_output(
+            db=db,
+            minio=minio,
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            version=version,
+            current_user=current_user,
+            revision=revision,
+        )
+    except ResourceNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except PermissionDeniedError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
 @router.post(
     "/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/versions",
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -13,6 +14,11 @@ class UploadedDocumentResponse(BaseModel):
     object_key: str
     version_id: str | None
     download_url: str
+    deduplicated: bool = False
+
+
+class BulkUploadedDocumentsResponse(BaseModel):
+    documents: list[UploadedDocumentResponse]
 
 
 class FileVersionResponse(BaseModel):
@@ -34,6 +40,23 @@ class FileContentResponse(BaseModel):
     content: str
 
 
+class DocumentChange(BaseModel):
+    op: str
+    path: str
+    old: Any = None
+    new: Any = None
+
+
+class DocumentDiffResponse(BaseModel):
+    filename: str
+    from_version_id: str
+    to_version_id: str
+    format: str
+    identical: bool
+    unified_diff: str | None = None
+    changes: list[DocumentChange] = Field(default_factory=list)
+
+
 class DocumentNode(BaseModel):
     filename: str
     object_key: str
@@ -101,6 +124,16 @@ class SessionVersionResponse(BaseModel):
     updated_at: datetime
 
 
+class SessionVersionOutputResponse(BaseModel):
+    project_id: str
+    phase_id: str
+    session_id: str
+    version: int
+    conversation_id: str
+    revision: int
+    output: str | None
+
+
 class SessionVersionHistoryResponse(BaseModel):
     project_id: str
     phase_id: str
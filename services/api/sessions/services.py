@@ -1,30 +1,63 @@
 from __future__ import annotations
 
+import asyncio
+import difflib
+import hashlib
+import json
+import mimetypes
+import os
 import re
-from collections import defaultdict
+import tempfile
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from functools import lru_cache
 from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.parse import quote
 from uuid import NAMESPACE_URL, uuid4, uuid5
 
 import yaml
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from services.api.projects.crud import get_project_by_id
+from services.api.projects.model import Project
 from services.api.projects.services import can_access_workspace
 from services.api.sessions.crud import (
+    add_document_version,
+    get_document_by_key,
     get_next_session_version_number,
     get_phase_state,
+    get_session_output_entries,
+    get_session_output_snapshot,
     get_session_version,
     list_session_versions_for_session,
+    list_documents,
     list_phase_states,
-    list_session_versions,
+    list_session_keys,
+    merge_session_output,
+    pointer_segment,
+    list_latest_session_versions,
     save_phase_state,
     save_session_version,
 )
-from services.api.sessions.model import ProjectPhaseState, ProjectSessionVersion
+from services.api.sessions.model import (
+    ProjectDocument,
+    ProjectDocumentVersion,
+    ProjectPhaseState,
+    ProjectSessionVersion,
+    SessionOutputSnapshot,
+)
 from services.api.sessions.schema import (
+    DocumentChange,
+    DocumentDiffResponse,
     DocumentNode,
     FileContentResponse,
     FileVersionsResponse,
@@ -34,6 +67,7 @@ from services.api.sessions.schema import (
     ProjectDocumentTreeResponse,
     ProjectWorkflowStatusResponse,
     SessionVersionHistoryResponse,
+    SessionVersionOutputResponse,
     SessionDocumentsResponse,
     SessionDocumentsNode,
     SessionStatusResponse,
@@ -41,10 +75,21 @@ from services.api.sessions.schema import (
 )
 from services.api.users.model import User
 from services.core.config import settings
-from services.core.exceptions import PermissionDeniedError, ResourceNotFoundError
-from services.core.minio import MinioService
+from services.core.exceptions import (
+    InvalidUploadError,
+    PermissionDeniedError,
+    RangeNotSatisfiableError,
+    ResourceNotFoundError,
+)
+from services.core.minio import AsyncMinioService, MinioService
+from utils.colored_logger import get_logger
 
 
+logger = get_logger("Session >> Services")
+
+DOCUMENT_TREE_SOURCES = {"index", "storage"}
+ARCHIVE_SPOOL_MAX_MEMORY = 1024 * 1024
+STRUCTURED_DIFF_SUFFIXES = (".yaml", ".yml")
 PHASES_YAML_PATH = Path(__file__).resolve().parents[3] / "phases_and_sessions.yaml"
 
 
@@ -75,6 +120,12 @@ def load_phase_session_config() -> dict[str, list[dict[str, str]]]:
     return normalized
 
 
+@lru_cache(maxsize=1)
+def workflow_config_hash() -> str:
+    config = load_phase_session_config()
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
 def _assert_project_access(db: Session, project_id: str, current_user: User):
     project = get_project_by_id(db, project_id)
     if project is None:
@@ -96,21 +147,51 @@ def _session_uuid(project_id: str, phase_key: str, session_key: str) -> str:
     return str(uuid5(NAMESPACE_URL, f"{project_id}:phase:{phase_key}:session:{session_key}"))
 
 
+class PhaseSessionIndex:
+    """Forward and reverse lookups between config keys and the derived phase/session ids of one project."""
+
+    def __init__(self, project_id: str, config: dict[str, list[dict[str, str]]]) -> None:
+        self.project_id = project_id
+        self.phase_ids: dict[str, str] = {}
+        self.session_ids: dict[tuple[str, str], str] = {}
+        self.phases: dict[str, dict[str, str | int]] = {}
+        self.sessions: dict[str, dict[str, str | int]] = {}
+
+        for phase_index, (phase_key, sessions) in enumerate(config.items(), start=1):
+            phase_id = _phase_uuid(project_id, phase_key)
+            self.phase_ids[phase_key] = phase_id
+            self.phases[phase_id] = {"phase_key": phase_key, "phase_index": phase_index}
+            for session_index, session in enumerate(sessions, start=1):
+                session_key = session["session_id"]
+                session_id = _session_uuid(project_id, phase_key, session_key)
+                self.session_ids[(phase_key, session_key)] = session_id
+                self.sessions[session_id] = {
+                    "phase_id": phase_id,
+                    "phase_key": phase_key,
+                    "session_key": session_key,
+                    "session_title": session["session_title"],
+                    "session_index": session_index,
+                }
+
+
+@lru_cache(maxsize=settings.PHASE_SESSION_INDEX_CACHE_SIZE)
+def get_phase_session_index(project_id: str) -> PhaseSessionIndex:
+    return PhaseSessionIndex(project_id, load_phase_session_config())
+
+
 def _phase_key_from_id(project_id: str, phase_id: str) -> str:
-    for phase_key in load_phase_session_config().keys():
-        if _phase_uuid(project_id, phase_key) == phase_id:
-            return phase_key
-    raise ResourceNotFoundError(f"Phase '{phase_id}' not found")
+    phase = get_phase_session_index(project_id).phases.get(phase_id)
+    if phase is None:
+        raise ResourceNotFoundError(f"Phase '{phase_id}' not found")
+    return phase["phase_key"]
 
 
 def _session_details_from_ids(project_id: str, phase_id: str, session_id: str) -> tuple[str, str]:
-    config = load_phase_session_config()
-    phase_key = _phase_key_from_id(project_id, phase_id)
-    for session in config.get(phase_key, []):
-        session_key = session["session_id"]
-        if _session_uuid(project_id, phase_key, session_key) == session_id:
-            return session_key, session["session_title"]
-    raise ResourceNotFoundError(f"Session '{session_id}' not found in phase '{phase_id}'")
+    _phase_key_from_id(project_id, phase_id)
+    session = get_phase_session_index(project_id).sessions.get(session_id)
+    if session is None or session["phase_id"] != phase_id:
+        raise ResourceNotFoundError(f"Session '{session_id}' not found in phase '{phase_id}'")
+    return session["session_key"], session["session_title"]
 
 
 def _assert_phase_exists(project_id: str, phase_id: str) -> str:
@@ -137,11 +218,21 @@ def _session_documents_link(project_id: str, phase_id: str, session_id: str) ->
     return f"{settings.API_PREFIX}/users/projects/{project_id}/phases/{phase_id}/sessions/{session_id}/documents"
 
 
-def _session_version_to_response(db: Session, row: ProjectSessionVersion) -> SessionVersionResponse:
-    approved_by_email = None
-    if row.approved_by_user_id is not None:
-        approved_by_user = db.get(User, row.approved_by_user_id)
-        approved_by_email = approved_by_user.email if approved_by_user else None
+def _stored_output(minio: MinioService, row: ProjectSessionVersion | SessionOutputSnapshot) -> str | None:
+    """Return the inline output of a session row or snapshot, or read it from MinIO when it was offloaded."""
+    if row.output_object_key:
+        return minio.get_text_object(row.output_bucket, row.output_object_key)
+    return row.output
+
+
+def _session_output(minio: MinioService, row: ProjectSessionVersion, entries: dict[str, Any]) -> str | None:
+    return merge_session_output(_stored_output(minio, row), entries)
+
+
+def _session_version_to_response(row: ProjectSessionVersion, output: str | None = None) -> SessionVersionResponse:
+    # Callers listing many rows load `approved_by` eagerly, so this never queries per row.
+    # `output` is deferred on the model; only callers that asked for it pass it through.
+    approved_by_email = row.approved_by.email if row.approved_by is not None else None
 
     return SessionVersionResponse(
         id=row.id,
@@ -153,7 +244,7 @@ def _session_version_to_response(db: Session, row: ProjectSessionVersion) -> Ses
         conversation_id=row.conversation_id,
         approval_status=row.approval_status,
         remark=row.remark,
-        output=row.output,
+        output=output,
         approved_at=row.approved_at,
         approved_by=approved_by_email,
         created_at=row.created_at,
@@ -161,6 +252,93 @@ def _session_version_to_response(db: Session, row: ProjectSessionVersion) -> Ses
     )
 
 
+def _index_document_version(
+    db: Session,
+    minio: MinioService,
+    bucket: str,
+    object_key: str,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    version_id: str | None,
+    size: int,
+    content_sha256: str,
+    current_user: User,
+) -> None:
+    """Record a stored object version in the index, removing that version again if it cannot be indexed."""
+    # Two uploads of the same key can race for the next version number; the loser retries once.
+    for attempt in range(2):
+        try:
+            add_document_version(
+                db,
+                bucket=bucket,
+                object_key=object_key,
+                project_id=project_id,
+                phase_id=phase_id,
+                session_id=session_id,
+                filename=object_key.split("/documents/", 1)[-1],
+                version_id=version_id,
+                size=size,
+                last_modified=datetime.now(UTC),
+                created_by_user_id=current_user.id,
+                content_sha256=content_sha256,
+            )
+            return
+        except IntegrityError:
+            db.rollback()
+            if not attempt:
+                continue
+            _discard_unindexed_version(minio, bucket, object_key, version_id)
+            raise
+        except Exception:
+            db.rollback()
+            _discard_unindexed_version(minio, bucket, object_key, version_id)
+            raise
+
+
+def _discard_unindexed_version(minio: MinioService, bucket: str, object_key: str, version_id: str | None) -> None:
+    # Without a version id the bucket is unversioned and the previous content is already gone; keep the object.
+    if version_id is None:
+        return
+    try:
+        minio.remove_object(bucket, object_key, version_id=version_id)
+    except RuntimeError:
+        logger.warning("Failed to remove unindexed version %s of %s/%s", version_id, bucket, object_key)
+
+
+def _stream_sha256(stream: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _unchanged_document(db: Session, bucket: str, object_key: str, content_sha256: str) -> ProjectDocument | None:
+    document = get_document_by_key(db, bucket, object_key)
+    if document is None or document.current_sha256 != content_sha256:
+        return None
+    return document
+
+
+def _uploaded_document_response(
+    minio: MinioService,
+    bucket: str,
+    key: str,
+    filename: str,
+    version_id: str | None,
+    deduplicated: bool,
+) -> dict:
+    return {
+        "filename": _safe_filename(filename),
+        "object_key": key,
+        "version_id": version_id,
+        "download_url": minio.presigned_download_url(bucket, key, version_id=version_id),
+        "deduplicated": deduplicated,
+    }
+
+
 def create_text_document(
     db: Session,
     minio: MinioService,
@@ -175,20 +353,26 @@ def create_text_document(
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
     key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
+    payload = content.encode("utf-8")
+    content_sha256 = hashlib.sha256(payload).hexdigest()
+
+    # Same bytes as the latest version: keep that version instead of storing another copy.
+    unchanged = _unchanged_document(db, minio.user_bucket_name(current_user.id), key, content_sha256)
+    if unchanged is not None:
+        return _uploaded_document_response(minio, unchanged.bucket, key, filename, unchanged.current_version_id, True)
+
+    bucket = minio.ensure_user_bucket(current_user.id)
     version_id = minio.put_bytes_object(
         bucket=bucket,
         object_key=key,
-        payload=content.encode("utf-8"),
+        payload=payload,
         content_type="text/plain; charset=utf-8",
     )
-    return {
-        "filename": _safe_filename(filename),
-        "object_key": key,
-        "version_id": version_id,
-        "download_url": minio.presigned_download_url(bucket, key, version_id=version_id),
-    }
+    _index_document_version(
+        db, minio, bucket, key, project.id, phase_id, session_id, version_id, len(payload), content_sha256, current_user
+    )
+    return _uploaded_document_response(minio, bucket, key, filename, version_id, False)
 
 
 def upload_document_file(
@@ -198,23 +382,215 @@ def upload_document_file(
     phase_id: str,
     session_id: str,
     filename: str,
-    payload: bytes,
+    stream: BinaryIO,
     content_type: str | None,
     current_user: User,
+    size: int | None = None,
 ) -> dict:
     project = _assert_project_access(db, project_id, current_user)
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
+    if size is None:
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+
     key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
-    version_id = minio.put_bytes_object(bucket=bucket, object_key=key, payload=payload, content_type=content_type)
-    return {
-        "filename": _safe_filename(filename),
-        "object_key": key,
-        "version_id": version_id,
-        "download_url": minio.presigned_download_url(bucket, key, version_id=version_id),
+    # Hashing re-reads the local spool, which is far cheaper than re-sending an unchanged file.
+    content_sha256 = _stream_sha256(stream)
+    unchanged = _unchanged_document(db, minio.user_bucket_name(current_user.id), key, content_sha256)
+    if unchanged is not None:
+        return _uploaded_document_response(minio, unchanged.bucket, key, filename, unchanged.current_version_id, True)
+
+    bucket = minio.ensure_user_bucket(current_user.id)
+    version_id = minio.put_stream_object(
+        bucket=bucket,
+        object_key=key,
+        stream=stream,
+        length=size,
+        content_type=content_type,
+    )
+    _index_document_version(
+        db, minio, bucket, key, project.id, phase_id, session_id, version_id, size, content_sha256, current_user
+    )
+    return _uploaded_document_response(minio, bucket, key, filename, version_id, False)
+
+
+def _spool_archive_members(stream: BinaryIO) -> list[dict]:
+    """Extract every file of a zip upload into its own spool, hashing it on the way.
+
+    Archives with more than `DOCUMENT_ARCHIVE_MAX_MEMBERS` files or more than
+    `DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES` of content are rejected before anything is inflated.
+    The declared sizes are binding: `zipfile` stops at them and fails the CRC check of a member
+    that claims less than it holds.
+    """
+    stream.seek(0)
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as exc:
+        raise InvalidUploadError("Uploaded archive is not a valid zip file") from exc
+
+    max_members = settings.DOCUMENT_ARCHIVE_MAX_MEMBERS
+    max_bytes = settings.DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES
+    items = []
+    try:
+        with archive:
+            members = [
+                info for info in archive.infolist() if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            ]
+            if len(members) > max_members:
+                raise InvalidUploadError(f"Uploaded archive contains more than {max_members} files")
+            if sum(info.file_size for info in members) > max_bytes:
+                raise InvalidUploadError(f"Uploaded archive expands to more than {max_bytes} bytes")
+            for info in members:
+                spool = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MAX_MEMORY)
+                items.append({"filename": info.filename, "stream": spool})
+                digest = hashlib.sha256()
+                try:
+                    with archive.open(info) as member:
+                        for chunk in iter(lambda: member.read(1024 * 1024), b""):
+                            digest.update(chunk)
+                            spool.write(chunk)
+                except (zipfile.BadZipFile, zlib.error) as exc:
+                    raise InvalidUploadError(f"Archive member '{_safe_filename(info.filename)}' is corrupt") from exc
+                spool.seek(0)
+                items[-1].update(
+                    {
+                        "content_type": mimetypes.guess_type(info.filename)[0],
+                        "size": info.file_size,
+                        "content_sha256": digest.hexdigest(),
+                    }
+                )
+    except Exception:
+        for item in items:
+            item["stream"].close()
+        raise
+    return items
+
+
+def upload_document_files(
+    db: Session,
+    minio: MinioService,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    files: list[dict],
+    current_user: User,
+    extract_archives: bool = False,
+) -> dict:
+    """Store several uploads in one call; `files` holds filename, stream, content_type and size for each.
+
+    Access is checked once, unchanged files are skipped against one index query, and the remaining
+    objects are written concurrently on at most `DOCUMENT_BULK_UPLOAD_WORKERS` threads.
+    """
+    project = _assert_project_access(db, project_id, current_user)
+    _assert_phase_exists(project_id, phase_id)
+    _session_details_from_ids(project_id, phase_id, session_id)
+
+    items: list[dict] = []
+    # Spools extracted from archives belong to this call; the caller's own streams are left to the caller.
+    spools: list[BinaryIO] = []
+    try:
+        for upload in files:
+            if extract_archives and upload["filename"].lower().endswith(".zip"):
+                members = _spool_archive_members(upload["stream"])
+                spools.extend(member["stream"] for member in members)
+                items.extend(members)
+                continue
+            stream = upload["stream"]
+            size = upload.get("size")
+            if size is None:
+                size = stream.seek(0, os.SEEK_END)
+                stream.seek(0)
+            items.append({**upload, "size": size, "content_sha256": _stream_sha256(stream)})
+
+        return _store_upload_items(db, minio, project, phase_id, session_id, items, current_user)
+    finally:
+        for spool in spools:
+            spool.close()
+
+
+def _store_upload_items(
+    db: Session,
+    minio: MinioService,
+    project: Project,
+    phase_id: str,
+    session_id: str,
+    items: list[dict],
+    current_user: User,
+) -> dict:
+    """Skip unchanged `items`, write the rest concurrently and index every object that was stored."""
+    seen: set[str] = set()
+    for item in items:
+        item["key"] = _object_key(project.workspace_id, project.id, phase_id, session_id, item["filename"])
+        if item["key"] in seen:
+            raise InvalidUploadError(f"Document '{_safe_filename(item['filename'])}' appears more than once in the upload")
+        seen.add(item["key"])
+
+    indexed = {
+        document.object_key: document
+        for document in list_documents(db, minio.user_bucket_name(current_user.id), project.id, phase_id, session_id)
     }
+    changed = [item for item in items if getattr(indexed.get(item["key"]), "current_sha256", None) != item["content_sha256"]]
+
+    bucket = minio.ensure_user_bucket(current_user.id) if changed else None
+    version_ids: dict[str, str | None] = {}
+    failure: Exception | None = None
+    if changed:
+        with ThreadPoolExecutor(max_workers=max(1, min(settings.DOCUMENT_BULK_UPLOAD_WORKERS, len(changed)))) as pool:
+            futures = [
+                (
+                    item,
+                    pool.submit(
+                        minio.put_stream_object,
+                        bucket=bucket,
+                        object_key=item["key"],
+                        stream=item["stream"],
+                        length=item["size"],
+                        content_type=item["content_type"],
+                    ),
+                )
+                for item in changed
+            ]
+            for item, future in futures:
+                try:
+                    version_ids[item["key"]] = future.result()
+                except Exception as exc:
+                    failure = failure or exc
+
+    # Index every object that reached storage, even when a sibling failed, so the tree stays truthful.
+    for item in changed:
+        if item["key"] in version_ids:
+            _index_document_version(
+                db,
+                minio,
+                bucket,
+                item["key"],
+                project.id,
+                phase_id,
+                session_id,
+                version_ids[item["key"]],
+                item["size"],
+                item["content_sha256"],
+                current_user,
+            )
+    if failure is not None:
+        raise failure
+
+    documents = []
+    for item in items:
+        if item["key"] in version_ids:
+            documents.append(
+                _uploaded_document_response(minio, bucket, item["key"], item["filename"], version_ids[item["key"]], False)
+            )
+            continue
+        unchanged = indexed[item["key"]]
+        documents.append(
+            _uploaded_document_response(
+                minio, unchanged.bucket, item["key"], item["filename"], unchanged.current_version_id, True
+            )
+        )
+    return {"documents": documents}
 
 
 def get_document_versions(
@@ -230,7 +606,9 @@ def get_document_versions(
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
+    bucket = minio.existing_user_bucket(current_user.id)
+    if bucket is None:
+        return FileVersionsResponse(filename=_safe_filename(filename), versions=[])
     key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
     versions = minio.list_object_versions(bucket=bucket, object_key=key)
     return FileVersionsResponse(filename=_safe_filename(filename), versions=versions)
@@ -250,7 +628,9 @@ def get_document_content_by_version(
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
+    bucket = minio.existing_user_bucket(current_user.id)
+    if bucket is None:
+        raise ResourceNotFoundError(f"Document '{_safe_filename(filename)}' not found")
     key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
     body = minio.get_object_bytes(bucket=bucket, object_key=key, version_id=version_id)
     return FileContentResponse(
@@ -260,33 +640,230 @@ def get_document_content_by_version(
     )
 
 
-def _documents_from_prefix(minio: MinioService, bucket: str, prefix: str) -> dict[str, dict[str, list[DocumentNode]]]:
-    grouped: dict[str, dict[str, list[DocumentNode]]] = defaultdict(lambda: defaultdict(list))
-    objects = minio.list_objects(bucket=bucket, prefix=prefix, recursive=True)
+def _structured_changes(old: Any, new: Any, path: str = "") -> list[DocumentChange]:
+    """Walk two parsed documents and list leaf-level add/remove/replace operations with JSON-pointer paths."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in old:
+            child = f"{path}/{pointer_segment(key)}"
+            if key not in new:
+                changes.append(DocumentChange(op="remove", path=child, old=old[key]))
+            else:
+                changes.extend(_structured_changes(old[key], new[key], child))
+        for key in new:
+            if key not in old:
+                changes.append(DocumentChange(op="add", path=f"{path}/{pointer_segment(key)}", new=new[key]))
+        return changes
+
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for index in range(max(len(old), len(new))):
+            child = f"{path}/{index}"
+            if index >= len(new):
+                changes.append(DocumentChange(op="remove", path=child, old=old[index]))
+            elif index >= len(old):
+                changes.append(DocumentChange(op="add", path=child, new=new[index]))
+            else:
+                changes.extend(_structured_changes(old[index], new[index], child))
+        return changes
+
+    if old == new and type(old) is type(new):
+        return []
+    return [DocumentChange(op="replace", path=path or "/", old=old, new=new)]
+
+
+# Version ids are immutable, so a diff computed once for a pair stays valid forever. The cache is keyed on
+# (bucket, key, from, to, context) only; the MinIO service that reads a missing pair is not part of it.
+_diff_cache: OrderedDict[tuple[str, str, str, str, int], DocumentDiffResponse] = OrderedDict()
+_diff_cache_lock = threading.Lock()
+
+
+def _document_diff(
+    minio: MinioService,
+    bucket: str,
+    key: str,
+    from_version_id: str,
+    to_version_id: str,
+    context_lines: int,
+) -> DocumentDiffResponse:
+    cache_key = (bucket, key, from_version_id, to_version_id, context_lines)
+    with _diff_cache_lock:
+        cached = _diff_cache.get(cache_key)
+        if cached is not None:
+            _diff_cache.move_to_end(cache_key)
+            return cached
+
+    diff = _compute_document_diff(minio, *cache_key)
+    with _diff_cache_lock:
+        _diff_cache[cache_key] = diff
+        _diff_cache.move_to_end(cache_key)
+        while len(_diff_cache) > max(0, settings.DOCUMENT_DIFF_CACHE_SIZE):
+            _diff_cache.popitem(last=False)
+    return diff
+
+
+def _read_document_version(minio: MinioService, bucket: str, key: str, version_id: str) -> str:
+    try:
+        data = minio.get_object_bytes(bucket=bucket, object_key=key, version_id=version_id)
+    except RuntimeError:
+        # Only pay for the stat once the read failed, to tell an unknown version from a storage error.
+        if minio.stat_object(bucket, key, version_id=version_id) is None:
+            raise ResourceNotFoundError(f"Version '{version_id}' of this document not found") from None
+        raise
+    return data.decode("utf-8", "replace")
+
+
+def _compute_document_diff(
+    minio: MinioService,
+    bucket: str,
+    key: str,
+    from_version_id: str,
+    to_version_id: str,
+    context_lines: int,
+) -> DocumentDiffResponse:
+    filename = key.split("/documents/", 1)[-1]
+    old_text = _read_document_version(minio, bucket, key, from_version_id)
+    new_text = _read_document_version(minio, bucket, key, to_version_id)
+    response = {
+        "filename": filename,
+        "from_version_id": from_version_id,
+        "to_version_id": to_version_id,
+        "identical": old_text == new_text,
+    }
 
-    for obj in objects:
-        object_name = obj["object_name"]
-        parts = object_name.split("/")
-        if len(parts) < 6 or parts[4] != "documents":
-            continue
+    if filename.lower().endswith(STRUCTURED_DIFF_SUFFIXES):
+        try:
+            changes = _structured_changes(yaml.safe_load(old_text), yaml.safe_load(new_text))
+        except yaml.YAMLError:
+            pass
+        else:
+            return DocumentDiffResponse(**response, format="structured", changes=changes)
+
+    unified = difflib.unified_diff(
+        old_text.splitlines(keepends=True),
+        new_text.splitlines(keepends=True),
+        fromfile=f"{filename}@{from_version_id}",
+        tofile=f"{filename}@{to_version_id}",
+        n=context_lines,
+    )
+    return DocumentDiffResponse(**response, format="unified", unified_diff="".join(unified))
+
+
+def get_document_diff(
+    db: Session,
+    minio: MinioService,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    filename: str,
+    from_version_id: str,
+    to_version_id: str,
+    current_user: User,
+    context_lines: int = 3,
+) -> DocumentDiffResponse:
+    project = _assert_project_access(db, project_id, current_user)
+    _assert_phase_exists(project_id, phase_id)
+    _session_details_from_ids(project_id, phase_id, session_id)
+
+    bucket = minio.existing_user_bucket(current_user.id)
+    if bucket is None:
+        raise ResourceNotFoundError(f"Document '{_safe_filename(filename)}' not found")
+    key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
+    return _document_diff(minio, bucket, key, from_version_id, to_version_id, max(0, context_lines))
+
+
+def _parse_byte_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the inclusive (start, end) of a single `bytes=` range, or None to serve the whole object."""
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start < 0 or start >= size or start > end:
+        raise RangeNotSatisfiableError(f"Range '{range_header}' not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
+def open_document_download(
+    db: Session,
+    minio: MinioService,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    filename: str,
+    version_id: str,
+    current_user: User,
+    range_header: str | None = None,
+) -> dict:
+    project = _assert_project_access(db, project_id, current_user)
+    _assert_phase_exists(project_id, phase_id)
+    _session_details_from_ids(project_id, phase_id, session_id)
+
+    safe_name = _safe_filename(filename)
+    bucket = minio.existing_user_bucket(current_user.id)
+    key = _object_key(project.workspace_id, project.id, phase_id, session_id, filename)
+    stat = minio.stat_object(bucket, key, version_id=version_id) if bucket else None
+    if stat is None:
+        raise ResourceNotFoundError(f"Document '{safe_name}' version '{version_id}' not found")
+
+    size = stat["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(safe_name)}",
+    }
+    if stat["etag"]:
+        headers["ETag"] = f'"{stat["etag"]}"'
+
+    byte_range = _parse_byte_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return {
+            "chunks": minio.iter_object_chunks(bucket, key, version_id=version_id),
+            "status_code": 200,
+            "media_type": stat["content_type"] or "application/octet-stream",
+            "headers": headers,
+        }
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return {
+        "chunks": minio.iter_object_chunks(bucket, key, version_id=version_id, offset=start, length=end - start + 1),
+        "status_code": 206,
+        "media_type": stat["content_type"] or "application/octet-stream",
+        "headers": headers,
+    }
 
-        phase_id = parts[2]
-        session_id = parts[3]
-        filename = "/".join(parts[5:])
-        versions = minio.list_object_versions(bucket, object_name)
-        latest = versions[0] if versions else {"version_id": None, "last_modified": obj.get("last_modified")}
-        version_id = latest.get("version_id")
-        current_version = len(versions) if versions else None
 
-        grouped[phase_id][session_id].append(
+def _group_document_nodes(minio: MinioService, entries: list[dict]) -> dict[str, dict[str, list[DocumentNode]]]:
+    # Sign every URL in one batch so cached signatures are reused across tree loads.
+    urls = minio.presigned_download_urls(
+        (entry["bucket"], entry["object_key"], entry["version_id"]) for entry in entries
+    )
+
+    grouped: dict[str, dict[str, list[DocumentNode]]] = defaultdict(lambda: defaultdict(list))
+    for entry, url in zip(entries, urls):
+        grouped[entry["phase_id"]][entry["session_id"]].append(
             DocumentNode(
-                filename=filename,
-                object_key=object_name,
-                current_version=current_version,
-                current_version_id=version_id,
-                version_id=version_id,
-                last_modified=latest.get("last_modified"),
-                download_url=minio.presigned_download_url(bucket, object_name, version_id=version_id),
+                filename=entry["filename"],
+                object_key=entry["object_key"],
+                current_version=entry["current_version"],
+                current_version_id=entry["version_id"],
+                version_id=entry["version_id"],
+                last_modified=entry["last_modified"],
+                download_url=url,
             )
         )
 
@@ -296,6 +873,93 @@ def _documents_from_prefix(minio: MinioService, bucket: str, prefix: str) -> dic
     return grouped
 
 
+def _document_entries_from_prefix(minio: MinioService, bucket: str, prefix: str) -> list[dict]:
+    # One versioned listing covers every document under the prefix; no per-object round trips.
+    versions_by_key = minio.list_versions_by_key(bucket=bucket, prefix=prefix)
+
+    entries: list[dict] = []
+    for object_name, versions in versions_by_key.items():
+        parts = object_name.split("/")
+        if len(parts) < 6 or parts[4] != "documents" or not versions:
+            continue
+
+        latest = versions[0]
+        entries.append(
+            {
+                "bucket": bucket,
+                "object_key": object_name,
+                "phase_id": parts[2],
+                "session_id": parts[3],
+                "filename": "/".join(parts[5:]),
+                "current_version": len(versions),
+                "version_id": latest.get("version_id"),
+                "last_modified": latest.get("last_modified"),
+                "size": latest.get("size"),
+            }
+        )
+    return entries
+
+
+def _documents_from_prefix(minio: MinioService, bucket: str, prefix: str) -> dict[str, dict[str, list[DocumentNode]]]:
+    return _group_document_nodes(minio, _document_entries_from_prefix(minio, bucket, prefix))
+
+
+def _document_entries_from_index(documents: list[ProjectDocument]) -> list[dict]:
+    return [
+        {
+            "bucket": document.bucket,
+            "object_key": document.object_key,
+            "phase_id": document.phase_id,
+            "session_id": document.session_id,
+            "filename": document.filename,
+            "current_version": document.current_version,
+            "version_id": document.current_version_id,
+            "last_modified": document.last_modified,
+            "size": None,
+        }
+        for document in documents
+    ]
+
+
+def _documents_from_index(minio: MinioService, documents: list[ProjectDocument]) -> dict[str, dict[str, list[DocumentNode]]]:
+    return _group_document_nodes(minio, _document_entries_from_index(documents))
+
+
+def _latest_document_entries(
+    db: Session,
+    minio: MinioService,
+    project: Project,
+    current_user: User,
+    phase_id: str | None = None,
+    session_id: str | None = None,
+) -> list[dict]:
+    if settings.DOCUMENT_TREE_SOURCE not in DOCUMENT_TREE_SOURCES:
+        raise RuntimeError(f"Unsupported document tree source '{settings.DOCUMENT_TREE_SOURCE}'")
+
+    if settings.DOCUMENT_TREE_SOURCE == "storage":
+        bucket = minio.existing_user_bucket(current_user.id)
+        if bucket is None:
+            return []
+        prefix = "/".join([project.workspace_id, project.id, *[part for part in (phase_id, session_id) if part]]) + "/"
+        return _document_entries_from_prefix(minio, bucket, prefix)
+
+    bucket = minio.user_bucket_name(current_user.id)
+    documents = list_documents(db, bucket, project.id, phase_id=phase_id, session_id=session_id)
+    return _document_entries_from_index(documents)
+
+
+def _grouped_documents(
+    db: Session,
+    minio: MinioService,
+    project: Project,
+    current_user: User,
+    phase_id: str | None = None,
+    session_id: str | None = None,
+) -> dict[str, dict[str, list[DocumentNode]]]:
+    entries = _latest_document_entries(db, minio, project, current_user, phase_id=phase_id, session_id=session_id)
+    return _group_document_nodes(minio, entries)
+
+
 def get_project_document_tree(
     db: Session,
     minio: MinioService,
@@ -303,9 +967,7 @@ def get_project_document_tree(
     current_user: User,
 ) -> ProjectDocumentTreeResponse:
     project = _assert_project_access(db, project_id, current_user)
-    bucket = minio.ensure_user_bucket(current_user.id)
-    prefix = f"{project.workspace_id}/{project.id}/"
-    grouped = _documents_from_prefix(minio, bucket, prefix)
+    grouped = _grouped_documents(db, minio, project, current_user)
 
     phases = []
     for phase_id in sorted(grouped.keys()):
@@ -327,9 +989,7 @@ def get_phase_documents(
     project = _assert_project_access(db, project_id, current_user)
     _assert_phase_exists(project_id, phase_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
-    prefix = f"{project.workspace_id}/{project.id}/{phase_id}/"
-    grouped = _documents_from_prefix(minio, bucket, prefix)
+    grouped = _grouped_documents(db, minio, project, current_user, phase_id=phase_id)
 
     sessions = []
     for session_id in sorted(grouped.get(phase_id, {}).keys()):
@@ -350,41 +1010,230 @@ def get_session_documents(
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    bucket = minio.ensure_user_bucket(current_user.id)
-    prefix = f"{project.workspace_id}/{project.id}/{phase_id}/{session_id}/"
-    grouped = _documents_from_prefix(minio, bucket, prefix)
+    grouped = _grouped_documents(db, minio, project, current_user, phase_id=phase_id, session_id=session_id)
     session_docs = grouped.get(phase_id, {}).get(session_id, [])
     return SessionDocumentsResponse(project_id=project.id, phase_id=phase_id, session_id=session_id, documents=session_docs)
 
 
-def initialize_project_workflow(
+class _ZipStreamBuffer:
+    """Write-only sink for ZipFile; the export drains it after every write so nothing accumulates."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        return None
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _zip_timestamp(value: datetime | None) -> tuple[int, int, int, int, int, int]:
+    moment = value or datetime.now(UTC)
+    if moment.year < 1980:
+        return (1980, 1, 1, 0, 0, 0)
+    return moment.timetuple()[:6]
+
+
+def _export_archive_name(project_id: str, entry: dict) -> str:
+    index = get_phase_session_index(project_id)
+    phase = index.phases.get(entry["phase_id"])
+    session = index.sessions.get(entry["session_id"])
+    phase_dir = phase["phase_key"] if phase else entry["phase_id"]
+    session_dir = session["session_key"] if session else entry["session_id"]
+    return f"{phase_dir}/{session_dir}/{entry['filename']}"
+
+
+async def _prefetch_export_object(async_minio: AsyncMinioService, entry: dict, queue: asyncio.Queue) -> None:
+    # `aclosing` releases the MinIO response as soon as the task is cancelled, not when the generator is collected.
+    try:
+        async with aclosing(
+            async_minio.iter_object_chunks(entry["bucket"], entry["object_key"], version_id=entry["version_id"])
+        ) as chunks:
+            async for chunk in chunks:
+                await queue.put(chunk)
+    except Exception as exc:
+        await queue.put(exc)
+        return
+    await queue.put(None)
+
+
+async def _stream_document_zip(async_minio: AsyncMinioService, entries: list[dict]) -> AsyncIterator[bytes]:
+    """Yield a zip of `entries` while the next objects are already being read from MinIO.
+
+    At most `DOCUMENT_EXPORT_PREFETCH_OBJECTS` objects are in flight, each holding at most
+    `DOCUMENT_EXPORT_QUEUE_CHUNKS` chunks, so memory stays bounded regardless of project size.
+    """
+    upcoming = iter(entries)
+    in_flight: deque[tuple[dict, asyncio.Queue, asyncio.Task]] = deque()
+
+    def _start_next() -> None:
+        entry = next(upcoming, None)
+        if entry is None:
+            return
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.DOCUMENT_EXPORT_QUEUE_CHUNKS))
+        in_flight.append((entry, queue, asyncio.create_task(_prefetch_export_object(async_minio, entry, queue))))
+
+    for _ in range(max(1, settings.DOCUMENT_EXPORT_PREFETCH_OBJECTS)):
+        _start_next()
+
+    sink = _ZipStreamBuffer()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    current: asyncio.Task | None = None
+    try:
+        while in_flight:
+            entry, queue, current = in_flight.popleft()
+            _start_next()
+
+            info = zipfile.ZipInfo(entry["archive_name"], date_time=_zip_timestamp(entry["last_modified"]))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            if entry["size"] is not None:
+                info.file_size = entry["size"]
+            with archive.open(info, mode="w", force_zip64=entry["size"] is None) as member:
+                while (chunk := await queue.get()) is not None:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    member.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+
+        archive.close()
+        if data := sink.drain():
+            yield data
+    finally:
+        # The client may disconnect mid-archive; stop every reader, including the one being drained.
+        tasks = [task for _, _, task in in_flight]
+        if current is not None:
+            tasks.append(current)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def open_document_export(
     db: Session,
+    minio: MinioService,
+    async_minio: AsyncMinioService,
     project_id: str,
+    current_user: User,
+) -> dict:
+    """Resolve the latest version of every project document and return a streaming zip of them."""
+    project = _assert_project_access(db, project_id, current_user)
+    entries = _latest_document_entries(db, minio, project, current_user)
+    for entry in entries:
+        entry["archive_name"] = _export_archive_name(project.id, entry)
+    entries.sort(key=lambda entry: entry["archive_name"].lower())
+
+    archive_name = f"{_slugify(project.name)}-documents.zip"
+    return {
+        "chunks": _stream_document_zip(async_minio, entries),
+        "media_type": "application/zip",
+        "headers": {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(archive_name)}"},
+    }
+
+
+def reconcile_document_index(db: Session, minio: MinioService, bucket: str) -> int:
+    """Rebuild the document index for one bucket from a versioned listing; returns the number of documents indexed."""
+    versions_by_key = minio.list_versions_by_key(bucket=bucket, prefix="")
+    existing = {
+        document.object_key: document
+        for document in db.execute(select(ProjectDocument).where(ProjectDocument.bucket == bucket)).scalars().all()
+    }
+    project_ids = set(db.execute(select(Project.id)).scalars().all())
+
+    indexed = 0
+    for object_key, versions in versions_by_key.items():
+        # Delete markers have no content to index.
+        versions = [item for item in versions if not item["is_delete_marker"]]
+        parts = object_key.split("/")
+        if len(parts) < 6 or parts[4] != "documents" or parts[1] not in project_ids or not versions:
+            continue
+
+        document = existing.pop(object_key, None)
+        if document is None:
+            document = ProjectDocument(
+                bucket=bucket,
+                object_key=object_key,
+                project_id=parts[1],
+                phase_id=parts[2],
+                session_id=parts[3],
+                filename="/".join(parts[5:]),
+            )
+            db.add(document)
+
+        # Uploader and content hash only exist in the index; carry them over for versions it already knew.
+        known = {
+            version.version_id: (version.created_by_user_id, version.content_sha256)
+            for version in document.versions
+        }
+        # Drop the old version rows first so their replacements can reuse the same version numbers.
+        document.versions.clear()
+        db.flush()
+        document.versions = [
+            ProjectDocumentVersion(
+                version=number,
+                version_id=item.get("version_id"),
+                size=item.get("size"),
+                etag=item.get("etag"),
+                last_modified=item.get("last_modified"),
+                created_by_user_id=known.get(item.get("version_id"), (None, None))[0],
+                content_sha256=known.get(item.get("version_id"), (None, None))[1],
+            )
+            for number, item in enumerate(reversed(versions), start=1)
+        ]
+        document.current_version = len(versions)
+        document.current_version_id = versions[0].get("version_id")
+        document.current_sha256 = document.versions[-1].content_sha256
+        document.last_modified = versions[0].get("last_modified")
+        indexed += 1
+
+    for stale in existing.values():
+        db.delete(stale)
+
+    db.commit()
+    return indexed
+
+
+def initialize_project_workflow(
+    db: Session,
+    project: Project,
     created_by_user_id: int,
 ) -> None:
+    """Create the pending phase rows and first session versions missing for the current config.
+
+    Runs at project creation and again only when `workflow_config_hash` no longer matches the config.
+    """
     config = load_phase_session_config()
-    touched = False
+    index = get_phase_session_index(project.id)
+    existing_phases = {row.phase_id for row in list_phase_states(db, project.id)}
+    existing_sessions = list_session_keys(db, project.id)
 
     for phase_key, sessions in config.items():
-        phase_id = _phase_uuid(project_id, phase_key)
-        phase_row = get_phase_state(db, project_id, phase_id)
-        if phase_row is None:
-            phase_row = ProjectPhaseState(
-                project_id=project_id,
-                phase_id=phase_id,
-                approval_status="pending",
+        phase_id = index.phase_ids[phase_key]
+        if phase_id not in existing_phases:
+            db.add(
+                ProjectPhaseState(
+                    project_id=project.id,
+                    phase_id=phase_id,
+                    approval_status="pending",
+                )
             )
-            db.add(phase_row)
-            touched = True
 
         for session in sessions:
-            session_id = _session_uuid(project_id, phase_key, session["session_id"])
-            next_version = get_next_session_version_number(db, project_id, phase_id, session_id)
-            if next_version != 1:
+            session_id = index.session_ids[(phase_key, session["session_id"])]
+            if (phase_id, session_id) in existing_sessions:
                 continue
             db.add(
                 ProjectSessionVersion(
-                    project_id=project_id,
+                    project_id=project.id,
                     phase_id=phase_id,
                     session_id=session_id,
                     session_title=session["session_title"],
@@ -394,10 +1243,15 @@ def initialize_project_workflow(
                     created_by_user_id=created_by_user_id,
                 )
             )
-            touched = True
 
-    if touched:
-        db.commit()
+    project.workflow_config_hash = workflow_config_hash()
+    db.commit()
+
+
+def _ensure_project_workflow(db: Session, project: Project) -> None:
+    # Projects created before the config changed (or before hashes were tracked) catch up once.
+    if project.workflow_config_hash != workflow_config_hash():
+        initialize_project_workflow(db, project, project.owner_id)
 
 
 def create_new_session_version(
@@ -424,7 +1278,7 @@ def create_new_session_version(
         created_by_user_id=current_user.id,
     )
     row = save_session_version(db, row)
-    return _session_version_to_response(db, row)
+    return _session_version_to_response(row)
 
 
 def rename_session_title(
@@ -449,7 +1303,7 @@ def rename_session_title(
 
     db.commit()
     db.refresh(rows[0])
-    return _session_version_to_response(db, rows[0])
+    return _session_version_to_response(rows[0])
 
 
 def get_session_version_history(
@@ -459,24 +1313,71 @@ def get_session_version_history(
     session_id: str,
     current_user: User,
     previous_only: bool = True,
+    include_output: bool = False,
+    minio: MinioService | None = None,
 ) -> SessionVersionHistoryResponse:
     project = _assert_project_access(db, project_id, current_user)
-    initialize_project_workflow(db, project_id, project.owner_id)
+    _ensure_project_workflow(db, project)
     _assert_phase_exists(project_id, phase_id)
     _session_details_from_ids(project_id, phase_id, session_id)
 
-    rows = list_session_versions_for_session(db, project_id, phase_id, session_id)
+    rows = list_session_versions_for_session(db, project_id, phase_id, session_id, include_output=include_output)
     if previous_only and rows:
         rows = rows[1:]
 
+    if not include_output:
+        return SessionVersionHistoryResponse(
+            project_id=project_id,
+            phase_id=phase_id,
+            session_id=session_id,
+            versions=[_session_version_to_response(row) for row in rows],
+        )
+
+    entries = get_session_output_entries(db, [row.id for row in rows])
     return SessionVersionHistoryResponse(
         project_id=project_id,
         phase_id=phase_id,
         session_id=session_id,
-        versions=[_session_version_to_response(db, row) for row in rows],
+        versions=[_session_version_to_response(row, _session_output(minio, row, entries.get(row.id, {}))) for row in rows],
     )
 
 
+def get_session_version_output(
+    db: Session,
+    minio: MinioService,
+    project_id: str,
+    phase_id: str,
+    session_id: str,
+    version: int,
+    current_user: User,
+    revision: int | None = None,
+) -> SessionVersionOutputResponse:
+    """Return the current output, or with `revision` the newest snapshot taken at or before it."""
+    _assert_project_access(db, project_id, current_user)
+    _assert_phase_exists(project_id, phase_id)
+    _session_details_from_ids(project_id, phase_id, session_id)
+
+    row = get_session_version(db, project_id, phase_id, session_id, version)
+    if row is None:
+        raise ResourceNotFoundError("Session version not found")
+
+    response = {
+        "project_id": project_id,
+        "phase_id": phase_id,
+        "session_id": session_id,
+        "version": row.version,
+        "conversation_id": row.conversation_id,
+    }
+    if revision is not None and revision < row.revision:
+        snapshot = get_session_output_snapshot(db, row.id, revision)
+        if snapshot is None:
+            raise ResourceNotFoundError(f"No output snapshot at or before revision {revision}")
+        return SessionVersionOutputResponse(**response, revision=snapshot.revision, output=_stored_output(minio, snapshot))
+
+    entries = get_session_output_entries(db, [row.id]).get(row.id, {})
+    return SessionVersionOutputResponse(**response, revision=row.revision, output=_session_output(minio, row, entries))
+
+
 def approve_phase(
     db: Session,
     project_id: str,
@@ -530,23 +1431,19 @@ def approve_session_version(
     row.approved_at = datetime.now(UTC)
     row.approved_by_user_id = current_user.id
     row = save_session_version(db, row)
-    return _session_version_to_response(db, row)
+    return _session_version_to_response(row)
 
 
 def get_project_phase_session_status(db: Session, project_id: str, current_user: User) -> ProjectWorkflowStatusResponse:
     project = _assert_project_access(db, project_id, current_user)
-    initialize_project_workflow(db, project_id, project.owner_id)
+    _ensure_project_workflow(db, project)
     config = load_phase_session_config()
+    index = get_phase_session_index(project_id)
 
     phase_rows = list_phase_states(db, project_id)
     phase_map = {row.phase_id: row for row in phase_rows}
 
-    session_rows = list_session_versions(db, project_id)
-    latest_sessions: dict[tuple[str, str], ProjectSessionVersion] = {}
-    for row in session_rows:
-        key = (row.phase_id, row.session_id)
-        if key not in latest_sessions or row.version > latest_sessions[key].version:
-            latest_sessions[key] = row
+    latest_sessions = {(row.phase_id, row.session_id): row for row in list_latest_session_versions(db, project_id)}
 
     user_ids = {row.approved_by_user_id for row in phase_rows if row.approved_by_user_id}
     user_ids.update(row.approved_by_user_id for row in latest_sessions.values() if row.approved_by_user_id)
@@ -558,7 +1455,7 @@ def get_project_phase_session_status(db: Session, project_id: str, current_user:
 
     response_phases: list[PhaseWithSessionStatusResponse] = []
     for phase_key, sessions in config.items():
-        phase_id = _phase_uuid(project_id, phase_key)
+        phase_id = index.phase_ids[phase_key]
         phase_row = phase_map.get(phase_id)
         phase_status = PhaseStatusResponse(
             phase_id=phase_id,
@@ -572,7 +1469,7 @@ def get_project_phase_session_status(db: Session, project_id: str, current_user:
 
         session_statuses: list[SessionStatusResponse] = []
         for session in sessions:
-            session_id = _session_uuid(project_id, phase_key, session["session_id"])
+            session_id = index.session_ids[(phase_key, session["session_id"])]
             latest = latest_sessions.get((phase_id, session_id))
             session_statuses.append(
                 SessionStatusResponse(
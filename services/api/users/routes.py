@@ -7,6 +7,7 @@ from services.api.users.services import login_user, signup_user
 from services.core.database import get_db
 from services.core.exceptions import AuthError, UserExistsError, UserNotFoundError
 from services.dependencies.auth import get_current_user
+from services.dependencies.minio import get_minio_service
 
 from app import ColoredLogger
 logger = ColoredLogger("User >> API")
@@ -16,10 +17,14 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
+def signup(
+    payload: SignupRequest,
+    db: Session = Depends(get_db),
+    minio=Depends(get_minio_service),
+):
     logger.debug(payload)
     try:
-        return signup_user(db, payload)
+        return signup_user(db, payload, minio=minio)
     except UserExistsError as exc:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
 
@@ -4,16 +4,27 @@ from services.api.users.crud import create_user, get_user_by_email
 from services.api.users.model import User, build_user
 from services.api.users.schema import AuthResponse, LoginRequest, SignupRequest, UserResponse
 from services.core.exceptions import AuthError, UserExistsError, UserNotFoundError
+from services.core.minio import MinioService
 from services.core.security import create_access_token, hash_password, verify_password
+from utils.colored_logger import get_logger
 
 
-def signup_user(db: Session, payload: SignupRequest) -> AuthResponse:
+logger = get_logger("User >> Services")
+
+
+def signup_user(db: Session, payload: SignupRequest, minio: MinioService | None = None) -> AuthResponse:
     existing_user = get_user_by_email(db, payload.email)
     if existing_user:
         raise UserExistsError("User already exists")
 
     hashed_password = hash_password(payload.password)
     user = create_user(db, build_user(payload.email, payload.full_name, hashed_password))
+    if minio is not None:
+        try:
+            minio.ensure_user_bucket(user.id)
+        except RuntimeError as exc:
+            # Signup still succeeds; the first document write provisions the bucket instead.
+            logger.warning("Deferred bucket provisioning for user_id=%s: %s", user.id, exc)
     token = create_access_token(subject=user.email)
 
     return AuthResponse(
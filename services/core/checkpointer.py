@@ -0,0 +1,446 @@
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+import zstandard
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from sqlalchemy import DateTime, Integer, LargeBinary, String, and_, delete, desc, exists, select, tuple_
+from sqlalchemy.orm import Mapped, Session, mapped_column, sessionmaker
+
+from services.core.config import settings
+from services.core.database import Base, SessionLocal
+
+
+COMPRESSED_SUFFIX = "+zstd"
+COMPRESSION_THRESHOLD_BYTES = 512
+CHECKPOINTER_BACKENDS = {"memory", "database"}
+
+
+class GraphCheckpoint(Base):
+    __tablename__ = "graph_checkpoints"
+
+    thread_id: Mapped[str] = mapped_column(String(120), primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String(255), primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    parent_checkpoint_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    checkpoint_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    checkpoint: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    metadata_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    checkpoint_metadata: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        nullable=False,
+        index=True,
+    )
+
+
+class GraphCheckpointWrite(Base):
+    __tablename__ = "graph_checkpoint_writes"
+
+    thread_id: Mapped[str] = mapped_column(String(120), primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String(255), primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    task_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    channel: Mapped[str] = mapped_column(String(255), nullable=False)
+    value_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    task_path: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+
+
+class DatabaseCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer stored in the application database so threads survive reconnects and workers.
+
+    Payloads are serialized with the saver's serde (msgpack) and zstd-compressed above a small
+    threshold. Each (thread, namespace) keeps at most `max_checkpoints_per_thread` checkpoints,
+    and checkpoints older than `ttl_seconds` are pruned opportunistically on write.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        *,
+        max_checkpoints_per_thread: int = 20,
+        ttl_seconds: float = 0,
+        prune_interval_seconds: float = 300,
+    ) -> None:
+        super().__init__()
+        self._session_factory = session_factory
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = time.monotonic()
+        self._prune_lock = threading.Lock()
+        # zstd contexts are not thread-safe and the async wrappers run on worker threads.
+        self._codecs = threading.local()
+
+    def _codec(self) -> threading.local:
+        codecs = self._codecs
+        if not hasattr(codecs, "compressor"):
+            codecs.compressor = zstandard.ZstdCompressor(level=3)
+            codecs.decompressor = zstandard.ZstdDecompressor()
+        return codecs
+
+    def _dumps(self, value: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESSION_THRESHOLD_BYTES:
+            return f"{type_}{COMPRESSED_SUFFIX}", self._codec().compressor.compress(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(COMPRESSED_SUFFIX):
+            type_ = type_[: -len(COMPRESSED_SUFFIX)]
+            data = self._codec().decompressor.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _pending_writes(
+        self, db: Session, rows: Sequence[GraphCheckpoint]
+    ) -> dict[tuple[str, str, str], list[tuple[str, str, Any]]]:
+        """Load the pending writes of several checkpoints with one query, keyed by checkpoint."""
+        keys = [(row.thread_id, row.checkpoint_ns, row.checkpoint_id) for row in rows]
+        pending: dict[tuple[str, str, str], list[tuple[str, str, Any]]] = {key: [] for key in keys}
+        if not keys:
+            return pending
+        writes = db.execute(
+            select(GraphCheckpointWrite)
+            .where(
+                tuple_(
+                    GraphCheckpointWrite.thread_id,
+                    GraphCheckpointWrite.checkpoint_ns,
+                    GraphCheckpointWrite.checkpoint_id,
+                ).in_(keys)
+            )
+            .order_by(GraphCheckpointWrite.task_id, GraphCheckpointWrite.idx)
+        ).scalars()
+        for write in writes:
+            pending[(write.thread_id, write.checkpoint_ns, write.checkpoint_id)].append(
+                (write.task_id, write.channel, self._loads(write.value_type, write.value))
+            )
+        return pending
+
+    def _to_tuple(
+        self,
+        row: GraphCheckpoint,
+        pending_writes: list[tuple[str, str, Any]],
+        metadata: CheckpointMetadata | None = None,
+    ) -> CheckpointTuple:
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint=self._loads(row.checkpoint_type, row.checkpoint),
+            metadata=metadata if metadata is not None else self._loads(row.metadata_type, row.checkpoint_metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": row.thread_id,
+                        "checkpoint_ns": row.checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=pending_writes,
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stmt = select(GraphCheckpoint).where(
+            GraphCheckpoint.thread_id == thread_id,
+            GraphCheckpoint.checkpoint_ns == checkpoint_ns,
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            stmt = stmt.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        else:
+            stmt = stmt.order_by(desc(GraphCheckpoint.checkpoint_id)).limit(1)
+
+        db = self._session_factory()
+        try:
+            row = db.execute(stmt).scalar_one_or_none()
+            if row is None:
+                return None
+            pending = self._pending_writes(db, [row])
+            return self._to_tuple(row, pending[(row.thread_id, row.checkpoint_ns, row.checkpoint_id)])
+        finally:
+            db.close()
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        stmt = select(GraphCheckpoint)
+        if config:
+            stmt = stmt.where(GraphCheckpoint.thread_id == config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                stmt = stmt.where(GraphCheckpoint.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                stmt = stmt.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            stmt = stmt.where(GraphCheckpoint.checkpoint_id < before_checkpoint_id)
+        stmt = stmt.order_by(desc(GraphCheckpoint.checkpoint_id))
+
+        db = self._session_factory()
+        try:
+            selected: list[tuple[GraphCheckpoint, CheckpointMetadata]] = []
+            for row in db.execute(stmt).scalars():
+                metadata = self._loads(row.metadata_type, row.checkpoint_metadata)
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                selected.append((row, metadata))
+                if limit is not None and len(selected) >= limit:
+                    break
+            pending = self._pending_writes(db, [row for row, _ in selected])
+            results = [
+                self._to_tuple(row, pending[(row.thread_id, row.checkpoint_ns, row.checkpoint_id)], metadata)
+                for row, metadata in selected
+            ]
+        finally:
+            db.close()
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_data = self._dumps(checkpoint)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+
+        db = self._session_factory()
+        try:
+            db.merge(
+                GraphCheckpoint(
+                    thread_id=thread_id,
+                    checkpoint_ns=checkpoint_ns,
+                    checkpoint_id=checkpoint["id"],
+                    parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                    checkpoint_type=checkpoint_type,
+                    checkpoint=checkpoint_data,
+                    metadata_type=metadata_type,
+                    checkpoint_metadata=metadata_data,
+                    created_at=datetime.now(UTC),
+                )
+            )
+            db.flush()
+            self._enforce_thread_cap(db, thread_id, checkpoint_ns)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self._maybe_prune_expired()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        db = self._session_factory()
+        try:
+            existing = set(
+                db.execute(
+                    select(GraphCheckpointWrite.idx).where(
+                        GraphCheckpointWrite.thread_id == thread_id,
+                        GraphCheckpointWrite.checkpoint_ns == checkpoint_ns,
+                        GraphCheckpointWrite.checkpoint_id == checkpoint_id,
+                        GraphCheckpointWrite.task_id == task_id,
+                    )
+                ).scalars()
+            )
+            for position, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, position)
+                # Regular writes are written once; special channels (errors, interrupts) are replaced.
+                if idx >= 0 and idx in existing:
+                    continue
+                value_type, value_data = self._dumps(value)
+                db.merge(
+                    GraphCheckpointWrite(
+                        thread_id=thread_id,
+                        checkpoint_ns=checkpoint_ns,
+                        checkpoint_id=checkpoint_id,
+                        task_id=task_id,
+                        idx=idx,
+                        channel=channel,
+                        value_type=value_type,
+                        value=value_data,
+                        task_path=task_path,
+                    )
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def delete_thread(self, thread_id: str) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(delete(GraphCheckpointWrite).where(GraphCheckpointWrite.thread_id == thread_id))
+            db.execute(delete(GraphCheckpoint).where(GraphCheckpoint.thread_id == thread_id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _enforce_thread_cap(self, db: Session, thread_id: str, checkpoint_ns: str) -> None:
+        stale_ids = list(
+            db.execute(
+                select(GraphCheckpoint.checkpoint_id)
+                .where(GraphCheckpoint.thread_id == thread_id, GraphCheckpoint.checkpoint_ns == checkpoint_ns)
+                .order_by(desc(GraphCheckpoint.checkpoint_id))
+                .offset(self.max_checkpoints_per_thread)
+            ).scalars()
+        )
+        if not stale_ids:
+            return
+        scope = (
+            GraphCheckpointWrite.thread_id == thread_id,
+            GraphCheckpointWrite.checkpoint_ns == checkpoint_ns,
+            GraphCheckpointWrite.checkpoint_id.in_(stale_ids),
+        )
+        db.execute(delete(GraphCheckpointWrite).where(*scope))
+        db.execute(
+            delete(GraphCheckpoint).where(
+                GraphCheckpoint.thread_id == thread_id,
+                GraphCheckpoint.checkpoint_ns == checkpoint_ns,
+                GraphCheckpoint.checkpoint_id.in_(stale_ids),
+            )
+        )
+
+    def prune_expired(self, ttl_seconds: float | None = None) -> int:
+        """Delete checkpoints (and their writes) older than the TTL; returns the number of checkpoints removed."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return 0
+        cutoff = datetime.now(UTC) - timedelta(seconds=ttl)
+
+        db = self._session_factory()
+        try:
+            removed = db.execute(delete(GraphCheckpoint).where(GraphCheckpoint.created_at < cutoff)).rowcount
+            db.execute(
+                delete(GraphCheckpointWrite).where(
+                    ~exists().where(
+                        and_(
+                            GraphCheckpoint.thread_id == GraphCheckpointWrite.thread_id,
+                            GraphCheckpoint.checkpoint_ns == GraphCheckpointWrite.checkpoint_ns,
+                            GraphCheckpoint.checkpoint_id == GraphCheckpointWrite.checkpoint_id,
+                        )
+                    )
+                )
+            )
+            db.commit()
+            return removed or 0
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _maybe_prune_expired(self) -> None:
+        if self.ttl_seconds <= 0 or time.monotonic() - self._last_prune < self.prune_interval_seconds:
+            return
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_prune = time.monotonic()
+            self.prune_expired()
+        finally:
+            self._prune_lock.release()
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+@lru_cache
+def get_checkpointer() -> BaseCheckpointSaver:
+    backend = settings.GRAPH_CHECKPOINTER
+    if backend not in CHECKPOINTER_BACKENDS:
+        raise ValueError(f"Unsupported graph checkpointer '{backend}'")
+    if backend == "memory":
+        return InMemorySaver()
+    return DatabaseCheckpointSaver(
+        max_checkpoints_per_thread=settings.GRAPH_CHECKPOINT_MAX_PER_THREAD,
+        ttl_seconds=settings.GRAPH_CHECKPOINT_TTL_SECONDS,
+    )
@@ -21,7 +21,48 @@ class Settings:
     MINIO_ACCESS_KEY: str = os.getenv("MINIO_ROOT_USER", "admin")
     MINIO_SECRET_KEY: str = os.getenv("MINIO_ROOT_PASSWORD", "Celllabs@123")
     MINIO_SECURE: bool = _as_bool(os.getenv("MINIO_SECURE", "false"))
+    MINIO_REGION: str = os.getenv("MINIO_REGION", "us-east-1")
     MINIO_BUCKET_PREFIX: str = os.getenv("MINIO_BUCKET_PREFIX", "user-")
+    MINIO_BUCKET_CACHE_TTL_SECONDS: float = float(os.getenv("MINIO_BUCKET_CACHE_TTL_SECONDS", "3600"))
+    MINIO_BUCKET_NEGATIVE_CACHE_TTL_SECONDS: float = float(os.getenv("MINIO_BUCKET_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+    MINIO_POOL_MAXSIZE: int = int(os.getenv("MINIO_POOL_MAXSIZE", "32"))
+    MINIO_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("MINIO_CONNECT_TIMEOUT_SECONDS", "5"))
+    MINIO_READ_TIMEOUT_SECONDS: float = float(os.getenv("MINIO_READ_TIMEOUT_SECONDS", "60"))
+    MINIO_MAX_RETRIES: int = int(os.getenv("MINIO_MAX_RETRIES", "3"))
+    MINIO_UPLOAD_PART_SIZE: int = int(os.getenv("MINIO_UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+    MINIO_DOWNLOAD_CHUNK_SIZE: int = int(os.getenv("MINIO_DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+    MINIO_PRESIGNED_URL_CACHE_SIZE: int = int(os.getenv("MINIO_PRESIGNED_URL_CACHE_SIZE", "10000"))
+    MINIO_PRESIGNED_URL_SAFETY_MARGIN_SECONDS: int = int(os.getenv("MINIO_PRESIGNED_URL_SAFETY_MARGIN_SECONDS", "300"))
+    DOCUMENT_TREE_SOURCE: str = os.getenv("DOCUMENT_TREE_SOURCE", "storage").strip().lower()
+    DOCUMENT_EXPORT_PREFETCH_OBJECTS: int = int(os.getenv("DOCUMENT_EXPORT_PREFETCH_OBJECTS", "4"))
+    DOCUMENT_EXPORT_QUEUE_CHUNKS: int = int(os.getenv("DOCUMENT_EXPORT_QUEUE_CHUNKS", "4"))
+    DOCUMENT_BULK_UPLOAD_WORKERS: int = int(os.getenv("DOCUMENT_BULK_UPLOAD_WORKERS", "8"))
+    DOCUMENT_ARCHIVE_MAX_MEMBERS: int = int(os.getenv("DOCUMENT_ARCHIVE_MAX_MEMBERS", "1000"))
+    DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES: int = int(os.getenv("DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES", str(1024**3)))
+    DOCUMENT_DIFF_CACHE_SIZE: int = int(os.getenv("DOCUMENT_DIFF_CACHE_SIZE", "512"))
+    SESSION_OUTPUT_OFFLOAD_BYTES: int = int(os.getenv("SESSION_OUTPUT_OFFLOAD_BYTES", "0"))
+    SESSION_OUTPUT_SNAPSHOT_INTERVAL: int = int(os.getenv("SESSION_OUTPUT_SNAPSHOT_INTERVAL", "20"))
+    SESSION_OUTPUT_ENTRY_DEPTH: int = int(os.getenv("SESSION_OUTPUT_ENTRY_DEPTH", "3"))
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+    WS_SLOW_CONSUMER_POLICY: str = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop").strip().lower()
+    WS_STREAM_DELTAS: bool = _as_bool(os.getenv("WS_STREAM_DELTAS", "true"))
+    WS_DELTA_INTERVAL_SECONDS: float = float(os.getenv("WS_DELTA_INTERVAL_SECONDS", "0.1"))
+    WS_BROADCAST_BACKEND: str = os.getenv("WS_BROADCAST_BACKEND", "memory").strip().lower()
+    WS_BROADCAST_CHANNEL_PREFIX: str = os.getenv("WS_BROADCAST_CHANNEL_PREFIX", "ws:room:")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    GRAPH_EXECUTION_MODE: str = os.getenv("GRAPH_EXECUTION_MODE", "async").strip().lower()
+    GRAPH_WORKER_POOL_SIZE: int = int(os.getenv("GRAPH_WORKER_POOL_SIZE", "8"))
+    GRAPH_STREAM_QUEUE_SIZE: int = int(os.getenv("GRAPH_STREAM_QUEUE_SIZE", "64"))
+    GRAPH_INCREMENTAL_HISTORY: bool = _as_bool(os.getenv("GRAPH_INCREMENTAL_HISTORY", "true"))
+    GRAPH_CACHE_MAX_SIZE: int = int(os.getenv("GRAPH_CACHE_MAX_SIZE", "64"))
+    GRAPH_CACHE_TTL_SECONDS: float = float(os.getenv("GRAPH_CACHE_TTL_SECONDS", "3600"))
+    GRAPH_SOURCE_FINGERPRINT_TTL_SECONDS: float = float(os.getenv("GRAPH_SOURCE_FINGERPRINT_TTL_SECONDS", "5"))
+    GRAPH_CHECKPOINTER: str = os.getenv("GRAPH_CHECKPOINTER", "database").strip().lower()
+    GRAPH_CHECKPOINT_MAX_PER_THREAD: int = int(os.getenv("GRAPH_CHECKPOINT_MAX_PER_THREAD", "20"))
+    GRAPH_CHECKPOINT_TTL_SECONDS: float = float(os.getenv("GRAPH_CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+    PHASE_SESSION_INDEX_CACHE_SIZE: int = int(os.getenv("PHASE_SESSION_INDEX_CACHE_SIZE", "1024"))
+    CONVERSATION_HISTORY_PAGE_SIZE: int = int(os.getenv("CONVERSATION_HISTORY_PAGE_SIZE", "100"))
 
 
 settings = Settings()
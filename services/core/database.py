@@ -1,6 +1,6 @@
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from services.core.config import settings
@@ -24,10 +24,73 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+_BACKFILL_MESSAGE_SEQ = """
+WITH RECURSIVE chain(id, previous_message_id, conversation_id, depth) AS (
+    SELECT m.id, m.previous_message_id, m.conversation_id, 0
+    FROM project_session_versions AS v JOIN conversation_messages AS m ON m.id = v.last_message_id
+    UNION ALL
+    SELECT m.id, m.previous_message_id, m.conversation_id, chain.depth + 1
+    FROM conversation_messages AS m JOIN chain ON m.id = chain.previous_message_id
+)
+UPDATE conversation_messages SET seq = CASE
+    WHEN id IN (SELECT id FROM chain) THEN (
+        SELECT (SELECT MAX(tail.depth) FROM chain AS tail WHERE tail.conversation_id = chain.conversation_id)
+            - chain.depth + 1
+        FROM chain WHERE chain.id = conversation_messages.id
+    )
+    ELSE -(
+        SELECT COUNT(*) FROM conversation_messages AS other
+        WHERE other.conversation_id = conversation_messages.conversation_id
+            AND other.id NOT IN (SELECT id FROM chain)
+            AND other.id <= conversation_messages.id
+    )
+END
+"""
+_CREATE_MESSAGE_SEQ_INDEX = (
+    "CREATE UNIQUE INDEX uq_conversation_message_seq ON conversation_messages (conversation_id, seq)"
+)
+
+# `create_all` only creates missing tables, so columns added to existing tables are listed here and added by
+# `init_db` when absent, followed by the statements that fill them in for existing rows. Each definition must
+# be valid for existing rows (nullable or with a default).
+_ADDED_COLUMNS: dict[str, list[tuple[str, str, tuple[str, ...]]]] = {
+    # NULL makes the project's workflow initialize once on its next read, as for a changed config.
+    "projects": [("workflow_config_hash", "VARCHAR(64)", ())],
+    # Existing sessions keep their inline output and start counting revisions from 0.
+    "project_session_versions": [
+        ("output_bucket", "VARCHAR(120)", ()),
+        ("output_object_key", "VARCHAR(1024)", ()),
+        ("revision", "INTEGER NOT NULL DEFAULT 0", ()),
+    ],
+    # Existing messages are numbered along each session's linked list, the order history used to follow.
+    # Messages off that list were never shown; they get distinct numbers below 1 so they stay hidden.
+    "conversation_messages": [
+        ("seq", "INTEGER NOT NULL DEFAULT 0", (_BACKFILL_MESSAGE_SEQ, _CREATE_MESSAGE_SEQ_INDEX)),
+    ],
+}
+
+
+def _add_missing_columns() -> None:
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table, columns in _ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, definition, backfill in columns:
+                if name in existing:
+                    continue
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+                for statement in backfill:
+                    connection.execute(text(statement))
+
+
 def init_db() -> None:
     # Import models so SQLAlchemy metadata is fully populated before create_all.
     from services.api.projects import model as _project_models  # noqa: F401
     from services.api.sessions import model as _session_models  # noqa: F401
     from services.api.users import model as _user_models  # noqa: F401
+    from services.core import checkpointer as _checkpointer_models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
@@ -20,3 +20,11 @@ class PermissionDeniedError(Exception):
 
 class ResourceConflictError(Exception):
     """Raised when a resource update/create conflicts with existing data."""
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when a requested byte range lies outside the resource."""
+
+
+class InvalidUploadError(Exception):
+    """Raised when an uploaded payload cannot be stored as documents."""
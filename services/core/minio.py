@@ -1,7 +1,18 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
+from typing import Any, BinaryIO
 from datetime import timedelta
 from urllib.parse import urlparse
 
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 from minio.versioningconfig import ENABLED, VersioningConfig
@@ -9,9 +20,34 @@ from minio.versioningconfig import ENABLED, VersioningConfig
 from services.core.config import settings
 
 
+def build_http_client() -> urllib3.PoolManager:
+    """Connection pool shared by every MinIO call in the process, sized for concurrent requests."""
+    return urllib3.PoolManager(
+        maxsize=settings.MINIO_POOL_MAXSIZE,
+        block=True,
+        timeout=urllib3.Timeout(
+            connect=settings.MINIO_CONNECT_TIMEOUT_SECONDS,
+            read=settings.MINIO_READ_TIMEOUT_SECONDS,
+        ),
+        retries=urllib3.Retry(
+            total=settings.MINIO_MAX_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+        cert_reqs="CERT_REQUIRED" if settings.MINIO_SECURE else "CERT_NONE",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+    )
+
+
 class MinioService:
     def __init__(self, client: Minio):
         self.client = client
+        # bucket name -> (exists, expires_at); shared by every request through get_minio_service().
+        self._bucket_states: dict[str, tuple[bool, float]] = {}
+        self._bucket_lock = threading.Lock()
+        # (bucket, key, version_id, expires_seconds) -> (url, reuse_until), LRU-bounded.
+        self._signed_urls: OrderedDict[tuple[str, str, str | None, int], tuple[str, float]] = OrderedDict()
+        self._signed_url_lock = threading.Lock()
 
     @classmethod
     def from_settings(cls) -> "MinioService":
@@ -24,19 +60,66 @@ class MinioService:
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
+            # A fixed region lets presigned URLs be signed locally instead of asking the bucket location first.
+            region=settings.MINIO_REGION or None,
+            http_client=build_http_client(),
         )
         return cls(client=client)
 
+    @staticmethod
+    def user_bucket_name(user_id: int) -> str:
+        return f"{settings.MINIO_BUCKET_PREFIX}{user_id}".lower()
+
+    def list_user_buckets(self) -> list[str]:
+        try:
+            buckets = self.client.list_buckets()
+        except S3Error as exc:
+            raise RuntimeError(f"Failed to list MinIO buckets: {exc}") from exc
+        prefix = settings.MINIO_BUCKET_PREFIX.lower()
+        return [bucket.name for bucket in buckets if bucket.name.startswith(prefix)]
+
+    def _cached_bucket_state(self, bucket_name: str) -> bool | None:
+        with self._bucket_lock:
+            entry = self._bucket_states.get(bucket_name)
+            if entry is None:
+                return None
+            exists, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._bucket_states.pop(bucket_name, None)
+                return None
+            return exists
+
+    def _remember_bucket_state(self, bucket_name: str, exists: bool) -> None:
+        ttl = settings.MINIO_BUCKET_CACHE_TTL_SECONDS if exists else settings.MINIO_BUCKET_NEGATIVE_CACHE_TTL_SECONDS
+        with self._bucket_lock:
+            self._bucket_states[bucket_name] = (exists, time.monotonic() + ttl)
+
     def ensure_user_bucket(self, user_id: int) -> str:
-        bucket_name = f"{settings.MINIO_BUCKET_PREFIX}{user_id}".lower()
+        """Provision the user's bucket for writing; admin calls are skipped while it is known to exist."""
+        bucket_name = self.user_bucket_name(user_id)
+        if self._cached_bucket_state(bucket_name):
+            return bucket_name
         try:
             if not self.client.bucket_exists(bucket_name):
                 self.client.make_bucket(bucket_name)
             self.client.set_bucket_versioning(bucket_name, VersioningConfig(ENABLED))
-        except S3Error as exc:
+        except (S3Error, urllib3.exceptions.HTTPError) as exc:
             raise RuntimeError(f"Failed to ensure MinIO bucket '{bucket_name}': {exc}") from exc
+        self._remember_bucket_state(bucket_name, True)
         return bucket_name
 
+    def existing_user_bucket(self, user_id: int) -> str | None:
+        """Return the user's bucket name if it exists, without creating or reconfiguring it."""
+        bucket_name = self.user_bucket_name(user_id)
+        exists = self._cached_bucket_state(bucket_name)
+        if exists is None:
+            try:
+                exists = self.client.bucket_exists(bucket_name)
+            except S3Error as exc:
+                raise RuntimeError(f"Failed to check MinIO bucket '{bucket_name}': {exc}") from exc
+            self._remember_bucket_state(bucket_name, exists)
+        return bucket_name if exists else None
+
     def put_text_object(self, bucket: str, object_key: str, content: str) -> None:
         payload = content.encode("utf-8")
         data = BytesIO(payload)
@@ -51,6 +134,13 @@ class MinioService:
         except S3Error as exc:
             raise RuntimeError(f"Failed to upload object '{bucket}/{object_key}' to MinIO: {exc}") from exc
 
+    def remove_object(self, bucket: str, object_key: str, version_id: str | None = None) -> None:
+        """Remove an object; with `version_id` only that version is deleted, without leaving a delete marker."""
+        try:
+            self.client.remove_object(bucket_name=bucket, object_name=object_key, version_id=version_id)
+        except S3Error as exc:
+            raise RuntimeError(f"Failed to remove object '{bucket}/{object_key}' from MinIO: {exc}") from exc
+
     def build_public_url(self, bucket: str, object_key: str) -> str:
         base = settings.MINIO_PUBLIC_BASE_URL.rstrip("/")
         return f"{base}/{bucket}/{object_key}"
@@ -79,35 +169,71 @@ class MinioService:
         except S3Error as exc:
             raise RuntimeError(f"Failed to upload object '{bucket}/{object_key}' to MinIO: {exc}") from exc
 
+    def put_stream_object(
+        self,
+        bucket: str,
+        object_key: str,
+        stream: BinaryIO,
+        length: int,
+        content_type: str | None = None,
+    ) -> str | None:
+        """Upload from a file-like object; anything above one part is sent as a multipart upload."""
+        try:
+            result = self.client.put_object(
+                bucket_name=bucket,
+                object_name=object_key,
+                data=stream,
+                length=length,
+                content_type=content_type or "application/octet-stream",
+                part_size=settings.MINIO_UPLOAD_PART_SIZE,
+            )
+            return getattr(result, "version_id", None)
+        except S3Error as exc:
+            raise RuntimeError(f"Failed to upload object '{bucket}/{object_key}' to MinIO: {exc}") from exc
+
     def list_object_versions(self, bucket: str, object_key: str) -> list[dict]:
+        versions = self.list_versions_by_key(bucket, object_key, include_deleted=True).get(object_key, [])
+        return [{key: value for key, value in item.items() if key != "is_delete_marker"} for item in versions]
+
+    def list_versions_by_key(self, bucket: str, prefix: str, *, include_deleted: bool = False) -> dict[str, list[dict]]:
+        """List every version under a prefix in one pass, grouped by key with the newest version first.
+
+        Delete markers stay in the version lists, flagged with `is_delete_marker`. Keys whose newest
+        entry is a delete marker are left out, as a plain listing would, unless `include_deleted`.
+        """
         try:
             objects = self.client.list_objects(
                 bucket_name=bucket,
-                prefix=object_key,
+                prefix=prefix,
                 recursive=True,
                 include_version=True,
             )
         except S3Error as exc:
-            raise RuntimeError(f"Failed to list versions for '{bucket}/{object_key}': {exc}") from exc
+            raise RuntimeError(f"Failed to list versions for '{bucket}/{prefix}': {exc}") from exc
 
-        versions: list[dict] = []
+        grouped: dict[str, list[dict]] = {}
         for obj in objects:
-            if obj.object_name != object_key:
-                continue
-            versions.append(
+            grouped.setdefault(obj.object_name, []).append(
                 {
                     "version_id": getattr(obj, "version_id", None),
                     "is_latest": bool(getattr(obj, "is_latest", False)),
+                    "is_delete_marker": bool(getattr(obj, "is_delete_marker", False)),
                     "last_modified": getattr(obj, "last_modified", None),
                     "size": getattr(obj, "size", None),
                     "etag": getattr(obj, "etag", None),
                 }
             )
-        versions.sort(
-            key=lambda item: item.get("last_modified") or 0,
-            reverse=True,
-        )
-        return versions
+
+        versions_by_key: dict[str, list[dict]] = {}
+        for object_key, versions in grouped.items():
+            versions.sort(
+                key=lambda item: (item.get("is_latest"), item.get("last_modified") or 0),
+                reverse=True,
+            )
+            if versions[0]["is_delete_marker"] and not include_deleted:
+                continue
+            versions_by_key[object_key] = versions
+        return versions_by_key
 
     def list_objects(self, bucket: str, prefix: str, recursive: bool = True) -> list[dict]:
         try:
@@ -136,13 +262,47 @@ class MinioService:
         except S3Error as exc:
             raise RuntimeError(f"Failed to read object '{bucket}/{object_key}' from MinIO: {exc}") from exc
 
-    def presigned_download_url(
+    def stat_object(self, bucket: str, object_key: str, version_id: str | None = None) -> dict | None:
+        try:
+            stat = self.client.stat_object(bucket_name=bucket, object_name=object_key, version_id=version_id)
+        except S3Error as exc:
+            if exc.code in {"NoSuchKey", "NoSuchVersion", "NoSuchBucket", "ResourceNotFound"}:
+                return None
+            raise RuntimeError(f"Failed to stat object '{bucket}/{object_key}' in MinIO: {exc}") from exc
+        return {
+            "size": stat.size,
+            "etag": stat.etag,
+            "content_type": stat.content_type,
+            "last_modified": stat.last_modified,
+            "version_id": stat.version_id,
+        }
+
+    def iter_object_chunks(
         self,
         bucket: str,
         object_key: str,
-        expires_seconds: int = 3600,
         version_id: str | None = None,
-    ) -> str:
+        offset: int = 0,
+        length: int = 0,
+    ) -> Iterator[bytes]:
+        """Yield the object (or the `offset`/`length` byte range) in chunks without buffering it whole."""
+        try:
+            response = self.client.get_object(
+                bucket_name=bucket,
+                object_name=object_key,
+                version_id=version_id,
+                offset=offset,
+                length=length,
+            )
+        except S3Error as exc:
+            raise RuntimeError(f"Failed to read object '{bucket}/{object_key}' from MinIO: {exc}") from exc
+        try:
+            yield from response.stream(settings.MINIO_DOWNLOAD_CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _sign_download_url(self, bucket: str, object_key: str, expires_seconds: int, version_id: str | None) -> str | None:
         try:
             return self.client.presigned_get_object(
                 bucket_name=bucket,
@@ -151,4 +311,110 @@ class MinioService:
                 version_id=version_id,
             )
         except S3Error:
-            return self.build_public_url(bucket, object_key)
+            return None
+
+    def presigned_download_url(
+        self,
+        bucket: str,
+        object_key: str,
+        expires_seconds: int = 3600,
+        version_id: str | None = None,
+    ) -> str:
+        return self.presigned_download_urls([(bucket, object_key, version_id)], expires_seconds=expires_seconds)[0]
+
+    def presigned_download_urls(
+        self,
+        objects: Iterable[tuple[str, str, str | None]],
+        expires_seconds: int = 3600,
+    ) -> list[str]:
+        """Sign download URLs for many (bucket, key, version_id) triples, reusing cached signatures.
+
+        A cached URL is handed out until `MINIO_PRESIGNED_URL_SAFETY_MARGIN_SECONDS` before it expires,
+        so clients always get at least that long to use it.
+        """
+        keys = [(bucket, object_key, version_id, expires_seconds) for bucket, object_key, version_id in objects]
+        reuse_for = expires_seconds - settings.MINIO_PRESIGNED_URL_SAFETY_MARGIN_SECONDS
+        now = time.monotonic()
+        urls: list[str | None] = [None] * len(keys)
+
+        if reuse_for > 0:
+            with self._signed_url_lock:
+                for index, key in enumerate(keys):
+                    entry = self._signed_urls.get(key)
+                    if entry is None:
+                        continue
+                    url, reuse_until = entry
+                    if now >= reuse_until:
+                        self._signed_urls.pop(key, None)
+                        continue
+                    self._signed_urls.move_to_end(key)
+                    urls[index] = url
+
+        signed: dict[tuple[str, str, str | None, int], str] = {}
+        for index, key in enumerate(keys):
+            if urls[index] is not None:
+                continue
+            url = signed.get(key) or self._sign_download_url(key[0], key[1], expires_seconds, key[2])
+            if url is None:
+                # Signing failed; fall back to the public URL and do not cache it.
+                urls[index] = self.build_public_url(key[0], key[1])
+                continue
+            signed[key] = url
+            urls[index] = url
+
+        if signed and reuse_for > 0:
+            reuse_until = now + reuse_for
+            with self._signed_url_lock:
+                for key, url in signed.items():
+                    self._signed_urls[key] = (url, reuse_until)
+                    self._signed_urls.move_to_end(key)
+                while len(self._signed_urls) > settings.MINIO_PRESIGNED_URL_CACHE_SIZE:
+                    self._signed_urls.popitem(last=False)
+        return urls
+
+
+class AsyncMinioService:
+    """Awaitable facade over MinioService for async handlers.
+
+    Every blocking call runs on a dedicated thread pool sized to the HTTP connection pool, so the
+    event loop never waits on MinIO and concurrent calls do not queue behind unrelated threadpool work.
+    """
+
+    def __init__(self, service: MinioService, max_workers: int = settings.MINIO_POOL_MAXSIZE) -> None:
+        self.service = service
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="minio")
+
+    async def _run(self, func: Any, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.service, name)
+        if not callable(attr):
+            return attr
+
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(attr, *args, **kwargs)
+
+        return _call
+
+    async def iter_object_chunks(self, *args: Any, **kwargs: Any) -> AsyncIterator[bytes]:
+        chunks = self.service.iter_object_chunks(*args, **kwargs)
+        done = object()
+        reading: Future | None = None
+        try:
+            while True:
+                reading = self._executor.submit(next, chunks, done)
+                chunk = await asyncio.wrap_future(reading)
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            # Cancelling the await does not stop a read already running on a worker, and closing the
+            # generator while it executes fails; let that read finish so close() releases the response.
+            if reading is not None and not reading.done():
+                try:
+                    await asyncio.wrap_future(reading)
+                except Exception:
+                    pass
+            await self._run(chunks.close)
@@ -1,8 +1,14 @@
 from functools import lru_cache
 
-from services.core.minio import MinioService
+from services.core.minio import AsyncMinioService, MinioService
 
 
 @lru_cache
 def get_minio_service() -> MinioService:
     return MinioService.from_settings()
+
+
+@lru_cache
+def get_async_minio_service() -> AsyncMinioService:
+    # Wraps the same MinioService so sync and async callers share one connection pool and bucket cache.
+    return AsyncMinioService(get_minio_service())
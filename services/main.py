@@ -8,6 +8,7 @@ from services.api.sessions.routes import router as sessions_router
 from services.api.users.routes import router as users_router
 from services.core.config import settings
 from services.core.database import init_db
+from services.websockets.manager import manager as websocket_manager
 from services.websockets.routes import router as websockets_router
 
 
@@ -36,6 +37,11 @@ def startup_event() -> None:
     init_db()
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    await websocket_manager.close()
+
+
 @app.get("/health", tags=["health"])
 def health_check():
     return {"status": "ok"}
@@ -0,0 +1,153 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from services.core.config import settings
+from utils.colored_logger import get_logger
+
+
+DeliveryHandler = Callable[[str, str, bool], Awaitable[None]]
+BROADCAST_BACKENDS = {"memory", "redis"}
+
+
+class BroadcastBus(ABC):
+    """Pub/sub transport for websocket rooms.
+
+    `publish` hands a pre-serialized frame to every worker subscribed to the conversation;
+    each worker's handler then delivers it to its local sockets. `droppable` marks best-effort
+    frames (token deltas) that a slow socket may lose in favour of the frames that follow.
+    """
+
+    def __init__(self) -> None:
+        self._handler: DeliveryHandler | None = None
+        self._logger = get_logger(f"WebSocket >> Bus[{self.__class__.__name__}]")
+
+    def bind(self, handler: DeliveryHandler) -> None:
+        self._handler = handler
+
+    async def _deliver(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        if self._handler is not None:
+            await self._handler(conversation_id, payload, droppable)
+
+    @abstractmethod
+    async def publish(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        """Send `payload` to every worker subscribed to the conversation."""
+
+    async def subscribe(self, conversation_id: str) -> None:
+        return None
+
+    async def unsubscribe(self, conversation_id: str) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class InProcessBus(BroadcastBus):
+    """Default single-worker bus: frames never leave the process."""
+
+    async def publish(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        await self._deliver(conversation_id, payload, droppable)
+
+
+class LocalBroker:
+    """In-memory stand-in for an external broker, shared by several buses to simulate workers."""
+
+    def __init__(self) -> None:
+        self.subscribers: dict[str, set["LocalBrokerBus"]] = defaultdict(set)
+
+    async def publish(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        for bus in list(self.subscribers.get(conversation_id, ())):
+            await bus._deliver(conversation_id, payload, droppable)
+
+
+class LocalBrokerBus(BroadcastBus):
+    def __init__(self, broker: LocalBroker) -> None:
+        super().__init__()
+        self._broker = broker
+
+    async def publish(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        await self._broker.publish(conversation_id, payload, droppable)
+
+    async def subscribe(self, conversation_id: str) -> None:
+        self._broker.subscribers[conversation_id].add(self)
+
+    async def unsubscribe(self, conversation_id: str) -> None:
+        subscribers = self._broker.subscribers.get(conversation_id)
+        if subscribers is None:
+            return
+        subscribers.discard(self)
+        if not subscribers:
+            self._broker.subscribers.pop(conversation_id, None)
+
+
+class RedisBus(BroadcastBus):
+    """Redis pub/sub bus: one channel per conversation, subscribed while this worker has sockets in the room."""
+
+    def __init__(self, url: str, channel_prefix: str, *, client: Any = None) -> None:
+        super().__init__()
+        if client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError as exc:
+                raise RuntimeError("WS_BROADCAST_BACKEND=redis requires the 'redis' package") from exc
+            client = redis_asyncio.from_url(url)
+
+        self._client = client
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._channel_prefix = channel_prefix
+        self._reader: asyncio.Task | None = None
+
+    def _channel(self, conversation_id: str) -> str:
+        return f"{self._channel_prefix}{conversation_id}"
+
+    async def publish(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        # The first character carries the droppable flag across workers.
+        await self._client.publish(self._channel(conversation_id), f"{int(droppable)}{payload}")
+
+    async def subscribe(self, conversation_id: str) -> None:
+        await self._pubsub.subscribe(self._channel(conversation_id))
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def unsubscribe(self, conversation_id: str) -> None:
+        await self._pubsub.unsubscribe(self._channel(conversation_id))
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._logger.exception("Redis pub/sub read failed; retrying")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode("utf-8")
+            payload = message["data"]
+            if isinstance(payload, bytes):
+                payload = payload.decode("utf-8")
+            await self._deliver(channel[len(self._channel_prefix):], payload[1:], payload[:1] == "1")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+def build_broadcast_bus() -> BroadcastBus:
+    backend = settings.WS_BROADCAST_BACKEND
+    if backend not in BROADCAST_BACKENDS:
+        raise ValueError(f"Unsupported broadcast backend '{backend}'")
+    if backend == "redis":
+        return RedisBus(settings.REDIS_URL, settings.WS_BROADCAST_CHANNEL_PREFIX)
+    return InProcessBus()
+
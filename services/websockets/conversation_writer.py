@@ -0,0 +1,379 @@
+import json
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from services.api.sessions.crud import (
+    get_session_output_entries,
+    merge_session_output,
+    pointer_segment,
+    split_session_output,
+)
+from services.api.sessions.model import (
+    ConversationMessage,
+    ProjectSessionVersion,
+    SessionOutputEntry,
+    SessionOutputSnapshot,
+)
+from services.core.config import settings
+from services.core.database import SessionLocal
+from services.core.exceptions import ResourceConflictError, ResourceNotFoundError
+from services.core.minio import MinioService
+from utils.colored_logger import get_logger
+
+
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class ConversationWriter:
+    """Per-connection writer that persists a websocket turn in a single transaction.
+
+    The session row state (message pointers, output and revision) is kept in memory
+    between turns. Each flush writes the staged messages and output patches and bumps
+    `revision` only if nobody else changed the row since it was last seen; on conflict
+    the state is reloaded and the staged turn is re-applied.
+
+    `patch_output` payloads replace top-level keys of the structured output (a `None` value
+    removes the key). Values are split into JSON-pointer `session_output_entries` rows down to
+    `SESSION_OUTPUT_ENTRY_DEPTH` levels, and a flush writes only the rows whose value changed,
+    so re-sending a whole document costs the size of what changed in it. Every
+    `SESSION_OUTPUT_SNAPSHOT_INTERVAL` revisions the fully merged output is also stored in
+    `session_output_snapshots`.
+
+    Outputs larger than `SESSION_OUTPUT_OFFLOAD_BYTES` are written to the owner's bucket
+    under a key unique to the write and the row only keeps the pointer. A writer only ever
+    removes objects it created itself, once the row no longer points at them.
+    """
+
+    def __init__(self, conversation_id: str, minio: MinioService | None = None) -> None:
+        self.conversation_id = conversation_id
+        self._logger = get_logger("WebSocket >> Writer")
+        self._minio = minio
+        self._owner_id: int | None = None
+        self._output_location: tuple[str, str] | None = None
+        self._created_locations: set[tuple[str, str]] = set()
+        self._session_version_id: str | None = None
+        self._first_message_id: str | None = None
+        self._last_message_id: str | None = None
+        self._last_seq = 0
+        self._output: str | None = None
+        self._entries: dict[str, Any] = {}
+        self._snapshot_revision = 0
+        self._revision = 0
+        self._staged: list[tuple[str, Any]] = []
+
+    def load(self) -> "ConversationWriter":
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(
+                    ProjectSessionVersion.id,
+                    ProjectSessionVersion.first_message_id,
+                    ProjectSessionVersion.last_message_id,
+                    ProjectSessionVersion.output,
+                    ProjectSessionVersion.output_bucket,
+                    ProjectSessionVersion.output_object_key,
+                    ProjectSessionVersion.revision,
+                    ProjectSessionVersion.created_by_user_id,
+                ).where(ProjectSessionVersion.conversation_id == self.conversation_id)
+            ).one_or_none()
+            if row is None:
+                raise ResourceNotFoundError(f"Conversation not found for id '{self.conversation_id}'")
+
+            last_seq = 0
+            if row.last_message_id:
+                last_seq = db.execute(
+                    select(ConversationMessage.seq).where(ConversationMessage.id == row.last_message_id)
+                ).scalar_one_or_none() or 0
+            entries = get_session_output_entries(db, [row.id]).get(row.id, {})
+            snapshot_revision = db.execute(
+                select(func.max(SessionOutputSnapshot.revision)).where(SessionOutputSnapshot.session_version_id == row.id)
+            ).scalar_one_or_none() or 0
+        finally:
+            db.close()
+
+        self._session_version_id = row.id
+        self._first_message_id = row.first_message_id
+        self._last_message_id = row.last_message_id
+        self._last_seq = last_seq
+        self._owner_id = row.created_by_user_id
+        superseded = self._output_location
+        self._output_location = (row.output_bucket, row.output_object_key) if row.output_object_key else None
+        if superseded != self._output_location:
+            # Another writer replaced our output since we last saw the row.
+            self._discard_output(superseded)
+        self._output = row.output
+        if self._output_location is not None:
+            self._output = self.minio.get_text_object(*self._output_location)
+        self._entries = entries
+        self._snapshot_revision = snapshot_revision
+        self._revision = row.revision
+        return self
+
+    @property
+    def minio(self) -> MinioService:
+        if self._minio is None:
+            from services.dependencies.minio import get_minio_service
+
+            self._minio = get_minio_service()
+        return self._minio
+
+    def _store_output(self, output: str | None, folder: str = "") -> tuple[str | None, tuple[str, str] | None]:
+        """Return the inline value and storage location for `output` at the next revision; snapshots use `folder`."""
+        threshold = settings.SESSION_OUTPUT_OFFLOAD_BYTES
+        if output is None or threshold <= 0 or len(output.encode("utf-8")) <= threshold:
+            return output, None
+        bucket = self.minio.ensure_user_bucket(self._owner_id)
+        # Writers that loaded the same revision race for it; the suffix keeps their objects apart.
+        key = f"session-outputs/{self.conversation_id}/{folder}r{self._revision + 1}-{uuid4().hex}.json"
+        self.minio.put_text_object(bucket, key, output)
+        self._created_locations.add((bucket, key))
+        return None, (bucket, key)
+
+    def _discard_output(self, location: tuple[str, str] | None) -> None:
+        """Remove `location` if this writer created it; objects of other writers are never touched."""
+        if location is None or location not in self._created_locations:
+            return
+        self._created_locations.discard(location)
+        try:
+            self.minio.remove_object(*location)
+        except RuntimeError:
+            self._logger.warning("Failed to remove stale session output %s/%s", *location)
+
+    def _snapshot_due(self, revision: int) -> bool:
+        interval = settings.SESSION_OUTPUT_SNAPSHOT_INTERVAL
+        return interval > 0 and revision - self._snapshot_revision >= interval
+
+    def _patched_entries(self, patch: dict[str, Any]) -> dict[str, Any]:
+        """Return the entries after applying `patch`, in document order."""
+        depth = max(1, settings.SESSION_OUTPUT_ENTRY_DEPTH)
+        groups: dict[str, dict[str, Any]] = {}
+        for pointer, value in self._entries.items():
+            groups.setdefault(pointer.split("/", 2)[1], {})[pointer] = value
+        for key, value in patch.items():
+            if value is None:
+                groups.pop(pointer_segment(key), None)
+            else:
+                # Assigning to an existing group keeps the key where it was in the document.
+                groups[pointer_segment(key)] = split_session_output({key: value}, depth)
+        return {pointer: value for group in groups.values() for pointer, value in group.items()}
+
+    def _write_entries(self, db: Session, entries: dict[str, Any], revision: int, now: datetime) -> None:
+        # Only changed entries are rewritten, so a document event costs the size of what changed in it;
+        # entries that merely moved get their position updated.
+        old_positions = {pointer: position for position, pointer in enumerate(self._entries)}
+        for pointer in self._entries.keys() - entries.keys():
+            db.execute(
+                delete(SessionOutputEntry).where(
+                    SessionOutputEntry.session_version_id == self._session_version_id,
+                    SessionOutputEntry.key == pointer,
+                )
+            )
+        for position, (pointer, value) in enumerate(entries.items()):
+            where = (
+                SessionOutputEntry.session_version_id == self._session_version_id,
+                SessionOutputEntry.key == pointer,
+            )
+            if pointer not in self._entries:
+                db.add(
+                    SessionOutputEntry(
+                        session_version_id=self._session_version_id,
+                        key=pointer,
+                        value=json.dumps(value, ensure_ascii=False),
+                        position=position,
+                        revision=revision,
+                        updated_at=now,
+                    )
+                )
+            elif self._entries[pointer] != value:
+                db.execute(
+                    update(SessionOutputEntry)
+                    .where(*where)
+                    .values(
+                        value=json.dumps(value, ensure_ascii=False),
+                        position=position,
+                        revision=revision,
+                        updated_at=now,
+                    )
+                )
+            elif old_positions[pointer] != position:
+                db.execute(update(SessionOutputEntry).where(*where).values(position=position))
+
+    def add_message(self, role: str, content: str) -> None:
+        self._staged.append(("message", (role, content)))
+
+    def patch_output(self, payload: dict[str, Any]) -> None:
+        self._staged.append(("output", payload))
+
+    def flush(self) -> list[str]:
+        """Write all staged operations; returns the ids of the stored messages."""
+        if not self._staged:
+            return []
+        if self._session_version_id is None:
+            self.load()
+
+        for attempt in range(1, MAX_FLUSH_ATTEMPTS + 1):
+            try:
+                message_ids = self._write_staged()
+            except ResourceConflictError:
+                self._logger.warning(
+                    "Revision conflict for conversation_id=%s attempt=%s; reloading state",
+                    self.conversation_id,
+                    attempt,
+                )
+                self.load()
+                continue
+            self._staged.clear()
+            return message_ids
+
+        raise ResourceConflictError(f"Conversation '{self.conversation_id}' kept changing during write")
+
+    def _commit_turn(
+        self,
+        messages: list[ConversationMessage],
+        message_ids: list[str],
+        values: dict[str, Any],
+        entries: dict[str, Any],
+        snapshot: SessionOutputSnapshot | None,
+        revision: int,
+        now: datetime,
+    ) -> None:
+        """Write the turn in one transaction, provided the row is still at `self._revision`."""
+        db = SessionLocal()
+        try:
+            db.add_all(messages)
+            db.flush()
+            if messages and self._last_message_id:
+                db.execute(
+                    update(ConversationMessage)
+                    .where(ConversationMessage.id == self._last_message_id)
+                    .values(next_message_id=message_ids[0])
+                )
+
+            result = db.execute(
+                update(ProjectSessionVersion)
+                .where(
+                    ProjectSessionVersion.id == self._session_version_id,
+                    ProjectSessionVersion.revision == self._revision,
+                )
+                .values(**values)
+            )
+            if result.rowcount != 1:
+                raise ResourceConflictError(f"Conversation '{self.conversation_id}' was modified concurrently")
+            self._write_entries(db, entries, revision, now)
+            if snapshot is not None:
+                db.add(snapshot)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_staged(self) -> list[str]:
+        now = datetime.now(UTC)
+        first_message_id = self._first_message_id
+        last_message_id = self._last_message_id
+        last_seq = self._last_seq
+        output = self._output
+        output_patch: dict[str, Any] = {}
+        messages: list[ConversationMessage] = []
+        message_ids: list[str] = []
+
+        for kind, value in self._staged:
+            if kind == "output":
+                output_patch.update(value)
+                continue
+
+            role, content = value
+            message = ConversationMessage(
+                id=str(uuid4()),
+                conversation_id=self.conversation_id,
+                seq=last_seq + 1,
+                role=role,
+                content=content,
+                previous_message_id=last_message_id,
+                next_message_id=None,
+                created_at=now,
+            )
+            if messages:
+                messages[-1].next_message_id = message.id
+            messages.append(message)
+            message_ids.append(message.id)
+            first_message_id = first_message_id or message.id
+            last_message_id = message.id
+            last_seq = message.seq
+            if role == "ai":
+                output = content
+
+        revision = self._revision + 1
+        entries = self._patched_entries(output_patch)
+
+        values = {
+            "first_message_id": first_message_id,
+            "last_message_id": last_message_id,
+            "revision": revision,
+            "updated_at": now,
+        }
+        output_location = self._output_location
+        # Objects written for this attempt; they are removed again if the attempt does not commit.
+        stored: list[tuple[str, str]] = []
+        snapshot: SessionOutputSnapshot | None = None
+        try:
+            if output != self._output:
+                inline_output, output_location = self._store_output(output)
+                if output_location is not None:
+                    stored.append(output_location)
+                values.update(
+                    output=inline_output,
+                    output_bucket=output_location[0] if output_location else None,
+                    output_object_key=output_location[1] if output_location else None,
+                )
+            if (entries != self._entries or output != self._output) and self._snapshot_due(revision):
+                # Snapshots follow the same offload threshold as the output itself.
+                snapshot_output, snapshot_location = self._store_output(
+                    merge_session_output(output, entries), folder="snapshots/"
+                )
+                if snapshot_location is not None:
+                    stored.append(snapshot_location)
+                snapshot = SessionOutputSnapshot(
+                    session_version_id=self._session_version_id,
+                    revision=revision,
+                    output=snapshot_output,
+                    output_bucket=snapshot_location[0] if snapshot_location else None,
+                    output_object_key=snapshot_location[1] if snapshot_location else None,
+                    created_at=now,
+                )
+            self._commit_turn(messages, message_ids, values, entries, snapshot, revision, now)
+        except IntegrityError as exc:
+            for location in stored:
+                self._discard_output(location)
+            raise ResourceConflictError(f"Conversation '{self.conversation_id}' was modified concurrently") from exc
+        except Exception:
+            for location in stored:
+                self._discard_output(location)
+            raise
+
+        if output_location != self._output_location:
+            self._discard_output(self._output_location)
+        self._output_location = output_location
+
+        self._first_message_id = first_message_id
+        self._last_message_id = last_message_id
+        self._last_seq = last_seq
+        self._output = output
+        self._entries = entries
+        if snapshot is not None:
+            self._snapshot_revision = revision
+        self._revision = revision
+        self._logger.debug(
+            "Flushed turn conversation_id=%s messages=%s revision=%s",
+            self.conversation_id,
+            len(message_ids),
+            self._revision,
+        )
+        return message_ids
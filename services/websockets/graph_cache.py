@@ -0,0 +1,180 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from pathlib import Path
+from typing import Any
+
+from services.core.config import settings
+from utils.colored_logger import get_logger
+
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SOURCE_DOC_DIRS = (ROOT_DIR / "app" / "docs", ROOT_DIR / "app" / "phase_5")
+SOURCE_DOC_SUFFIXES = {".yaml", ".yml", ".md"}
+
+
+class _CacheEntry:
+    __slots__ = ("value", "created_at", "fingerprint")
+
+    def __init__(self, value: Any, fingerprint: str | None) -> None:
+        self.value = value
+        self.created_at = time.monotonic()
+        self.fingerprint = fingerprint
+
+
+class GraphCache:
+    """Process-wide LRU/TTL cache for objects that are expensive to build per websocket connection."""
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: dict[Hashable, threading.Lock] = {}
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "builds": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+        self._logger = get_logger(f"WebSocket >> Cache[{name}]")
+
+    def get_or_create(
+        self,
+        key: Hashable,
+        factory: Callable[[], Any],
+        *,
+        fingerprint: str | None = None,
+    ) -> Any:
+        value = self._lookup(key, fingerprint)
+        if value is not None:
+            return value
+
+        # One builder per key so a reconnect storm compiles the graph once.
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            value = self._lookup(key, fingerprint, count_miss=False)
+            if value is not None:
+                return value
+
+            value = factory()
+            with self._lock:
+                self._metrics["builds"] += 1
+                self._entries[key] = _CacheEntry(value, fingerprint)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    evicted_key = next(iter(self._entries))
+                    self._drop(evicted_key)
+                    self._metrics["evictions"] += 1
+                    self._logger.debug("Evicted %s entry key=%s", self.name, evicted_key)
+            return value
+
+    def _lookup(self, key: Hashable, fingerprint: str | None, *, count_miss: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self._metrics["misses"] += 1
+                return None
+
+            if self.ttl_seconds > 0 and time.monotonic() - entry.created_at > self.ttl_seconds:
+                self._drop(key)
+                self._metrics["expirations"] += 1
+                if count_miss:
+                    self._metrics["misses"] += 1
+                return None
+
+            if fingerprint is not None and entry.fingerprint != fingerprint:
+                self._drop(key)
+                self._metrics["invalidations"] += 1
+                self._logger.info("Sources changed; invalidated %s entry key=%s", self.name, key)
+                if count_miss:
+                    self._metrics["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if count_miss:
+                self._metrics["hits"] += 1
+            return entry.value
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove an entry and its build lock; callers hold `self._lock`."""
+        self._entries.pop(key, None)
+        build_lock = self._build_locks.get(key)
+        # A held lock belongs to a rebuild in progress, which will reuse it.
+        if build_lock is not None and not build_lock.locked():
+            del self._build_locks[key]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                self._drop(key)
+            self._metrics["invalidations"] += len(keys)
+        return len(keys)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, **self._metrics}
+
+
+def _iter_source_files(paths: Iterable[Path]) -> Iterable[Path]:
+    for path in paths:
+        if path.is_file():
+            yield path
+            continue
+        if not path.is_dir():
+            continue
+        for child in path.rglob("*"):
+            if child.is_file() and child.suffix in SOURCE_DOC_SUFFIXES and "_old" not in child.parts:
+                yield child
+
+
+def source_fingerprint(*paths: Path) -> str:
+    """Hash the mtime and size of prompt and source-doc files so edits invalidate cached graphs."""
+    digest = hashlib.sha1()
+    for path in sorted(set(_iter_source_files(paths))):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+_fingerprint_cache: dict[str, tuple[float, str]] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def graph_sources_fingerprint(graph_module_path: str) -> str:
+    """Fingerprint a graph's prompt and doc sources, re-walking them at most once per TTL."""
+    ttl_seconds = settings.GRAPH_SOURCE_FINGERPRINT_TTL_SECONDS
+    now = time.monotonic()
+    with _fingerprint_lock:
+        cached = _fingerprint_cache.get(graph_module_path)
+    if cached is not None and now - cached[0] < ttl_seconds:
+        return cached[1]
+
+    package_dir = ROOT_DIR.joinpath(*graph_module_path.split(".")[:-1])
+    fingerprint = source_fingerprint(package_dir / "prompts", *SOURCE_DOC_DIRS)
+    with _fingerprint_lock:
+        _fingerprint_cache[graph_module_path] = (now, fingerprint)
+    return fingerprint
+
+
+graph_cache = GraphCache(
+    "graphs",
+    max_size=settings.GRAPH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.GRAPH_CACHE_TTL_SECONDS,
+)
+vector_store_cache = GraphCache(
+    "vector_stores",
+    max_size=settings.GRAPH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.GRAPH_CACHE_TTL_SECONDS,
+)
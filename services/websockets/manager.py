@@ -1,37 +1,88 @@
+import asyncio
 from collections import defaultdict
 import json
 from typing import Any
 
 from fastapi import WebSocket
 from starlette.websockets import WebSocketState
+
+from services.core.config import settings
+from services.websockets.bus import BroadcastBus, InProcessBus, build_broadcast_bus
 from utils.colored_logger import get_logger
 
 
+SLOW_CONSUMER_POLICIES = {"drop", "close"}
+
+
+class _SocketChannel:
+    """Bounded outbound queue of (payload, droppable) frames for one socket, drained by its own writer task."""
+
+    def __init__(self, websocket: WebSocket, max_queue_size: int) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue[tuple[str, bool]] = asyncio.Queue(maxsize=max_queue_size)
+        self.writer: asyncio.Task | None = None
+        self.dropped = 0
+
+
 class ConnectionManager:
     """Tracks active websocket connections grouped by conversation id."""
 
-    def __init__(self) -> None:
-        self._rooms: dict[str, set[WebSocket]] = defaultdict(set)
+    def __init__(
+        self,
+        max_queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        slow_consumer_policy: str = settings.WS_SLOW_CONSUMER_POLICY,
+        bus: BroadcastBus | None = None,
+    ) -> None:
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unsupported slow consumer policy '{slow_consumer_policy}'")
+        self._rooms: dict[str, dict[WebSocket, _SocketChannel]] = defaultdict(dict)
+        self._max_queue_size = max(1, max_queue_size)
+        self._send_timeout = send_timeout
+        self._slow_consumer_policy = slow_consumer_policy
+        self._bus = bus or InProcessBus()
+        self._bus.bind(self._deliver_local)
+        # Bus (un)subscribes run one at a time so a late unsubscribe cannot undo a reconnect's subscribe.
+        self._subscription_lock = asyncio.Lock()
+        self._subscribed: set[str] = set()
+        self._metrics = {
+            "frames_published": 0,
+            "frames_enqueued": 0,
+            "frames_sent": 0,
+            "dropped_frames": 0,
+            "slow_consumers_closed": 0,
+            "send_failures": 0,
+        }
         self._logger = get_logger("WebSocket >> Manager")
 
     async def connect(self, conversation_id: str, websocket: WebSocket) -> None:
         if websocket.client_state != WebSocketState.CONNECTED:
             await websocket.accept()
-        self._rooms[conversation_id].add(websocket)
+        channel = _SocketChannel(websocket, self._max_queue_size)
+        channel.writer = asyncio.create_task(self._drain(conversation_id, channel))
+        self._rooms[conversation_id][websocket] = channel
         self._logger.debug(
             "Connected socket to room conversation_id=%s active_connections=%s",
             conversation_id,
             len(self._rooms[conversation_id]),
         )
+        try:
+            await self._sync_subscription(conversation_id)
+        except BaseException:
+            self.disconnect(conversation_id, websocket)
+            raise
 
     def disconnect(self, conversation_id: str, websocket: WebSocket) -> None:
         room = self._rooms.get(conversation_id)
         if not room:
             self._logger.debug("Disconnect ignored for missing room conversation_id=%s", conversation_id)
             return
-        room.discard(websocket)
+        channel = room.pop(websocket, None)
+        if channel is not None and channel.writer is not None and channel.writer is not asyncio.current_task():
+            channel.writer.cancel()
         if not room:
             self._rooms.pop(conversation_id, None)
+            self._schedule_unsubscribe(conversation_id)
             self._logger.debug("Removed empty room conversation_id=%s", conversation_id)
             return
         self._logger.debug(
@@ -40,26 +91,149 @@ class ConnectionManager:
             len(room),
         )
 
-    async def broadcast(self, conversation_id: str, message: Any) -> None:
-        sockets = list(self._rooms.get(conversation_id, ()))
-        if not sockets:
-            self._logger.debug("Broadcast skipped; no sockets for conversation_id=%s", conversation_id)
+    @staticmethod
+    def _serialize(message: Any) -> str:
+        if isinstance(message, str):
+            return message
+        if isinstance(message, (dict, list)):
+            return json.dumps(message, ensure_ascii=False)
+        return str(message)
+
+    async def send(self, conversation_id: str, websocket: WebSocket, message: Any) -> None:
+        """Queue a frame for a single socket so it stays ordered with room broadcasts."""
+        channel = self._rooms.get(conversation_id, {}).get(websocket)
+        if channel is None:
+            await websocket.send_text(self._serialize(message))
             return
+        await self._enqueue(conversation_id, channel, self._serialize(message))
 
-        if not isinstance(message, str):
-            if isinstance(message, (dict, list)):
-                message = json.dumps(message, ensure_ascii=False)
-            else:
-                message = str(message)
+    async def broadcast(self, conversation_id: str, message: Any, *, droppable: bool = False) -> None:
+        """Publish a frame to the room; `droppable` frames are the first to go when a socket falls behind."""
+        # Serialize once; every recipient on every worker shares the same payload.
+        payload = self._serialize(message)
+        self._metrics["frames_published"] += 1
+        await self._bus.publish(conversation_id, payload, droppable)
+
+    async def _deliver_local(self, conversation_id: str, payload: str, droppable: bool = False) -> None:
+        channels = list(self._rooms.get(conversation_id, {}).values())
+        if not channels:
+            self._logger.debug("Broadcast skipped; no local sockets for conversation_id=%s", conversation_id)
+            return
 
         self._logger.debug(
-            "Broadcasting message to room conversation_id=%s recipients=%s with message: %s",
+            "Broadcasting message to room conversation_id=%s recipients=%s bytes=%s",
+            conversation_id,
+            len(channels),
+            len(payload),
+        )
+        for channel in channels:
+            await self._enqueue(conversation_id, channel, payload, droppable)
+
+    def _schedule_unsubscribe(self, conversation_id: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._sync_subscription(conversation_id))
+
+    async def _sync_subscription(self, conversation_id: str) -> None:
+        """Subscribe the bus while the room has local sockets and unsubscribe it once the room is empty."""
+        async with self._subscription_lock:
+            occupied = bool(self._rooms.get(conversation_id))
+            if occupied == (conversation_id in self._subscribed):
+                return
+            if occupied:
+                await self._bus.subscribe(conversation_id)
+                self._subscribed.add(conversation_id)
+                return
+            self._subscribed.discard(conversation_id)
+            try:
+                await self._bus.unsubscribe(conversation_id)
+            except Exception:
+                self._logger.exception("Failed to unsubscribe room conversation_id=%s", conversation_id)
+
+    async def _enqueue(
+        self, conversation_id: str, channel: _SocketChannel, payload: str, droppable: bool = False
+    ) -> None:
+        try:
+            channel.queue.put_nowait((payload, droppable))
+            self._metrics["frames_enqueued"] += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Best-effort frames give way to regular ones before the slow consumer policy applies.
+        if not droppable and self._evict_droppable(channel):
+            channel.queue.put_nowait((payload, droppable))
+            self._metrics["frames_enqueued"] += 1
+            return
+
+        if not droppable and self._slow_consumer_policy == "close":
+            self._metrics["slow_consumers_closed"] += 1
+            self._logger.warning("Closing slow consumer conversation_id=%s", conversation_id)
+            self.disconnect(conversation_id, channel.websocket)
+            await self._close_quietly(channel.websocket)
+            return
+
+        channel.dropped += 1
+        self._metrics["dropped_frames"] += 1
+        self._logger.warning(
+            "Dropped frame for slow consumer conversation_id=%s dropped=%s",
             conversation_id,
-            len(sockets),
-            message
+            channel.dropped,
         )
-        for socket in sockets:
-            await socket.send_text(message)
+
+    def _evict_droppable(self, channel: _SocketChannel) -> bool:
+        """Discard queued droppable frames to make room; True when space was freed."""
+        frames = []
+        while not channel.queue.empty():
+            frames.append(channel.queue.get_nowait())
+        kept = [frame for frame in frames if not frame[1]]
+        for frame in kept:
+            channel.queue.put_nowait(frame)
+        evicted = len(frames) - len(kept)
+        channel.dropped += evicted
+        self._metrics["dropped_frames"] += evicted
+        return evicted > 0
+
+    async def _drain(self, conversation_id: str, channel: _SocketChannel) -> None:
+        while True:
+            payload, _ = await channel.queue.get()
+            try:
+                await asyncio.wait_for(channel.websocket.send_text(payload), timeout=self._send_timeout)
+                self._metrics["frames_sent"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._metrics["send_failures"] += 1
+                self._logger.warning(
+                    "Removing dead socket conversation_id=%s error=%s",
+                    conversation_id,
+                    exc.__class__.__name__,
+                )
+                self.disconnect(conversation_id, channel.websocket)
+                await self._close_quietly(channel.websocket)
+                return
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        await self._bus.close()
+
+    def stats(self) -> dict[str, Any]:
+        depths = [channel.queue.qsize() for room in self._rooms.values() for channel in room.values()]
+        return {
+            "rooms": len(self._rooms),
+            "connections": len(depths),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            **self._metrics,
+        }
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(bus=build_broadcast_bus())
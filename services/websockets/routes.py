@@ -1,23 +1,33 @@
 import os
 import json
-from datetime import UTC, datetime
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from typing import Any
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_ollama.embeddings import OllamaEmbeddings
 from sqlalchemy import select
-from uuid import NAMESPACE_URL, uuid5
+from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
+from services.api.sessions.crud import list_conversation_messages
 from services.api.sessions.model import ConversationMessage, ProjectSessionVersion
-from services.api.sessions.services import load_phase_session_config
+from services.api.sessions.services import get_phase_session_index
 from services.api.users.crud import get_user_by_email
+from services.api.users.model import User
+from services.core.checkpointer import get_checkpointer
 from services.core.config import settings
-from services.core.database import SessionLocal
+from services.core.database import SessionLocal, get_db
 from services.core.exceptions import AuthError
 from services.core.security import decode_access_token
+from services.dependencies.auth import get_current_user
+from services.websockets.conversation_writer import ConversationWriter
+from services.websockets.graph_cache import graph_cache, graph_sources_fingerprint, vector_store_cache
 from services.websockets.manager import manager
 from utils.colored_logger import get_logger
 
@@ -26,6 +36,13 @@ router = APIRouter(prefix="/ws", tags=["websockets"])
 logger = get_logger("WebSocket >> Routes")
 load_dotenv()
 
+GRAPH_EXECUTION_MODES = {"async", "thread"}
+_graph_executor = ThreadPoolExecutor(
+    max_workers=settings.GRAPH_WORKER_POOL_SIZE,
+    thread_name_prefix="graph-stream",
+)
+_STREAM_DONE = object()
+
 
 def _mask_token(token: str | None) -> str:
     if not token:
@@ -68,128 +85,31 @@ def _extract_phase_number(phase_key: str, default_index: int) -> int:
     return default_index
 
 
-def _append_conversation_message(
-    *,
+def _get_conversation_history(
     conversation_id: str,
-    role: str,
-    content: str,
-) -> str:
-    db = SessionLocal()
-    try:
-        session_version = db.execute(
-            select(ProjectSessionVersion).where(ProjectSessionVersion.conversation_id == conversation_id)
-        ).scalar_one_or_none()
-        if session_version is None:
-            raise ValueError(f"Conversation not found for id '{conversation_id}'")
-
-        message = ConversationMessage(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            previous_message_id=session_version.last_message_id,
-            next_message_id=None,
-        )
-        db.add(message)
-        db.flush()
-
-        if session_version.last_message_id:
-            previous = db.get(ConversationMessage, session_version.last_message_id)
-            if previous is not None:
-                previous.next_message_id = message.id
-
-        if session_version.first_message_id is None:
-            session_version.first_message_id = message.id
-        session_version.last_message_id = message.id
-        session_version.updated_at = datetime.now(UTC)
-        if role == "ai":
-            session_version.output = content
-        db.commit()
-
-        logger.debug(
-            "Stored conversation message conversation_id=%s role=%s message_id=%s previous_id=%s",
-            conversation_id,
-            role,
-            message.id,
-            message.previous_message_id,
-        )
-        return message.id
-    except Exception:
-        db.rollback()
-        logger.exception(
-            "Failed to store conversation message conversation_id=%s role=%s",
-            conversation_id,
-            role,
-        )
-        raise
-    finally:
-        db.close()
-
-
-def _update_session_output_json(conversation_id: str, payload: dict[str, Any]) -> None:
-    db = SessionLocal()
-    try:
-        session_version = db.execute(
-            select(ProjectSessionVersion).where(ProjectSessionVersion.conversation_id == conversation_id)
-        ).scalar_one_or_none()
-        if session_version is None:
-            raise ValueError(f"Conversation not found for id '{conversation_id}'")
-
-        existing_output: dict[str, Any] = {}
-        if session_version.output:
-            try:
-                parsed = json.loads(session_version.output)
-                if isinstance(parsed, dict):
-                    existing_output = parsed
-                else:
-                    existing_output = {"output": parsed}
-            except json.JSONDecodeError:
-                existing_output = {"output": session_version.output}
-
-        existing_output.update(payload)
-        session_version.output = json.dumps(existing_output, ensure_ascii=False)
-        session_version.updated_at = datetime.now(UTC)
-        db.commit()
-        logger.debug("Updated session output json for conversation_id=%s", conversation_id)
-    except Exception:
-        db.rollback()
-        logger.exception("Failed to update output json for conversation_id=%s", conversation_id)
-        raise
-    finally:
-        db.close()
-
-
-def _get_conversation_history(conversation_id: str) -> list[ConversationMessage]:
+    *,
+    before_seq: int | None = None,
+    limit: int | None = None,
+) -> list[ConversationMessage]:
     db = SessionLocal()
     try:
-        session_version = db.execute(
-            select(ProjectSessionVersion).where(ProjectSessionVersion.conversation_id == conversation_id)
-        ).scalar_one_or_none()
-        if session_version is None or session_version.last_message_id is None:
-            return []
-
-        history_reverse: list[ConversationMessage] = []
-        cursor_id = session_version.last_message_id
-        while cursor_id:
-            row = db.get(ConversationMessage, cursor_id)
-            if row is None:
-                break
-            history_reverse.append(row)
-            cursor_id = row.previous_message_id
-
-        return list(reversed(history_reverse))
+        return list_conversation_messages(db, conversation_id, before_seq=before_seq, limit=limit)
     finally:
         db.close()
 
 
-def _history_payload(conversation_id: str) -> list[dict[str, str]]:
-    rows = _get_conversation_history(conversation_id)
+def _history_page(conversation_id: str, *, before_seq: int | None = None, limit: int | None = None) -> dict[str, Any]:
+    page_size = limit or settings.CONVERSATION_HISTORY_PAGE_SIZE
+    rows = _get_conversation_history(conversation_id, before_seq=before_seq, limit=page_size)
     payload: list[dict[str, str]] = []
     for row in rows:
         if row.role == "ai":
             payload.append({"ai": row.content})
         elif row.role == "human":
             payload.append({"human": row.content})
-    return payload
+
+    next_cursor = rows[0].seq if rows and rows[0].seq > 1 else None
+    return {"resp_type": "convo_hist", "content": payload, "next_cursor": next_cursor}
 
 
 def _history_langchain_messages(conversation_id: str) -> list[Any]:
@@ -204,21 +124,12 @@ def _history_langchain_messages(conversation_id: str) -> list[Any]:
 
 
 def _derive_phase_session_numbers(row: ProjectSessionVersion) -> tuple[int, int] | None:
-    config = load_phase_session_config()
-    for phase_index, (phase_key, sessions) in enumerate(config.items(), start=1):
-        phase_id = str(uuid5(NAMESPACE_URL, f"{row.project_id}:phase:{phase_key}"))
-        if phase_id != row.phase_id:
-            continue
-
-        phase_number = _extract_phase_number(phase_key, phase_index)
-        for session_index, session in enumerate(sessions, start=1):
-            session_key = session["session_id"]
-            session_id = str(uuid5(NAMESPACE_URL, f"{row.project_id}:phase:{phase_key}:session:{session_key}"))
-            if session_id == row.session_id:
-                return phase_number, session_index
+    index = get_phase_session_index(row.project_id)
+    phase = index.phases.get(row.phase_id)
+    session = index.sessions.get(row.session_id)
+    if phase is None or session is None or session["phase_id"] != row.phase_id:
         return None
-
-    return None
+    return _extract_phase_number(phase["phase_key"], phase["phase_index"]), session["session_index"]
 
 
 def _get_pgvector_connection_string() -> str:
@@ -288,16 +199,142 @@ def _load_graph_for_phase_session(
         raise ValueError(f"Unsupported session '{session_number}' for phase '{phase_number}'")
 
     module_path, needs_user_story_ids = mapping
-    graph_module = import_module(module_path)
-    vector_store = _build_vector_store(
-        phase_number=phase_number,
-        session_number=session_number,
-        project_id=project_id,
+    cache_key = (phase_number, session_number, project_id)
+
+    def _build_graph() -> Any:
+        graph_module = import_module(module_path)
+        vector_store = vector_store_cache.get_or_create(
+            cache_key,
+            lambda: _build_vector_store(
+                phase_number=phase_number,
+                session_number=session_number,
+                project_id=project_id,
+            ),
+        )
+        if needs_user_story_ids:
+            expansion = graph_module.IdeaExpansion(vector_store=vector_store, user_stories_ids=[])
+        else:
+            expansion = graph_module.IdeaExpansion(vector_store=vector_store)
+        return expansion.compile(checkpointer=get_checkpointer())
+
+    return graph_cache.get_or_create(
+        cache_key,
+        _build_graph,
+        fingerprint=graph_sources_fingerprint(module_path),
     )
 
-    if needs_user_story_ids:
-        return graph_module.IdeaExpansion(vector_store=vector_store, user_stories_ids=[]).compile()
-    return graph_module.IdeaExpansion(vector_store=vector_store).compile()
+
+@router.get("/conversations/{conversation_id}/history")
+def conversation_history(
+    conversation_id: str,
+    before: int | None = Query(default=None, ge=1),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    stmt = select(ProjectSessionVersion).where(ProjectSessionVersion.conversation_id == conversation_id)
+    session_version = db.execute(stmt).scalar_one_or_none()
+    if session_version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    if session_version.created_by_user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden for this conversation")
+    return _history_page(conversation_id, before_seq=before, limit=limit)
+
+
+@router.get("/metrics")
+def websocket_metrics(current_user: User = Depends(get_current_user)) -> dict[str, Any]:
+    return {
+        "graph_cache": graph_cache.stats(),
+        "vector_store_cache": vector_store_cache.stats(),
+        "connections": manager.stats(),
+    }
+
+
+class _StreamFailure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+async def _stream_in_worker(graph: Any, stream_kwargs: dict[str, Any]) -> AsyncIterator[Any]:
+    """Drive the synchronous graph stream on the worker pool and relay its events through a queue.
+
+    At most `GRAPH_STREAM_QUEUE_SIZE` events are buffered: the worker waits for the consumer to take
+    one before relaying the next. If the consumer stops early the worker is told to stop after its
+    current event instead of being awaited.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Any] = asyncio.Queue()
+    slots = threading.Semaphore(max(1, settings.GRAPH_STREAM_QUEUE_SIZE))
+    stop = threading.Event()
+
+    def _relay(item: Any) -> None:
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    def _produce() -> None:
+        stream = iter(())
+        try:
+            stream = graph.stream(**stream_kwargs)
+            for item in stream:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                _relay(item)
+        except BaseException as exc:
+            _relay(_StreamFailure(exc))
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+            _relay(_STREAM_DONE)
+
+    producer = loop.run_in_executor(_graph_executor, _produce)
+    finished = False
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                finished = True
+                break
+            if isinstance(item, _StreamFailure):
+                finished = True
+                raise item.exc
+            slots.release()
+            yield item
+    finally:
+        if finished:
+            await producer
+        else:
+            stop.set()
+            # Wakes the worker if it is waiting for a free slot.
+            slots.release()
+
+
+async def _iter_graph_stream(graph: Any, graph_input: dict[str, Any], config: dict[str, Any]) -> AsyncIterator[Any]:
+    stream_kwargs = {
+        "input": graph_input,
+        "config": config,
+        "subgraphs": True,
+        "stream_mode": ["values", "custom"],
+    }
+    mode = settings.GRAPH_EXECUTION_MODE
+    if mode not in GRAPH_EXECUTION_MODES:
+        raise ValueError(f"Unsupported graph execution mode '{mode}'")
+
+    if mode == "thread":
+        async for item in _stream_in_worker(graph, stream_kwargs):
+            yield item
+        return
+
+    async for item in graph.astream(**stream_kwargs):
+        yield item
+
+
+async def _thread_is_warm(graph: Any, config: dict[str, Any]) -> bool:
+    """True when the graph checkpointer already holds messages for this conversation thread."""
+    if getattr(graph, "checkpointer", None) is None:
+        return False
+    snapshot = await graph.aget_state(config)
+    return bool(snapshot.values.get("messages"))
 
 
 async def _graph_output_from_compiled_graph(
@@ -305,32 +342,39 @@ async def _graph_output_from_compiled_graph(
     message: str,
     *,
     conversation_id: str,
+    writer: ConversationWriter | None = None,
 ) -> str:
     logger.debug("Starting graph stream for conversation_id=%s", conversation_id)
-    history_messages = _history_langchain_messages(conversation_id)
+    config = {
+        "recursion_limit": 50,
+        "configurable": {"thread_id": conversation_id},
+    }
+    if settings.GRAPH_INCREMENTAL_HISTORY and await _thread_is_warm(graph, config):
+        input_messages = []
+    else:
+        input_messages = await asyncio.to_thread(_history_langchain_messages, conversation_id)
+        logger.debug(
+            "Warming thread from stored history conversation_id=%s messages=%s",
+            conversation_id,
+            len(input_messages),
+        )
+    input_messages.append(HumanMessage(content=message))
     graph_input = {
-        "messages": history_messages,
+        "messages": input_messages,
         "convo_end": False,
         "us_ids": [],
         "us_category": "",
         "total_frs": 0,
         "total_nfrs": 0,
     }
-    config = {
-        "recursion_limit": 50,
-        "configurable": {"thread_id": conversation_id},
-    }
 
     latest_output = ""
+    pending_delta: list[str] = []
+    last_delta_at = float("-inf")
 
     async def _run_stream() -> None:
-        nonlocal latest_output
-        for mode, chunks, meta in graph.stream(
-            input=graph_input,
-            config=config,
-            subgraphs=True,
-            stream_mode=["values", "custom"],
-        ):
+        nonlocal latest_output, last_delta_at
+        async for mode, chunks, meta in _iter_graph_stream(graph, graph_input, config):
             logger.debug(f"[{chunks}]: {meta}")
             # if chunks == "custom":
             #     custom_payload = meta if isinstance(meta, dict) else {}
@@ -368,7 +412,26 @@ async def _graph_output_from_compiled_graph(
             #         )
 
             if chunks == "custom":
-                if meta["type"] == "ai_response":
+                if meta["type"] == "delta":
+                    # Partial model text; the structured frame that follows supersedes it and is what gets stored.
+                    # Deltas are coalesced to one frame per interval and may be dropped for slow sockets.
+                    if settings.WS_STREAM_DELTAS:
+                        pending_delta.append(meta["response"])
+                        now = time.monotonic()
+                        if now - last_delta_at >= settings.WS_DELTA_INTERVAL_SECONDS:
+                            last_delta_at = now
+                            content = "".join(pending_delta)
+                            pending_delta.clear()
+                            await manager.broadcast(
+                                conversation_id=conversation_id,
+                                message=json.dumps({
+                                    "resp_type": "delta",
+                                    "content": content
+                                }, ensure_ascii=False),
+                                droppable=True,
+                            )
+                elif meta["type"] == "ai_response":
+                    pending_delta.clear()
                     await manager.broadcast(
                         conversation_id=conversation_id,
                         message=str({
@@ -377,13 +440,11 @@ async def _graph_output_from_compiled_graph(
                         })
                     )
                 elif meta["type"] == "document":
+                    pending_delta.clear()
                     response = meta.get("response") if isinstance(meta, dict) else None
                     document_content = response.get("document_content") if isinstance(response, dict) else None
-                    if document_content is not None:
-                        _update_session_output_json(
-                            conversation_id=conversation_id,
-                            payload={"document_content": document_content},
-                        )
+                    if document_content is not None and writer is not None:
+                        writer.patch_output({"document_content": document_content})
                     await manager.broadcast(
                         conversation_id=conversation_id,
                         message=json.dumps({
@@ -514,7 +575,8 @@ async def conversation_socket(websocket: WebSocket, conversation_id: str) -> Non
     )
     try:
         logger.debug("Initializing graph for conversation_id=%s", conversation_id)
-        graph = _load_graph_for_phase_session(
+        graph = await asyncio.to_thread(
+            _load_graph_for_phase_session,
             phase_number=phase_number,
             session_number=session_number,
             project_id=session_version.project_id,
@@ -530,31 +592,40 @@ async def conversation_socket(websocket: WebSocket, conversation_id: str) -> Non
         )
         return
 
+    writer = ConversationWriter(conversation_id)
+    try:
+        await asyncio.to_thread(writer.load)
+    except Exception:
+        logger.exception("Unable to load conversation state for conversation_id=%s", conversation_id)
+        await _close_socket(
+            websocket,
+            status.WS_1011_INTERNAL_ERROR,
+            "Unable to load conversation",
+            conversation_id=conversation_id,
+        )
+        return
+
     await manager.connect(conversation_id=conversation_id, websocket=websocket)
     logger.info("WebSocket connected to room conversation_id=%s", conversation_id)
-    await websocket.send_text(f"phase: {phase_number}, session: {session_number}")
-    history = _history_payload(conversation_id)
-    await websocket.send_text(json.dumps({"resp_type": "convo_hist", "content": history}, ensure_ascii=False))
+    await manager.send(conversation_id, websocket, f"phase: {phase_number}, session: {session_number}")
+    history = await asyncio.to_thread(_history_page, conversation_id)
+    await manager.send(conversation_id, websocket, json.dumps(history, ensure_ascii=False))
     try:
         while True:
             message = await websocket.receive_text()
             logger.debug("Received websocket message for conversation_id=%s", conversation_id)
-            _append_conversation_message(
-                conversation_id=conversation_id,
-                role="human",
-                content=message,
-            )
-            ai_output = await _graph_output_from_compiled_graph(
-                graph=graph,
-                message=message,
-                conversation_id=conversation_id,
-            )
-            if ai_output:
-                _append_conversation_message(
+            writer.add_message("human", message)
+            try:
+                ai_output = await _graph_output_from_compiled_graph(
+                    graph=graph,
+                    message=message,
                     conversation_id=conversation_id,
-                    role="ai",
-                    content=ai_output,
+                    writer=writer,
                 )
+                if ai_output:
+                    writer.add_message("ai", ai_output)
+            finally:
+                await asyncio.to_thread(writer.flush)
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected for conversation_id=%s", conversation_id)
         manager.disconnect(conversation_id=conversation_id, websocket=websocket)
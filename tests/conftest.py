@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Point the services at a throwaway SQLite database before any module reads settings.
+_DB_DIR = tempfile.mkdtemp(prefix="services-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/services.db")
+
+
+@pytest.fixture
+def database():
+    from services.core.database import Base, engine, init_db
+
+    init_db()
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def query_counter(database):
+    from sqlalchemy import event
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database, "before_cursor_execute", _record)
+    yield statements
+    event.remove(database, "before_cursor_execute", _record)
@@ -0,0 +1,162 @@
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+
+class _StubResponse:
+    def __init__(self, payload: bytes, chunk_delay: float = 0.0) -> None:
+        self.payload = payload
+        self.chunk_delay = chunk_delay
+        self.closed = False
+        self.released = False
+
+    def read(self, *args) -> bytes:
+        return self.payload
+
+    def stream(self, amt: int = 65536):
+        for start in range(0, len(self.payload), amt):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield self.payload[start:start + amt]
+
+    def close(self) -> None:
+        self.closed = True
+
+    def release_conn(self) -> None:
+        self.released = True
+
+
+class StubMinioClient:
+    """Minimal stand-in for `minio.Minio` that records calls and can simulate request and read latency."""
+
+    def __init__(self, latency: float = 0.0, chunk_delay: float = 0.0) -> None:
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.versions: dict[tuple[str, str], list[SimpleNamespace]] = {}
+        self.buckets: set[str] = set()
+        self.calls: dict[str, int] = {}
+        self.uploads: list[dict] = []
+        self.responses: list[_StubResponse] = []
+        self.in_flight_puts = 0
+        self.peak_in_flight_puts = 0
+        self._puts_lock = threading.Lock()
+
+    def _record(self, name: str, round_trip: bool = True) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if round_trip and self.latency:
+            time.sleep(self.latency)
+
+    def add_version(self, bucket: str, object_name: str, version_id: str, payload: bytes = b"") -> None:
+        self.buckets.add(bucket)
+        history = self.versions.setdefault((bucket, object_name), [])
+        for version in history:
+            version.is_latest = False
+        history.append(
+            SimpleNamespace(
+                object_name=object_name,
+                version_id=version_id,
+                is_latest=True,
+                is_delete_marker=False,
+                last_modified=datetime(2026, 1, 1, tzinfo=UTC) + timedelta(minutes=len(history)),
+                size=len(payload),
+                etag=f"etag-{version_id}",
+                payload=payload,
+            )
+        )
+
+    def add_delete_marker(self, bucket: str, object_name: str, version_id: str) -> None:
+        self.add_version(bucket, object_name, version_id)
+        marker = self.versions[(bucket, object_name)][-1]
+        marker.is_delete_marker = True
+        marker.size = None
+
+    def bucket_exists(self, bucket_name):
+        self._record("bucket_exists")
+        return bucket_name in self.buckets
+
+    def make_bucket(self, bucket_name):
+        self._record("make_bucket")
+        self.buckets.add(bucket_name)
+
+    def set_bucket_versioning(self, bucket_name, config):
+        self._record("set_bucket_versioning")
+
+    def list_buckets(self):
+        self._record("list_buckets")
+        return [SimpleNamespace(name=name) for name in sorted(self.buckets)]
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None, **kwargs):
+        with self._puts_lock:
+            self.in_flight_puts += 1
+            self.peak_in_flight_puts = max(self.peak_in_flight_puts, self.in_flight_puts)
+        try:
+            self._record("put_object")
+        finally:
+            with self._puts_lock:
+                self.in_flight_puts -= 1
+        self.uploads.append({"object_name": object_name, "data": data, "length": length, **kwargs})
+        history = self.versions.get((bucket_name, object_name), [])
+        version_id = f"{object_name}@{len(history) + 1}"
+        self.add_version(bucket_name, object_name, version_id, payload=data.read(length))
+        return SimpleNamespace(object_name=object_name, version_id=version_id, etag=f"etag-{version_id}")
+
+    def remove_object(self, bucket_name, object_name, version_id=None, **kwargs):
+        self._record("remove_object")
+        if version_id is None:
+            self.versions.pop((bucket_name, object_name), None)
+            return
+        history = [item for item in self.versions.get((bucket_name, object_name), []) if item.version_id != version_id]
+        if history:
+            history[-1].is_latest = True
+            self.versions[(bucket_name, object_name)] = history
+        else:
+            self.versions.pop((bucket_name, object_name), None)
+
+    def _version(self, bucket_name, object_name, version_id=None):
+        history = self.versions[(bucket_name, object_name)]
+        if version_id is None:
+            return history[-1]
+        return next(item for item in history if item.version_id == version_id)
+
+    def get_object(self, bucket_name, object_name, version_id=None, offset=0, length=0, **kwargs):
+        from minio.error import S3Error
+
+        self._record("get_object")
+        try:
+            payload = self._version(bucket_name, object_name, version_id).payload
+        except (KeyError, StopIteration):
+            raise S3Error("NoSuchKey", "missing", object_name, "req", "host", None) from None
+        response = _StubResponse(payload[offset:offset + length] if length else payload[offset:], self.chunk_delay)
+        self.responses.append(response)
+        return response
+
+    def stat_object(self, bucket_name, object_name, version_id=None, **kwargs):
+        from minio.error import S3Error
+
+        self._record("stat_object")
+        try:
+            version = self._version(bucket_name, object_name, version_id)
+        except (KeyError, StopIteration):
+            raise S3Error("NoSuchKey", "missing", object_name, "req", "host", None) from None
+        return SimpleNamespace(
+            size=len(version.payload),
+            etag=version.etag,
+            content_type="text/markdown",
+            last_modified=version.last_modified,
+            version_id=version.version_id,
+        )
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False, include_version=False):
+        self._record("list_objects")
+        for (bucket, object_name), history in sorted(self.versions.items()):
+            if bucket != bucket_name or not object_name.startswith(prefix or ""):
+                continue
+            if include_version:
+                yield from reversed(history)
+            else:
+                yield history[-1]
+
+    def presigned_get_object(self, bucket_name, object_name, expires=None, version_id=None):
+        self._record("presigned_get_object", round_trip=False)
+        return f"http://minio.local/{bucket_name}/{object_name}?versionId={version_id}"
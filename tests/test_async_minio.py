@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from services.core.minio import AsyncMinioService, MinioService
+from tests.minio_stub import StubMinioClient
+
+
+def _service(latency: float = 0.0) -> StubMinioClient:
+    client = StubMinioClient(latency=latency)
+    for index in range(16):
+        client.add_version("user-1", f"docs/{index}.md", f"v{index}", payload=f"document {index}".encode())
+    return client
+
+
+def test_concurrent_fetches_overlap_instead_of_serializing():
+    client = _service(latency=0.05)
+    minio = AsyncMinioService(MinioService(client), max_workers=16)
+
+    async def _fetch_all():
+        return await asyncio.gather(
+            *(minio.get_object_bytes("user-1", f"docs/{index}.md") for index in range(16))
+        )
+
+    started = time.perf_counter()
+    bodies = asyncio.run(_fetch_all())
+    elapsed = time.perf_counter() - started
+
+    assert bodies == [f"document {index}".encode() for index in range(16)]
+    assert elapsed < 16 * 0.05 / 2
+
+
+def test_async_chunk_iteration_and_attribute_passthrough(monkeypatch):
+    from services.core import minio as minio_module
+
+    monkeypatch.setattr(minio_module.settings, "MINIO_DOWNLOAD_CHUNK_SIZE", 4)
+    minio = AsyncMinioService(MinioService(_service()), max_workers=2)
+
+    async def _read():
+        return [chunk async for chunk in minio.iter_object_chunks("user-1", "docs/3.md")]
+
+    assert asyncio.run(_read()) == [b"docu", b"ment", b" 3"]
+    assert minio.service.user_bucket_name(9) == "user-9"
+    assert asyncio.run(minio.existing_user_bucket(1)) == "user-1"
+
+
+def test_cancelling_during_a_read_still_closes_the_response(monkeypatch):
+    from services.core import minio as minio_module
+
+    monkeypatch.setattr(minio_module.settings, "MINIO_DOWNLOAD_CHUNK_SIZE", 4)
+    client = StubMinioClient(chunk_delay=0.1)
+    client.add_version("user-1", "docs/slow.md", "v1", payload=b"x" * 64)
+    minio = AsyncMinioService(MinioService(client), max_workers=2)
+
+    async def _read():
+        async for _ in minio.iter_object_chunks("user-1", "docs/slow.md"):
+            pass
+
+    async def _scenario():
+        reader = asyncio.create_task(_read())
+        await asyncio.sleep(0.15)
+        reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_scenario())
+
+    assert len(client.responses) == 1
+    assert client.responses[0].closed and client.responses[0].released
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from services.websockets.bus import BroadcastBus, LocalBroker, LocalBrokerBus, RedisBus
+from services.websockets.manager import ConnectionManager
+from tests.test_connection_manager import FakeSocket
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_broadcast_reaches_sockets_on_other_workers():
+    async def _scenario():
+        broker = LocalBroker()
+        worker_a = ConnectionManager(bus=LocalBrokerBus(broker))
+        worker_b = ConnectionManager(bus=LocalBrokerBus(broker))
+        socket_a, socket_b, other_room = FakeSocket(), FakeSocket(), FakeSocket()
+        await worker_a.connect("room", socket_a)
+        await worker_b.connect("room", socket_b)
+        await worker_b.connect("other", other_room)
+
+        await worker_a.broadcast("room", {"resp_type": "ai_response", "content": "hi"})
+        await _settle()
+
+        assert socket_a.sent == socket_b.sent == ['{"resp_type": "ai_response", "content": "hi"}']
+        assert other_room.sent == []
+        assert worker_a.stats()["frames_published"] == 1
+        assert worker_b.stats()["frames_published"] == 0
+
+        worker_b.disconnect("room", socket_b)
+        await _settle()
+        assert len(broker.subscribers["room"]) == 1
+
+    asyncio.run(_scenario())
+
+
+class FakeRedis:
+    """Minimal async redis client: `publish` fans out to the pub/subs subscribed to the channel."""
+
+    def __init__(self) -> None:
+        self.pubsubs: list["FakePubSub"] = []
+        self.closed = False
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "FakePubSub":
+        pubsub = FakePubSub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    async def publish(self, channel: str, payload: str) -> int:
+        receivers = [pubsub for pubsub in self.pubsubs if channel in pubsub.channels]
+        for pubsub in receivers:
+            pubsub.messages.put_nowait({"type": "message", "channel": channel.encode(), "data": payload.encode()})
+        return len(receivers)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakePubSub:
+    def __init__(self) -> None:
+        self.channels: set[str] = set()
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+
+    async def get_message(self, timeout: float = 0.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_redis_bus_relays_frames_between_workers_through_pubsub():
+    async def _scenario():
+        redis = FakeRedis()
+        worker_a = ConnectionManager(bus=RedisBus("redis://fake", "ws:room:", client=redis))
+        bus_b = RedisBus("redis://fake", "ws:room:", client=redis)
+        worker_b = ConnectionManager(bus=bus_b)
+        socket_a, socket_b = FakeSocket(), FakeSocket()
+        await worker_a.connect("room", socket_a)
+        await worker_b.connect("room", socket_b)
+
+        await worker_a.broadcast("room", {"resp_type": "ai_response", "content": "hi"})
+        await _settle()
+        assert socket_a.sent == socket_b.sent == ['{"resp_type": "ai_response", "content": "hi"}']
+        assert redis.pubsubs[1].channels == {"ws:room:room"}
+
+        worker_b.disconnect("room", socket_b)
+        await _settle()
+        await worker_a.broadcast("room", {"resp_type": "ai_response", "content": "again"})
+        await _settle()
+        assert len(socket_a.sent) == 2 and len(socket_b.sent) == 1
+        assert redis.pubsubs[1].channels == set()
+
+        await bus_b.close()
+        assert redis.closed and redis.pubsubs[1].closed
+
+    asyncio.run(_scenario())
+
+
+def test_broadcast_bus_requires_publish():
+    class IncompleteBus(BroadcastBus):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBus()
+
+
+class SlowBrokerBus(LocalBrokerBus):
+    """Broker bus whose (un)subscribe calls take a round trip, like a real broker connection."""
+
+    async def subscribe(self, conversation_id: str) -> None:
+        await super().subscribe(conversation_id)
+        await asyncio.sleep(0.01)
+
+    async def unsubscribe(self, conversation_id: str) -> None:
+        await asyncio.sleep(0.01)
+        await super().unsubscribe(conversation_id)
+
+
+def test_reconnect_keeps_the_room_subscribed_after_a_pending_unsubscribe():
+    async def _scenario():
+        broker = LocalBroker()
+        bus = SlowBrokerBus(broker)
+        worker = ConnectionManager(bus=bus)
+        publisher = ConnectionManager(bus=LocalBrokerBus(broker))
+        first, second = FakeSocket(), FakeSocket()
+        await worker.connect("room", first)
+
+        worker.disconnect("room", first)
+        await asyncio.sleep(0)
+        await worker.connect("room", second)
+        await _settle()
+
+        assert broker.subscribers["room"] == {bus}
+        await publisher.broadcast("room", "hello")
+        await _settle()
+        assert second.sent == ["hello"]
+
+    asyncio.run(_scenario())
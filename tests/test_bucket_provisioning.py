@@ -0,0 +1,77 @@
+import urllib3
+
+from services.api.users.schema import SignupRequest
+from services.api.users.services import signup_user
+from services.core import minio as minio_module
+from services.core.database import SessionLocal
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+
+
+def test_write_path_provisions_once_per_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(minio_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(minio_module.settings, "MINIO_BUCKET_CACHE_TTL_SECONDS", 60)
+    client = StubMinioClient()
+    minio = MinioService(client)
+
+    for _ in range(5):
+        assert minio.ensure_user_bucket(7) == "user-7"
+    assert client.calls == {"bucket_exists": 1, "make_bucket": 1, "set_bucket_versioning": 1}
+
+    now[0] += 61
+    minio.ensure_user_bucket(7)
+    assert client.calls["bucket_exists"] == 2
+    assert client.calls["make_bucket"] == 1
+
+
+def test_read_path_never_mutates_and_caches_missing_buckets(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(minio_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(minio_module.settings, "MINIO_BUCKET_NEGATIVE_CACHE_TTL_SECONDS", 5)
+    client = StubMinioClient()
+    minio = MinioService(client)
+
+    assert minio.existing_user_bucket(7) is None
+    assert minio.existing_user_bucket(7) is None
+    assert client.calls == {"bucket_exists": 1}
+
+    now[0] += 6
+    client.buckets.add("user-7")
+    assert minio.existing_user_bucket(7) == "user-7"
+    assert minio.existing_user_bucket(7) == "user-7"
+    assert client.calls == {"bucket_exists": 2}
+
+
+def test_first_write_replaces_a_cached_negative_result():
+    client = StubMinioClient()
+    minio = MinioService(client)
+
+    assert minio.existing_user_bucket(3) is None
+    minio.ensure_user_bucket(3)
+    client.calls.clear()
+
+    assert minio.existing_user_bucket(3) == "user-3"
+    assert client.calls == {}
+
+
+def test_signup_succeeds_when_minio_is_unreachable(database):
+    client = StubMinioClient()
+
+    def _unreachable(bucket_name):
+        raise urllib3.exceptions.MaxRetryError(None, "http://minio:9000/", "connection refused")
+
+    client.bucket_exists = _unreachable
+    minio = MinioService(client)
+    db = SessionLocal()
+    try:
+        response = signup_user(
+            db,
+            SignupRequest(email="ada@example.com", full_name="Ada", password="password123"),
+            minio=minio,
+        )
+    finally:
+        db.close()
+
+    assert response.user.email == "ada@example.com"
+    assert response.access_token
@@ -0,0 +1,128 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from services.api.sessions import services
+from services.core.database import SessionLocal
+from services.core.exceptions import InvalidUploadError
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+from tests.test_document_index import _create_project, _phase_session
+
+
+DOCS_DIR = Path(__file__).resolve().parents[1] / "app" / "docs"
+
+
+def _docs_archive() -> tuple[io.BytesIO, dict[str, bytes]]:
+    contents = {path.name: path.read_bytes() for path in sorted(DOCS_DIR.glob("*")) if path.suffix in {".md", ".yaml"}}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("docs/", b"")
+        for name, payload in contents.items():
+            archive.writestr(f"docs/{name}", payload)
+    buffer.seek(0)
+    return buffer, contents
+
+
+def test_seeding_app_docs_is_one_parallel_call_and_reupload_is_deduplicated(database, monkeypatch):
+    monkeypatch.setattr(services.settings, "DOCUMENT_BULK_UPLOAD_WORKERS", 8)
+    archive, contents = _docs_archive()
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient(latency=0.05)
+        minio = MinioService(client)
+        upload = {"filename": "docs.zip", "stream": archive, "content_type": "application/zip", "size": None}
+
+        result = services.upload_document_files(
+            db, minio, project.id, phase_id, session_id, [upload], user, extract_archives=True
+        )
+        spools = [item["data"] for item in client.uploads]
+
+        tree = services.get_session_documents(db, minio, project.id, phase_id, session_id, user)
+        client.uploads.clear()
+        again = services.upload_document_files(
+            db, minio, project.id, phase_id, session_id, [upload], user, extract_archives=True
+        )
+    finally:
+        db.close()
+
+    documents = result["documents"]
+    assert [doc["filename"] for doc in documents] == list(contents)
+    assert all(doc["version_id"] and not doc["deduplicated"] for doc in documents)
+    assert 1 < client.peak_in_flight_puts <= 8
+    assert spools and all(spool.closed for spool in spools)
+    stored = {name.rsplit("/", 1)[-1]: history[-1].payload for (_, name), history in client.versions.items()}
+    assert stored == contents
+    assert sorted(doc.filename for doc in tree.documents) == sorted(contents)
+
+    assert client.uploads == []
+    assert [doc["version_id"] for doc in again["documents"]] == [doc["version_id"] for doc in documents]
+    assert all(doc["deduplicated"] for doc in again["documents"])
+
+
+def test_duplicate_names_in_one_upload_are_rejected(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        files = [
+            {"filename": name, "stream": io.BytesIO(b"x"), "content_type": "text/markdown", "size": 1}
+            for name in ("a.md", "nested/a.md")
+        ]
+        with pytest.raises(InvalidUploadError):
+            services.upload_document_files(db, MinioService(client), project.id, phase_id, session_id, files, user)
+    finally:
+        db.close()
+
+    assert client.uploads == []
+
+
+def _zip(members: dict[str, bytes]) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, payload in members.items():
+            archive.writestr(name, payload)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize(
+    ("setting", "limit", "members"),
+    [
+        ("DOCUMENT_ARCHIVE_MAX_MEMBERS", 3, {f"doc-{index}.md": b"x" for index in range(4)}),
+        ("DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES", 1024, {"a.md": b"\0" * 1000, "b.md": b"\0" * 1000}),
+    ],
+)
+def test_archives_over_the_limits_are_rejected_before_any_upload(database, monkeypatch, setting, limit, members):
+    monkeypatch.setattr(services.settings, setting, limit)
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        upload = {"filename": "bomb.zip", "stream": _zip(members), "content_type": "application/zip", "size": None}
+        with pytest.raises(InvalidUploadError):
+            services.upload_document_files(
+                db, MinioService(client), project.id, phase_id, session_id, [upload], user, extract_archives=True
+            )
+    finally:
+        db.close()
+
+    assert client.uploads == []
+
+
+def test_a_member_larger_than_its_declared_size_is_rejected(monkeypatch):
+    monkeypatch.setattr(services.settings, "DOCUMENT_ARCHIVE_MAX_UNCOMPRESSED_BYTES", 1024)
+    archive = _zip({"a.md": b"\0" * 4096})
+    # Understate the size in the central directory so the member slips under the declared-size limit.
+    raw = archive.getvalue()
+    central = raw.rindex(b"PK\x01\x02")
+    patched = raw[: central + 24] + (10).to_bytes(4, "little") + raw[central + 28 :]
+
+    with pytest.raises(InvalidUploadError, match="is corrupt"):
+        services._spool_archive_members(io.BytesIO(patched))
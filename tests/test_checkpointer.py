@@ -0,0 +1,152 @@
+import asyncio
+import os
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from sqlalchemy import func, select, update
+
+from services.core.checkpointer import DatabaseCheckpointSaver, GraphCheckpoint
+from services.core.database import SessionLocal
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def _reply(state: ChatState) -> ChatState:
+    return {"messages": [AIMessage(content="reply " * 200)]}
+
+
+def _compile(checkpointer):
+    builder = StateGraph(ChatState)
+    builder.add_node("REPLY", _reply)
+    builder.add_edge(START, "REPLY")
+    builder.add_edge("REPLY", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _checkpoint_count(thread_id: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(func.count()).select_from(GraphCheckpoint).where(GraphCheckpoint.thread_id == thread_id)
+        ).scalar_one()
+    finally:
+        db.close()
+
+
+def test_state_is_shared_between_saver_instances(database):
+    first_worker = _compile(DatabaseCheckpointSaver())
+    first_worker.invoke({"messages": [HumanMessage(content="hello")]}, _config("thread-1"))
+
+    second_worker = _compile(DatabaseCheckpointSaver())
+    state = second_worker.get_state(_config("thread-1"))
+    assert [message.type for message in state.values["messages"]] == ["human", "ai"]
+
+    second_worker.invoke({"messages": [HumanMessage(content="again")]}, _config("thread-1"))
+    assert len(first_worker.get_state(_config("thread-1")).values["messages"]) == 4
+
+
+def test_async_api_round_trip(database):
+    graph = _compile(DatabaseCheckpointSaver())
+
+    async def _run() -> int:
+        async for _ in graph.astream({"messages": [HumanMessage(content="hi")]}, _config("thread-async")):
+            pass
+        snapshot = await graph.aget_state(_config("thread-async"))
+        return len(snapshot.values["messages"])
+
+    assert asyncio.run(_run()) == 2
+
+
+def test_checkpoints_per_thread_are_capped(database):
+    graph = _compile(DatabaseCheckpointSaver(max_checkpoints_per_thread=3))
+    for turn in range(6):
+        graph.invoke({"messages": [HumanMessage(content=f"turn {turn}")]}, _config("thread-cap"))
+
+    assert _checkpoint_count("thread-cap") == 3
+    assert len(graph.get_state(_config("thread-cap")).values["messages"]) == 12
+
+
+def test_expired_checkpoints_are_pruned(database):
+    saver = DatabaseCheckpointSaver(ttl_seconds=60)
+    graph = _compile(saver)
+    graph.invoke({"messages": [HumanMessage(content="old")]}, _config("thread-old"))
+    graph.invoke({"messages": [HumanMessage(content="new")]}, _config("thread-new"))
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(GraphCheckpoint)
+            .where(GraphCheckpoint.thread_id == "thread-old")
+            .values(created_at=datetime.now(UTC) - timedelta(hours=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    assert saver.prune_expired() > 0
+    assert _checkpoint_count("thread-old") == 0
+    assert _checkpoint_count("thread-new") > 0
+
+
+def test_large_payloads_are_compressed(database):
+    saver = DatabaseCheckpointSaver()
+    type_, data = saver._dumps({"content": "reply " * 500})
+    assert type_.endswith("+zstd")
+    assert len(data) < 500
+    assert saver._loads(type_, data) == {"content": "reply " * 500}
+
+
+def test_list_loads_pending_writes_in_one_query(database, query_counter):
+    saver = DatabaseCheckpointSaver()
+    graph = _compile(saver)
+    for turn in range(4):
+        graph.invoke({"messages": [HumanMessage(content=f"turn {turn}")]}, _config("thread-list"))
+
+    query_counter.clear()
+    items = list(saver.list(_config("thread-list")))
+
+    assert len(items) > 4
+    assert len([sql for sql in query_counter if "FROM graph_checkpoint_writes" in sql]) == 1
+
+
+def test_concurrent_puts_from_many_threads_round_trip(database):
+    saver = DatabaseCheckpointSaver()
+    threads, puts = 8, 10
+    barrier = threading.Barrier(threads)
+    errors: list[BaseException] = []
+    payloads: dict[int, str] = {}
+
+    def _worker(worker: int) -> None:
+        try:
+            barrier.wait()
+            config = _config(f"thread-concurrent-{worker}")
+            for turn in range(puts):
+                # Poorly compressible payloads keep each thread inside zstd long enough to overlap.
+                payloads[worker] = os.urandom(256 * 1024).hex()
+                checkpoint = empty_checkpoint()
+                checkpoint["channel_values"] = {"payload": payloads[worker]}
+                config = saver.put(config, checkpoint, {"step": turn}, {})
+        except BaseException as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=_worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert errors == []
+    for worker in range(threads):
+        latest = saver.get_tuple(_config(f"thread-concurrent-{worker}"))
+        assert latest.checkpoint["channel_values"]["payload"] == payloads[worker]
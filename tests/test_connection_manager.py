@@ -0,0 +1,116 @@
+import asyncio
+
+from starlette.websockets import WebSocketState
+
+from services.websockets.manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.client_state = WebSocketState.CONNECTED
+        self.delay = delay
+        self.fail = fail
+        self.sent: list[str] = []
+        self.closed = False
+
+    async def send_text(self, payload: str) -> None:
+        if self.fail:
+            raise RuntimeError("socket is gone")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(payload)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_slow_consumer_does_not_delay_other_viewers():
+    async def _scenario():
+        manager = ConnectionManager(max_queue_size=4, send_timeout=5, slow_consumer_policy="drop")
+        fast, slow = FakeSocket(), FakeSocket(delay=1.0)
+        await manager.connect("room", fast)
+        await manager.connect("room", slow)
+
+        started = asyncio.get_running_loop().time()
+        for index in range(10):
+            await manager.broadcast("room", {"index": index})
+            await asyncio.sleep(0)
+        await _settle()
+        elapsed = asyncio.get_running_loop().time() - started
+
+        stats = manager.stats()
+        manager.disconnect("room", fast)
+        manager.disconnect("room", slow)
+        return fast.sent, elapsed, stats
+
+    fast_sent, elapsed, stats = asyncio.run(_scenario())
+
+    assert fast_sent == [f'{{"index": {index}}}' for index in range(10)]
+    assert elapsed < 0.5
+    assert stats["dropped_frames"] == 5
+    assert stats["queue_depth_max"] == 4
+
+
+def test_close_policy_evicts_slow_consumer():
+    async def _scenario():
+        manager = ConnectionManager(max_queue_size=1, send_timeout=5, slow_consumer_policy="close")
+        slow = FakeSocket(delay=1.0)
+        await manager.connect("room", slow)
+        for index in range(4):
+            await manager.broadcast("room", str(index))
+        return slow, manager.stats()
+
+    slow, stats = asyncio.run(_scenario())
+
+    assert slow.closed
+    assert stats["connections"] == 0
+    assert stats["slow_consumers_closed"] == 1
+
+
+def test_dead_socket_is_removed_without_aborting_broadcast():
+    async def _scenario():
+        manager = ConnectionManager(max_queue_size=8, send_timeout=5, slow_consumer_policy="drop")
+        dead, healthy = FakeSocket(fail=True), FakeSocket()
+        await manager.connect("room", dead)
+        await manager.connect("room", healthy)
+        await manager.broadcast("room", "first")
+        await _settle()
+        await manager.broadcast("room", "second")
+        await _settle()
+        return dead, healthy, manager.stats()
+
+    dead, healthy, stats = asyncio.run(_scenario())
+
+    assert healthy.sent == ["first", "second"]
+    assert dead.closed
+    assert stats["connections"] == 1
+    assert stats["send_failures"] == 1
+
+
+def test_final_frames_displace_queued_deltas_for_slow_consumers():
+    async def _scenario(policy: str):
+        manager = ConnectionManager(max_queue_size=4, send_timeout=5, slow_consumer_policy=policy)
+        slow = FakeSocket(delay=0.05)
+        await manager.connect("room", slow)
+        await manager.broadcast("room", "first")
+        await asyncio.sleep(0)
+        for index in range(10):
+            await manager.broadcast("room", f"delta {index}", droppable=True)
+        await manager.broadcast("room", "final")
+        for _ in range(20):
+            await asyncio.sleep(0.05)
+        manager.disconnect("room", slow)
+        return slow, manager.stats()
+
+    for policy in ("drop", "close"):
+        slow, stats = asyncio.run(_scenario(policy))
+
+        assert slow.sent[0] == "first" and slow.sent[-1] == "final"
+        assert not slow.closed
+        assert stats["slow_consumers_closed"] == 0
+        assert stats["dropped_frames"] == 10 - (len(slow.sent) - 2)
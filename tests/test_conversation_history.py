@@ -0,0 +1,98 @@
+from sqlalchemy import text
+
+from services.api.sessions.model import ProjectSessionVersion
+from services.core.database import SessionLocal, init_db
+from services.websockets import routes
+from services.websockets.conversation_writer import ConversationWriter
+
+
+def _create_conversation(conversation_id: str, version: int = 1) -> None:
+    db = SessionLocal()
+    try:
+        db.add(
+            ProjectSessionVersion(
+                project_id="project-1",
+                phase_id="phase-1",
+                session_id="session-1",
+                session_title="Requirements",
+                version=version,
+                conversation_id=conversation_id,
+                created_by_user_id=1,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_history_loads_in_one_query(database, query_counter):
+    _create_conversation("conversation-1")
+    writer = ConversationWriter("conversation-1").load()
+    for index in range(120):
+        writer.add_message("human" if index % 2 == 0 else "ai", f"message {index}")
+    writer.flush()
+
+    query_counter.clear()
+    rows = routes._get_conversation_history("conversation-1")
+
+    assert [row.seq for row in rows] == list(range(1, 121))
+    assert [row.content for row in rows][:2] == ["message 0", "message 1"]
+    assert len([sql for sql in query_counter if sql.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def test_history_cursor_pagination(database):
+    _create_conversation("conversation-2")
+    writer = ConversationWriter("conversation-2").load()
+    for index in range(5):
+        writer.add_message("human" if index % 2 == 0 else "ai", f"message {index}")
+        writer.flush()
+
+    latest = routes._history_page("conversation-2", limit=2)
+    assert latest["content"] == [{"ai": "message 3"}, {"human": "message 4"}]
+    assert latest["next_cursor"] == 4
+
+    older = routes._history_page("conversation-2", before_seq=latest["next_cursor"], limit=2)
+    assert older["content"] == [{"ai": "message 1"}, {"human": "message 2"}]
+    assert older["next_cursor"] == 2
+
+    oldest = routes._history_page("conversation-2", before_seq=older["next_cursor"], limit=2)
+    assert oldest["content"] == [{"human": "message 0"}]
+    assert oldest["next_cursor"] is None
+
+
+def test_init_db_numbers_messages_of_a_table_without_seq(database):
+    for version, conversation_id in enumerate(("conversation-3", "conversation-4"), start=1):
+        _create_conversation(conversation_id, version)
+        writer = ConversationWriter(conversation_id).load()
+        for index in range(3):
+            writer.add_message("human" if index % 2 == 0 else "ai", f"{conversation_id} {index}")
+        writer.flush()
+    columns = "id, conversation_id, role, content, previous_message_id, next_message_id, created_at"
+    with database.begin() as connection:
+        # An unlinked row, as left by an interrupted write before messages were numbered.
+        connection.execute(
+            text(
+                "INSERT INTO conversation_messages (id, conversation_id, seq, role, content, created_at) "
+                "VALUES ('orphan', 'conversation-3', 99, 'human', 'lost', '2026-01-01 00:00:00')"
+            )
+        )
+        connection.execute(text(f"CREATE TABLE legacy_messages AS SELECT {columns} FROM conversation_messages"))
+        connection.execute(text("DROP TABLE conversation_messages"))
+        connection.execute(text("ALTER TABLE legacy_messages RENAME TO conversation_messages"))
+
+    init_db()
+    init_db()
+
+    assert [row.seq for row in routes._get_conversation_history("conversation-3")] == [1, 2, 3]
+    assert [row.content for row in routes._get_conversation_history("conversation-4")] == [
+        "conversation-4 0",
+        "conversation-4 1",
+        "conversation-4 2",
+    ]
+    writer = ConversationWriter("conversation-3").load()
+    writer.add_message("ai", "after the upgrade")
+    writer.flush()
+    assert [row.content for row in routes._get_conversation_history("conversation-3")][-2:] == [
+        "conversation-3 2",
+        "after the upgrade",
+    ]
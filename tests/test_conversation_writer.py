@@ -0,0 +1,353 @@
+import json
+import threading
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import undefer
+
+from services.api.sessions.crud import get_session_output_entries, get_session_output_snapshot, merge_session_output
+from services.api.sessions.model import (
+    ConversationMessage,
+    ProjectSessionVersion,
+    SessionOutputEntry,
+    SessionOutputSnapshot,
+)
+from services.core.database import SessionLocal, init_db
+from services.websockets.conversation_writer import ConversationWriter
+
+
+def _create_conversation(conversation_id: str) -> None:
+    db = SessionLocal()
+    try:
+        db.add(
+            ProjectSessionVersion(
+                project_id="project-1",
+                phase_id="phase-1",
+                session_id="session-1",
+                session_title="Requirements",
+                version=1,
+                conversation_id=conversation_id,
+                created_by_user_id=1,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _session_row(conversation_id: str) -> ProjectSessionVersion:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(ProjectSessionVersion)
+            .where(ProjectSessionVersion.conversation_id == conversation_id)
+            .options(undefer(ProjectSessionVersion.output))
+        ).scalar_one()
+    finally:
+        db.close()
+
+
+def test_turn_is_written_in_one_transaction_without_rereads(database, query_counter):
+    _create_conversation("conversation-1")
+    writer = ConversationWriter("conversation-1").load()
+
+    query_counter.clear()
+    writer.add_message("human", "hello")
+    writer.patch_output({"document_content": {"goals": ["ship"]}})
+    writer.add_message("ai", "hi there")
+    writer.flush()
+
+    assert not [sql for sql in query_counter if sql.lstrip().upper().startswith("SELECT")]
+    assert len([sql for sql in query_counter if sql.lstrip().upper().startswith("UPDATE")]) == 1
+
+    row = _session_row("conversation-1")
+    assert row.revision == 1
+    assert row.output == "hi there"
+
+    db = SessionLocal()
+    try:
+        messages = db.execute(select(ConversationMessage).order_by(ConversationMessage.seq)).scalars().all()
+    finally:
+        db.close()
+    assert [(m.seq, m.role) for m in messages] == [(1, "human"), (2, "ai")]
+    assert messages[0].next_message_id == messages[1].id
+    assert row.first_message_id == messages[0].id
+    assert row.last_message_id == messages[1].id
+
+
+def _merged_output(conversation_id: str) -> dict:
+    row = _session_row(conversation_id)
+    db = SessionLocal()
+    try:
+        entries = get_session_output_entries(db, [row.id]).get(row.id, {})
+    finally:
+        db.close()
+    return json.loads(merge_session_output(row.output, entries))
+
+
+def test_output_patches_merge_into_json(database):
+    _create_conversation("conversation-2")
+    writer = ConversationWriter("conversation-2").load()
+
+    writer.patch_output({"document_content": "v1"})
+    writer.patch_output({"summary": "short"})
+    writer.flush()
+
+    assert _merged_output("conversation-2") == {"document_content": "v1", "summary": "short"}
+
+
+def test_output_patches_only_write_changed_keys(database, query_counter):
+    _create_conversation("conversation-5")
+    writer = ConversationWriter("conversation-5").load()
+    writer.patch_output({"document_content": "x" * 10_000, "summary": "short"})
+    writer.flush()
+
+    query_counter.clear()
+    writer.patch_output({"document_content": "x" * 10_000, "summary": "longer"})
+    writer.flush()
+    writer.patch_output({"summary": None})
+    writer.add_message("ai", "done")
+    writer.flush()
+
+    entry_writes = [sql for sql in query_counter if "session_output_entries" in sql]
+    assert [sql.split()[0] for sql in entry_writes] == ["UPDATE", "DELETE"]
+    assert _merged_output("conversation-5") == {"output": "done", "document_content": "x" * 10_000}
+
+
+def test_resending_a_whole_document_only_writes_what_changed(database, query_counter):
+    import yaml
+
+    from tests.test_document_diff import FUNC_NONFUNC
+
+    document = yaml.safe_load(FUNC_NONFUNC.read_text(encoding="utf-8"))
+    _create_conversation("conversation-10")
+    writer = ConversationWriter("conversation-10").load()
+    writer.patch_output({"document_content": document, "summary": "draft"})
+    writer.flush()
+
+    edited = json.loads(json.dumps(document))
+    edited["functional_requirements"]["FR-0002"]["priority"] = "Low"
+    query_counter.clear()
+    writer.patch_output({"document_content": edited})
+    writer.flush()
+
+    entry_writes = [sql for sql in query_counter if "session_output_entries" in sql]
+    assert [sql.split()[0] for sql in entry_writes] == ["UPDATE"]
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(SessionOutputEntry.key, SessionOutputEntry.revision)).all()
+    finally:
+        db.close()
+    assert [key for key, revision in rows if revision == 2] == ["/document_content/functional_requirements/FR-0002"]
+
+    merged = _merged_output("conversation-10")
+    assert merged == {"document_content": edited, "summary": "draft"}
+    assert list(merged) == ["document_content", "summary"]
+    assert list(merged["document_content"]) == list(document)
+    assert list(merged["document_content"]["functional_requirements"]) == list(document["functional_requirements"])
+
+
+def test_entries_keep_document_order_and_escape_pointer_tokens(database):
+    _create_conversation("conversation-11")
+    writer = ConversationWriter("conversation-11").load()
+    writer.patch_output({"document_content": {"b": {"x": 1}, "a/c": {"~y": [1, 2]}, "empty": {}}})
+    writer.flush()
+    writer.patch_output({"document_content": {"b": {"x": 1}, "new": None, "a/c": {"~y": [1, 2]}}})
+    writer.flush()
+
+    assert list(writer._entries) == ["/document_content/b/x", "/document_content/new", "/document_content/a~1c/~0y"]
+    merged = _merged_output("conversation-11")
+    assert merged == {"document_content": {"b": {"x": 1}, "new": None, "a/c": {"~y": [1, 2]}}}
+    assert list(merged["document_content"]) == ["b", "new", "a/c"]
+    reloaded = ConversationWriter("conversation-11").load()
+    assert reloaded._entries == writer._entries
+    assert list(reloaded._entries) == list(writer._entries)
+
+
+def test_snapshots_are_taken_every_interval(database, monkeypatch):
+    from services.websockets import conversation_writer
+
+    monkeypatch.setattr(conversation_writer.settings, "SESSION_OUTPUT_SNAPSHOT_INTERVAL", 2)
+    _create_conversation("conversation-6")
+    writer = ConversationWriter("conversation-6").load()
+    for index in range(5):
+        writer.patch_output({"document_content": f"v{index}"})
+        writer.flush()
+
+    row = _session_row("conversation-6")
+    db = SessionLocal()
+    try:
+        snapshots = db.execute(
+            select(SessionOutputSnapshot.revision, SessionOutputSnapshot.output).order_by(SessionOutputSnapshot.revision)
+        ).all()
+        at_three = get_session_output_snapshot(db, row.id, 3)
+    finally:
+        db.close()
+
+    assert [(revision, json.loads(output)) for revision, output in snapshots] == [
+        (2, {"document_content": "v1"}),
+        (4, {"document_content": "v3"}),
+    ]
+    assert at_three.revision == 2
+
+
+def test_concurrent_writer_conflict_is_retried(database):
+    _create_conversation("conversation-3")
+    first = ConversationWriter("conversation-3").load()
+    second = ConversationWriter("conversation-3").load()
+
+    first.add_message("human", "from first tab")
+    first.flush()
+    second.add_message("human", "from second tab")
+    second.flush()
+
+    db = SessionLocal()
+    try:
+        contents = db.execute(
+            select(ConversationMessage.content).order_by(ConversationMessage.seq)
+        ).scalars().all()
+    finally:
+        db.close()
+
+    assert contents == ["from first tab", "from second tab"]
+    assert _session_row("conversation-3").revision == 2
+
+
+def _output_keys(client, conversation_id: str) -> set[str]:
+    return {key for _, key in client.versions if key.startswith(f"session-outputs/{conversation_id}/")}
+
+
+def test_large_outputs_are_offloaded_to_object_storage(database, monkeypatch):
+    from services.core.minio import MinioService
+    from services.websockets import conversation_writer
+    from tests.minio_stub import StubMinioClient
+
+    monkeypatch.setattr(conversation_writer.settings, "SESSION_OUTPUT_OFFLOAD_BYTES", 64)
+    _create_conversation("conversation-4")
+    client = StubMinioClient()
+    writer = ConversationWriter("conversation-4", minio=MinioService(client)).load()
+
+    writer.add_message("ai", "x" * 200)
+    writer.flush()
+    row = _session_row("conversation-4")
+    assert row.output is None
+    assert row.output_bucket == "user-1"
+    assert row.output_object_key.startswith("session-outputs/conversation-4/r1-")
+    first_key = row.output_object_key
+
+    writer.add_message("ai", "y" * 200)
+    writer.flush()
+    second_key = _session_row("conversation-4").output_object_key
+    # The writer removes the object it created once the row moved past it.
+    assert _output_keys(client, "conversation-4") == {second_key} != {first_key}
+
+    reloaded = ConversationWriter("conversation-4", minio=MinioService(client)).load()
+    assert reloaded._output == "y" * 200
+
+    reloaded.add_message("ai", "short")
+    reloaded.flush()
+    row = _session_row("conversation-4")
+    assert (row.output, row.output_object_key) == ("short", None)
+    # The object belongs to the first writer, which cleans it up once it sees the row moved on.
+    assert _output_keys(client, "conversation-4") == {second_key}
+    writer.load()
+    assert _output_keys(client, "conversation-4") == set()
+
+
+def test_concurrent_offloaded_flushes_keep_the_winning_object(database, monkeypatch):
+    from services.core.minio import MinioService
+    from services.websockets import conversation_writer
+    from tests.minio_stub import StubMinioClient
+
+    monkeypatch.setattr(conversation_writer.settings, "SESSION_OUTPUT_OFFLOAD_BYTES", 64)
+    _create_conversation("conversation-8")
+    client = StubMinioClient()
+    writers = [ConversationWriter("conversation-8", minio=MinioService(client)).load() for _ in range(2)]
+    stored = threading.Barrier(2)
+    store_output = ConversationWriter._store_output
+
+    def _store_then_wait(self, output):
+        result = store_output(self, output)
+        # Both writers hold an object for revision 1 before either of them commits.
+        if self._revision == 0:
+            stored.wait(timeout=5)
+        return result
+
+    monkeypatch.setattr(ConversationWriter, "_store_output", _store_then_wait)
+    errors: list[BaseException] = []
+
+    def _flush(writer: ConversationWriter, text: str) -> None:
+        try:
+            writer.add_message("ai", text)
+            writer.flush()
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [
+        threading.Thread(target=_flush, args=(writer, letter * 200)) for writer, letter in zip(writers, "ab")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    row = _session_row("conversation-8")
+    assert row.revision == 2
+    final = ConversationWriter("conversation-8", minio=MinioService(client)).load()
+    assert final._output in {"a" * 200, "b" * 200}
+    # The loser dropped only its own first attempt; the winner's object is left to the winner.
+    assert len(_output_keys(client, "conversation-8")) == 2
+    winner = next(writer for writer in writers if writer._output_location != (row.output_bucket, row.output_object_key))
+    winner.load()
+    assert _output_keys(client, "conversation-8") == {row.output_object_key}
+
+
+def test_large_snapshots_are_offloaded_like_the_output(database, monkeypatch):
+    from services.api.sessions import services
+    from services.core.minio import MinioService
+    from services.websockets import conversation_writer
+    from tests.minio_stub import StubMinioClient
+
+    monkeypatch.setattr(conversation_writer.settings, "SESSION_OUTPUT_OFFLOAD_BYTES", 64)
+    monkeypatch.setattr(conversation_writer.settings, "SESSION_OUTPUT_SNAPSHOT_INTERVAL", 1)
+    _create_conversation("conversation-9")
+    client = StubMinioClient()
+    minio = MinioService(client)
+    writer = ConversationWriter("conversation-9", minio=minio).load()
+    for index in range(2):
+        writer.patch_output({"document_content": {"goals": [f"goal {index}"] * 20}})
+        writer.flush()
+
+    db = SessionLocal()
+    try:
+        snapshots = db.execute(select(SessionOutputSnapshot).order_by(SessionOutputSnapshot.revision)).scalars().all()
+    finally:
+        db.close()
+
+    assert [snapshot.output for snapshot in snapshots] == [None, None]
+    assert all(
+        snapshot.output_object_key.startswith("session-outputs/conversation-9/snapshots/") for snapshot in snapshots
+    )
+    # Later flushes never remove a snapshot's object.
+    assert [json.loads(services._stored_output(minio, snapshot)) for snapshot in snapshots] == [
+        {"document_content": {"goals": ["goal 0"] * 20}},
+        {"document_content": {"goals": ["goal 1"] * 20}},
+    ]
+
+
+def test_init_db_adds_the_output_columns_to_an_existing_sessions_table(database):
+    _create_conversation("conversation-7")
+    with database.begin() as connection:
+        for column in ("output_bucket", "output_object_key", "revision"):
+            connection.execute(text(f"ALTER TABLE project_session_versions DROP COLUMN {column}"))
+
+    init_db()
+    init_db()
+
+    columns = {column["name"] for column in inspect(database).get_columns("project_session_versions")}
+    assert {"output_bucket", "output_object_key", "revision"} <= columns
+    writer = ConversationWriter("conversation-7").load()
+    assert writer._revision == 0
+    writer.add_message("ai", "after the upgrade")
+    writer.flush()
+    assert _session_row("conversation-7").revision == 1
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from services.api.sessions import services
+from services.core.database import SessionLocal
+from services.core.exceptions import ResourceNotFoundError
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+from tests.test_document_index import _create_project, _phase_session
+
+
+FUNC_NONFUNC = Path(__file__).resolve().parents[1] / "app" / "docs" / "func_nonfunc.yaml"
+
+
+def test_structured_changes_use_json_pointer_paths():
+    old = {"a": {"b": 1, "c/d": [1, 2]}, "gone": True}
+    new = {"a": {"b": 2, "c/d": [1]}, "added": "x"}
+
+    changes = [change.model_dump() for change in services._structured_changes(old, new)]
+
+    assert changes == [
+        {"op": "replace", "path": "/a/b", "old": 1, "new": 2},
+        {"op": "remove", "path": "/a/c~1d/1", "old": 2, "new": None},
+        {"op": "remove", "path": "/gone", "old": True, "new": None},
+        {"op": "add", "path": "/added", "old": None, "new": "x"},
+    ]
+
+
+def test_yaml_versions_diff_structurally_and_text_versions_as_unified_diff(database):
+    original = FUNC_NONFUNC.read_text(encoding="utf-8")
+    parsed = yaml.safe_load(original)
+    parsed["functional_requirements"]["FR-0001"]["priority"] = "Low"
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        versions = [
+            services.create_text_document(db, minio, project.id, phase_id, session_id, "func_nonfunc.yaml", text, user)
+            for text in (original, yaml.safe_dump(parsed, sort_keys=False))
+        ]
+        notes = [
+            services.create_text_document(db, minio, project.id, phase_id, session_id, "notes.md", text, user)
+            for text in ("one\ntwo\nthree\n", "one\n2\nthree\n")
+        ]
+
+        structured = services.get_document_diff(
+            db, minio, project.id, phase_id, session_id, "func_nonfunc.yaml",
+            versions[0]["version_id"], versions[1]["version_id"], user,
+        )
+        client.calls.clear()
+        # A fresh service per request must still hit the cache, which holds no reference to it.
+        cached = services.get_document_diff(
+            db, MinioService(client), project.id, phase_id, session_id, "func_nonfunc.yaml",
+            versions[0]["version_id"], versions[1]["version_id"], user,
+        )
+        reads_after_cache_hit = client.calls.get("get_object", 0)
+        unified = services.get_document_diff(
+            db, minio, project.id, phase_id, session_id, "notes.md",
+            notes[0]["version_id"], notes[1]["version_id"], user, context_lines=0,
+        )
+    finally:
+        db.close()
+
+    assert structured.format == "structured" and not structured.identical
+    assert [(c.op, c.path, c.old, c.new) for c in structured.changes] == [
+        ("replace", "/functional_requirements/FR-0001/priority", "High", "Low")
+    ]
+    assert cached is structured
+    assert reads_after_cache_hit == 0
+    assert not any(isinstance(part, MinioService) for key in services._diff_cache for part in key)
+    assert len(structured.model_dump_json()) * 50 < len(original)
+
+    assert unified.format == "unified"
+    assert unified.unified_diff.splitlines()[2:] == ["@@ -2 +2 @@", "-two", "+2"]
+
+
+def test_unknown_or_foreign_versions_are_not_found(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        minio = MinioService(StubMinioClient())
+        own = services.create_text_document(db, minio, project.id, phase_id, session_id, "a.md", "a", user)
+        other = services.create_text_document(db, minio, project.id, phase_id, session_id, "b.md", "b", user)
+
+        for bad_version_id in ("missing", other["version_id"]):
+            with pytest.raises(ResourceNotFoundError):
+                services.get_document_diff(
+                    db, minio, project.id, phase_id, session_id, "a.md", own["version_id"], bad_version_id, user
+                )
+    finally:
+        db.close()
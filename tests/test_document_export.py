@@ -0,0 +1,100 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from services.api.sessions import services
+from services.core.database import SessionLocal
+from services.core.minio import AsyncMinioService, MinioService
+from tests.minio_stub import StubMinioClient
+from tests.test_document_index import _create_project, _phase_session
+
+
+async def _collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+def test_export_streams_the_latest_version_of_every_document(database, monkeypatch):
+    monkeypatch.setattr(services.settings, "DOCUMENT_EXPORT_PREFETCH_OBJECTS", 2)
+    monkeypatch.setattr(services.settings, "DOCUMENT_EXPORT_QUEUE_CHUNKS", 1)
+    monkeypatch.setattr(services.settings, "MINIO_DOWNLOAD_CHUNK_SIZE", 64)
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        for filename, content in (("a.md", "old"), ("a.md", "new" * 100), ("b.md", "b"), ("c.md", "c" * 500)):
+            services.create_text_document(db, minio, project.id, phase_id, session_id, filename, content, user)
+
+        export = services.open_document_export(db, minio, AsyncMinioService(minio, max_workers=4), project.id, user)
+    finally:
+        db.close()
+
+    chunks = asyncio.run(_collect(export["chunks"]))
+    assert export["media_type"] == "application/zip"
+    assert "project-documents.zip" in export["headers"]["Content-Disposition"]
+    assert len(chunks) > 3
+
+    session = services.get_phase_session_index(project.id).sessions[session_id]
+    prefix = f"{session['phase_key']}/{session['session_key']}/"
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == [f"{prefix}a.md", f"{prefix}b.md", f"{prefix}c.md"]
+        assert archive.read(f"{prefix}a.md") == b"new" * 100
+        assert archive.read(f"{prefix}c.md") == b"c" * 500
+
+
+def test_export_aborts_when_an_object_cannot_be_read(database, monkeypatch):
+    # The index still lists the document after its object disappeared from storage.
+    monkeypatch.setattr(services.settings, "DOCUMENT_TREE_SOURCE", "index")
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        services.create_text_document(db, minio, project.id, phase_id, session_id, "a.md", "content", user)
+        client.versions.clear()
+
+        export = services.open_document_export(db, minio, AsyncMinioService(minio, max_workers=2), project.id, user)
+    finally:
+        db.close()
+
+    with pytest.raises(RuntimeError, match="Failed to read object"):
+        asyncio.run(_collect(export["chunks"]))
+
+
+# Abort once the readers block on `put`, as they do behind a slow client, or while each is still
+# inside a slow `next()` on a worker thread.
+@pytest.mark.parametrize(("chunk_delay", "abort_after"), [(0.0, 0.1), (0.05, 0.02)])
+def test_an_aborted_export_stops_every_reader_and_releases_its_response(
+    database, monkeypatch, chunk_delay, abort_after
+):
+    monkeypatch.setattr(services.settings, "DOCUMENT_EXPORT_PREFETCH_OBJECTS", 2)
+    monkeypatch.setattr(services.settings, "DOCUMENT_EXPORT_QUEUE_CHUNKS", 1)
+    monkeypatch.setattr(services.settings, "MINIO_DOWNLOAD_CHUNK_SIZE", 16)
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient(chunk_delay=chunk_delay)
+        minio = MinioService(client)
+        for filename in ("a.md", "b.md", "c.md"):
+            services.create_text_document(db, minio, project.id, phase_id, session_id, filename, "x" * 4096, user)
+
+        export = services.open_document_export(db, minio, AsyncMinioService(minio, max_workers=4), project.id, user)
+    finally:
+        db.close()
+
+    async def _abort_after_first_chunk() -> set[asyncio.Task]:
+        chunks = export["chunks"]
+        await anext(chunks)
+        await asyncio.sleep(abort_after)
+        await chunks.aclose()
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(_abort_after_first_chunk()) == set()
+    # The object being archived plus the two prefetched behind it.
+    assert len(client.responses) == 3
+    assert all(response.closed and response.released for response in client.responses)
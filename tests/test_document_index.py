@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from services.api.projects.model import Project, Workspace
+from services.api.sessions import services
+from services.api.sessions.model import ProjectDocument
+from services.api.users.model import User
+from services.core.database import SessionLocal
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+
+
+def _create_project(db) -> tuple[User, Project]:
+    user = User(email="owner@example.com", full_name="Owner", hashed_password="x")
+    db.add(user)
+    db.flush()
+    workspace = Workspace(name="Workspace", owner_id=user.id)
+    db.add(workspace)
+    db.flush()
+    project = Project(workspace_id=workspace.id, name="Project", owner_id=user.id)
+    db.add(project)
+    db.commit()
+    return user, project
+
+
+def _phase_session(project_id: str) -> tuple[str, str]:
+    index = services.get_phase_session_index(project_id)
+    session_id, session = next(iter(index.sessions.items()))
+    return session["phase_id"], session_id
+
+
+def test_tree_is_served_from_the_index_without_listing_storage(database, query_counter, monkeypatch):
+    monkeypatch.setattr(services.settings, "DOCUMENT_TREE_SOURCE", "index")
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        for filename, content in (("a.md", "one"), ("a.md", "two"), ("b.md", "three")):
+            services.create_text_document(db, minio, project.id, phase_id, session_id, filename, content, user)
+
+        client.calls.clear()
+        query_counter.clear()
+        tree = services.get_project_document_tree(db, minio, project.id, user)
+    finally:
+        db.close()
+
+    assert "list_objects" not in client.calls and "bucket_exists" not in client.calls
+    assert len([sql for sql in query_counter if "FROM documents" in sql]) == 1
+    documents = tree.phases[0].sessions[0].documents
+    assert [(doc.filename, doc.current_version) for doc in documents] == [("a.md", 2), ("b.md", 1)]
+    assert documents[0].version_id.endswith("a.md@2")
+
+
+def test_reconciliation_backfills_objects_written_outside_the_api(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        services.create_text_document(db, minio, project.id, phase_id, session_id, "a.md", "one", user)
+
+        bucket = minio.user_bucket_name(user.id)
+        prefix = f"{project.workspace_id}/{project.id}/{phase_id}/{session_id}/documents/"
+        client.add_version(bucket, prefix + "a.md", "external-1")
+        client.add_version(bucket, prefix + "c.md", "external-2")
+        client.add_version(bucket, f"{project.workspace_id}/missing-project/{phase_id}/{session_id}/documents/x.md", "x")
+
+        assert services.reconcile_document_index(db, minio, bucket) == 2
+
+        documents = {doc.filename: doc for doc in db.execute(select(ProjectDocument)).scalars().all()}
+        assert set(documents) == {"a.md", "c.md"}
+        assert documents["a.md"].current_version == 2
+        assert documents["a.md"].current_version_id == "external-1"
+        assert [version.created_by_user_id for version in documents["a.md"].versions] == [user.id, None]
+    finally:
+        db.close()
+
+
+def test_identical_reupload_keeps_the_latest_version(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+
+        first = services.create_text_document(db, minio, project.id, phase_id, session_id, "arch.md", "same", user)
+        client.calls.clear()
+        again = services.create_text_document(db, minio, project.id, phase_id, session_id, "arch.md", "same", user)
+
+        assert again["deduplicated"] and not first["deduplicated"]
+        assert again["version_id"] == first["version_id"]
+        assert "put_object" not in client.calls and "bucket_exists" not in client.calls
+
+        changed = services.create_text_document(db, minio, project.id, phase_id, session_id, "arch.md", "edited", user)
+        reverted = services.create_text_document(db, minio, project.id, phase_id, session_id, "arch.md", "same", user)
+        assert not changed["deduplicated"] and not reverted["deduplicated"]
+
+        document = db.execute(select(ProjectDocument)).scalar_one()
+        assert document.current_version == 3
+        assert document.current_version_id == reverted["version_id"]
+
+        bucket = minio.user_bucket_name(user.id)
+        services.reconcile_document_index(db, minio, bucket)
+        db.refresh(document)
+        assert document.current_sha256 == document.versions[-1].content_sha256 is not None
+    finally:
+        db.close()
+
+
+def test_a_failed_index_write_removes_the_stored_version(database, monkeypatch):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+        first = services.create_text_document(db, minio, project.id, phase_id, session_id, "a.md", "one", user)
+
+        def _fail(*args, **kwargs):
+            raise OperationalError("INSERT INTO document_versions", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(services, "add_document_version", _fail)
+        with pytest.raises(OperationalError):
+            services.create_text_document(db, minio, project.id, phase_id, session_id, "a.md", "two", user)
+    finally:
+        db.close()
+
+    [history] = client.versions.values()
+    assert [version.version_id for version in history] == [first["version_id"]]
+    assert history[-1].is_latest
@@ -0,0 +1,65 @@
+from services.api.sessions.services import _documents_from_prefix
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+
+
+BUCKET = "user-1"
+PREFIX = "ws/proj/"
+
+
+def _key(phase_id: str, session_id: str, filename: str) -> str:
+    return f"ws/proj/{phase_id}/{session_id}/documents/{filename}"
+
+
+def test_tree_is_built_from_one_versioned_listing():
+    client = StubMinioClient()
+    for doc in range(20):
+        for version in range(3):
+            client.add_version(BUCKET, _key("phase-a", f"session-{doc % 4}", f"doc-{doc}.md"), f"v{doc}-{version}")
+    client.add_version(BUCKET, "ws/proj/phase-a/session-0/notes.txt", "ignored")
+
+    grouped = _documents_from_prefix(MinioService(client), BUCKET, PREFIX)
+
+    assert client.calls["list_objects"] == 1
+    assert client.calls["presigned_get_object"] == 20
+    documents = [doc for sessions in grouped.values() for docs in sessions.values() for doc in docs]
+    assert len(documents) == 20
+    doc = next(doc for doc in documents if doc.filename == "doc-5.md")
+    assert doc.current_version == 3
+    assert doc.version_id == doc.current_version_id == "v5-2"
+    assert doc.download_url.endswith("versionId=v5-2")
+    assert [d.filename for d in grouped["phase-a"]["session-1"]] == ["doc-1.md", "doc-13.md", "doc-17.md", "doc-5.md", "doc-9.md"]
+
+
+def test_object_versions_come_from_the_same_grouping():
+    client = StubMinioClient()
+    client.add_version(BUCKET, _key("p", "s", "a.md"), "1")
+    client.add_version(BUCKET, _key("p", "s", "a.md"), "2")
+    client.add_version(BUCKET, _key("p", "s", "a.md.bak"), "x")
+
+    versions = MinioService(client).list_object_versions(BUCKET, _key("p", "s", "a.md"))
+
+    assert [item["version_id"] for item in versions] == ["2", "1"]
+    assert [item["is_latest"] for item in versions] == [True, False]
+
+
+def test_delete_markers_are_listed_as_before():
+    client = StubMinioClient()
+    client.add_version(BUCKET, _key("p", "s", "kept.md"), "k1")
+    client.add_delete_marker(BUCKET, _key("p", "s", "kept.md"), "k2")
+    client.add_version(BUCKET, _key("p", "s", "kept.md"), "k3")
+    client.add_version(BUCKET, _key("p", "s", "deleted.md"), "d1")
+    client.add_delete_marker(BUCKET, _key("p", "s", "deleted.md"), "d2")
+    minio = MinioService(client)
+
+    grouped = _documents_from_prefix(minio, BUCKET, PREFIX)
+    kept_versions = minio.list_object_versions(BUCKET, _key("p", "s", "kept.md"))
+    deleted_versions = minio.list_object_versions(BUCKET, _key("p", "s", "deleted.md"))
+
+    # The tree hides keys whose newest entry is a delete marker and counts markers in the version number.
+    [kept] = grouped["p"]["s"]
+    assert (kept.filename, kept.current_version, kept.version_id) == ("kept.md", 3, "k3")
+    # Version listings keep every entry, delete markers included, even for deleted keys.
+    assert [item["version_id"] for item in kept_versions] == ["k3", "k2", "k1"]
+    assert [item["version_id"] for item in deleted_versions] == ["d2", "d1"]
+    assert all("is_delete_marker" not in item for item in kept_versions + deleted_versions)
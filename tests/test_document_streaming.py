@@ -0,0 +1,68 @@
+import tempfile
+
+import pytest
+
+from services.api.sessions import services
+from services.core.database import SessionLocal
+from services.core.exceptions import RangeNotSatisfiableError, ResourceNotFoundError
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+from tests.test_document_index import _create_project, _phase_session
+
+
+def test_parse_byte_range():
+    assert services._parse_byte_range(None, 100) is None
+    assert services._parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert services._parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert services._parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert services._parse_byte_range("bytes=50-500", 100) == (50, 99)
+    assert services._parse_byte_range("bytes=0-1,5-6", 100) is None
+    assert services._parse_byte_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        services._parse_byte_range("bytes=100-", 100)
+
+
+def test_upload_streams_from_the_spool_and_download_serves_ranges(database):
+    payload = bytes(range(256)) * 64
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        client = StubMinioClient()
+        minio = MinioService(client)
+
+        with tempfile.SpooledTemporaryFile(max_size=1024) as spool:
+            spool.write(payload)
+            spool.seek(0)
+            uploaded = services.upload_document_file(
+                db, minio, project.id, phase_id, session_id, "arch.bin", spool, "application/octet-stream", user
+            )
+            upload = client.uploads[-1]
+            assert upload["data"] is spool
+            assert upload["length"] == len(payload)
+            assert upload["part_size"] == services.settings.MINIO_UPLOAD_PART_SIZE
+
+            again = services.upload_document_file(
+                db, minio, project.id, phase_id, session_id, "arch.bin", spool, "application/octet-stream", user
+            )
+            assert again["deduplicated"] and again["version_id"] == uploaded["version_id"]
+            assert len(client.uploads) == 1
+
+        download = services.open_document_download(
+            db, minio, project.id, phase_id, session_id, "arch.bin", uploaded["version_id"], user, range_header="bytes=1000-1999"
+        )
+        assert download["status_code"] == 206
+        assert download["headers"]["Content-Range"] == f"bytes 1000-1999/{len(payload)}"
+        assert b"".join(download["chunks"]) == payload[1000:2000]
+
+        full = services.open_document_download(
+            db, minio, project.id, phase_id, session_id, "arch.bin", uploaded["version_id"], user
+        )
+        assert full["status_code"] == 200
+        assert full["headers"]["Content-Length"] == str(len(payload))
+        assert b"".join(full["chunks"]) == payload
+
+        with pytest.raises(ResourceNotFoundError):
+            services.open_document_download(db, minio, project.id, phase_id, session_id, "missing.bin", "v1", user)
+    finally:
+        db.close()
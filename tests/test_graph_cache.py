@@ -0,0 +1,84 @@
+import threading
+import time
+
+from services.websockets import graph_cache as graph_cache_module
+from services.websockets.graph_cache import GraphCache, source_fingerprint
+
+
+def test_lru_eviction_and_metrics():
+    cache = GraphCache("test", max_size=2, ttl_seconds=0)
+
+    cache.get_or_create(("p", 1), lambda: "one")
+    cache.get_or_create(("p", 2), lambda: "two")
+    assert cache.get_or_create(("p", 1), lambda: "rebuilt") == "one"
+    cache.get_or_create(("p", 3), lambda: "three")
+
+    assert cache.get_or_create(("p", 2), lambda: "two-again") == "two-again"
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = GraphCache("test", max_size=4, ttl_seconds=10)
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+    cache.get_or_create("key", lambda: "first")
+    clock[0] += 11
+    assert cache.get_or_create("key", lambda: "second") == "second"
+    assert cache.stats()["expirations"] == 1
+
+    cache.get_or_create("other", lambda: "value")
+    clock[0] += 11
+    assert cache._lookup("other", None) is None
+    assert "other" not in cache._build_locks
+
+
+def test_fingerprint_change_invalidates(tmp_path):
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("v1", encoding="utf-8")
+    cache = GraphCache("test", max_size=4, ttl_seconds=0)
+
+    first = cache.get_or_create("key", object, fingerprint=source_fingerprint(tmp_path))
+    assert cache.get_or_create("key", object, fingerprint=source_fingerprint(tmp_path)) is first
+
+    prompt.write_text("version two", encoding="utf-8")
+    assert cache.get_or_create("key", object, fingerprint=source_fingerprint(tmp_path)) is not first
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_concurrent_misses_build_once():
+    cache = GraphCache("test", max_size=4, ttl_seconds=0)
+    builds: list[int] = []
+
+    def _factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return "graph"
+
+    threads = [threading.Thread(target=cache.get_or_create, args=("key", _factory)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+
+
+def test_graph_sources_fingerprint_is_reused_within_its_ttl(monkeypatch):
+    clock = [1000.0]
+    walks: list[tuple] = []
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(graph_cache_module.settings, "GRAPH_SOURCE_FINGERPRINT_TTL_SECONDS", 5)
+    monkeypatch.setattr(graph_cache_module, "_fingerprint_cache", {})
+    monkeypatch.setattr(graph_cache_module, "source_fingerprint", lambda *paths: walks.append(paths) or str(len(walks)))
+
+    module_path = "app.phase_5.session_01.graph"
+    first = graph_cache_module.graph_sources_fingerprint(module_path)
+    clock[0] += 4
+    assert graph_cache_module.graph_sources_fingerprint(module_path) == first
+    clock[0] += 2
+    assert graph_cache_module.graph_sources_fingerprint(module_path) != first
+    assert len(walks) == 2
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from services.websockets import routes
+
+
+TURNS = 8
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+    convo_end: bool
+
+
+def _prompt_tokens(messages: list[BaseMessage]) -> int:
+    return sum(len(str(message.content).split()) for message in messages)
+
+
+def _build_chat_graph(prompt_sizes: list[int]):
+    def _reply(state: ChatState) -> ChatState:
+        prompt_sizes.append(_prompt_tokens(state["messages"]))
+        return {"messages": [AIMessage(content="noted with thanks")], "convo_end": False}
+
+    builder = StateGraph(ChatState)
+    builder.add_node("REPLY", _reply)
+    builder.add_edge(START, "REPLY")
+    builder.add_edge("REPLY", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _run_turns(monkeypatch, graph, stored: list[BaseMessage], turns: int) -> list[int]:
+    graph_inputs: list[int] = []
+    real_iter = routes._iter_graph_stream
+
+    async def _recording_iter(graph, graph_input, config):
+        graph_inputs.append(_prompt_tokens(graph_input["messages"]))
+        async for item in real_iter(graph, graph_input, config):
+            yield item
+
+    monkeypatch.setattr(routes, "_iter_graph_stream", _recording_iter)
+    monkeypatch.setattr(routes, "_history_langchain_messages", lambda conversation_id: list(stored))
+
+    async def _conversation() -> None:
+        for turn in range(turns):
+            text = f"user turn {turn} says hello"
+            output = await routes._graph_output_from_compiled_graph(graph, text, conversation_id="thread-1")
+            stored.extend([HumanMessage(content=text), AIMessage(content=output)])
+
+    asyncio.run(_conversation())
+    return graph_inputs
+
+
+def test_warm_thread_only_sends_new_message(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_INCREMENTAL_HISTORY", True)
+    prompt_sizes: list[int] = []
+
+    graph_inputs = _run_turns(monkeypatch, _build_chat_graph(prompt_sizes), [], TURNS)
+
+    # Every turn hands the graph one human message, so input tokens stay flat.
+    assert len(set(graph_inputs)) == 1
+    # The prompt grows by exactly one exchange per turn (linear), never by the whole history.
+    growth = {later - earlier for earlier, later in zip(prompt_sizes, prompt_sizes[1:])}
+    assert growth == {prompt_sizes[0] + len("noted with thanks".split())}
+
+
+def test_cold_thread_is_warmed_from_stored_history(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_INCREMENTAL_HISTORY", True)
+    stored = [HumanMessage(content="earlier question"), AIMessage(content="earlier answer")]
+    prompt_sizes: list[int] = []
+
+    graph_inputs = _run_turns(monkeypatch, _build_chat_graph(prompt_sizes), stored, 2)
+
+    history_tokens = _prompt_tokens([HumanMessage(content="earlier question"), AIMessage(content="earlier answer")])
+    new_message_tokens = len("user turn 0 says hello".split())
+    reply_tokens = len("noted with thanks".split())
+
+    assert graph_inputs == [history_tokens + new_message_tokens, new_message_tokens]
+    assert prompt_sizes == [
+        history_tokens + new_message_tokens,
+        history_tokens + new_message_tokens + reply_tokens + new_message_tokens,
+    ]
+
+
+def test_full_history_mode_duplicates_messages(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_INCREMENTAL_HISTORY", False)
+    prompt_sizes: list[int] = []
+
+    graph_inputs = _run_turns(monkeypatch, _build_chat_graph(prompt_sizes), [], TURNS)
+
+    assert graph_inputs[-1] > graph_inputs[0] * TURNS
@@ -0,0 +1,54 @@
+import pytest
+
+from services.api.sessions import services
+from services.api.sessions.model import ProjectSessionVersion
+from services.core.exceptions import ResourceNotFoundError
+from services.websockets.routes import _derive_phase_session_numbers
+
+
+PROJECT_ID = "project-index"
+
+
+def test_index_matches_derived_ids():
+    config = services.load_phase_session_config()
+    index = services.get_phase_session_index(PROJECT_ID)
+
+    assert index is services.get_phase_session_index(PROJECT_ID)
+    for phase_key, sessions in config.items():
+        phase_id = services._phase_uuid(PROJECT_ID, phase_key)
+        assert services._phase_key_from_id(PROJECT_ID, phase_id) == phase_key
+        for session in sessions:
+            session_id = services._session_uuid(PROJECT_ID, phase_key, session["session_id"])
+            assert services._session_details_from_ids(PROJECT_ID, phase_id, session_id) == (
+                session["session_id"],
+                session["session_title"],
+            )
+
+
+def test_lookups_reject_unknown_or_foreign_ids():
+    config = services.load_phase_session_config()
+    phase_key = next(iter(config))
+    phase_id = services._phase_uuid(PROJECT_ID, phase_key)
+    foreign_session_id = services._session_uuid("other-project", phase_key, config[phase_key][0]["session_id"])
+
+    with pytest.raises(ResourceNotFoundError):
+        services._phase_key_from_id(PROJECT_ID, "missing")
+    with pytest.raises(ResourceNotFoundError):
+        services._phase_key_from_id("other-project", phase_id)
+    with pytest.raises(ResourceNotFoundError):
+        services._session_details_from_ids(PROJECT_ID, phase_id, foreign_session_id)
+
+
+def test_websocket_path_uses_the_same_index():
+    config = services.load_phase_session_config()
+    phase_key = "phase_5"
+    session = config[phase_key][-1]
+    row = ProjectSessionVersion(
+        project_id=PROJECT_ID,
+        phase_id=services._phase_uuid(PROJECT_ID, phase_key),
+        session_id=services._session_uuid(PROJECT_ID, phase_key, session["session_id"]),
+    )
+
+    phase_number, session_number = _derive_phase_session_numbers(row)
+
+    assert (phase_number, session_number) == (5, len(config[phase_key]))
@@ -0,0 +1,56 @@
+from services.core import minio as minio_module
+from services.core.minio import MinioService
+from tests.minio_stub import StubMinioClient
+
+
+def _clock(monkeypatch, start: float = 1000.0) -> list[float]:
+    now = [start]
+    monkeypatch.setattr(minio_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_batch_signing_reuses_cached_urls_until_the_safety_margin(monkeypatch):
+    now = _clock(monkeypatch)
+    monkeypatch.setattr(minio_module.settings, "MINIO_PRESIGNED_URL_SAFETY_MARGIN_SECONDS", 300)
+    client = StubMinioClient()
+    minio = MinioService(client)
+    objects = [("user-1", f"docs/{index}.md", f"v{index}") for index in range(50)]
+
+    first = minio.presigned_download_urls(objects)
+    second = minio.presigned_download_urls(objects)
+
+    assert first == second
+    assert client.calls["presigned_get_object"] == 50
+    assert minio.presigned_download_url("user-1", "docs/7.md", version_id="v7") == first[7]
+    assert client.calls["presigned_get_object"] == 50
+
+    now[0] += 3600 - 300
+    minio.presigned_download_urls(objects[:10])
+    assert client.calls["presigned_get_object"] == 60
+
+
+def test_cache_is_bounded_and_keyed_on_version(monkeypatch):
+    _clock(monkeypatch)
+    monkeypatch.setattr(minio_module.settings, "MINIO_PRESIGNED_URL_CACHE_SIZE", 3)
+    client = StubMinioClient()
+    minio = MinioService(client)
+
+    assert minio.presigned_download_url("user-1", "a.md", version_id="1") != minio.presigned_download_url(
+        "user-1", "a.md", version_id="2"
+    )
+    minio.presigned_download_urls([("user-1", f"{index}.md", None) for index in range(5)])
+
+    assert len(minio._signed_urls) == 3
+    assert ("user-1", "4.md", None, 3600) in minio._signed_urls
+
+
+def test_short_lived_urls_are_never_cached(monkeypatch):
+    _clock(monkeypatch)
+    client = StubMinioClient()
+    minio = MinioService(client)
+
+    minio.presigned_download_url("user-1", "a.md", expires_seconds=60, version_id="1")
+    minio.presigned_download_url("user-1", "a.md", expires_seconds=60, version_id="1")
+
+    assert client.calls["presigned_get_object"] == 2
+    assert not minio._signed_urls
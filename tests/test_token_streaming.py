@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Annotated, TypedDict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from services.websockets import routes
+from utils.model_streaming import StreamingNodeMixin
+
+
+REPLY = "Tell me more about the users who hit this problem"
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+    convo_end: bool
+
+
+class _ReplyNode(StreamingNodeMixin):
+    """Minimal phase node: the same mixin the session `BaseNode`s use, over a fake chat model."""
+
+    def __init__(self) -> None:
+        self.model_chain = GenericFakeChatModel(messages=iter([AIMessage(content=REPLY)]))
+        self.responses: list[AIMessage] = []
+
+    def __call__(self, state: ChatState) -> ChatState:
+        response = self._stream_model_response(state["messages"])
+        self.responses.append(response)
+        get_stream_writer()({"type": "ai_response", "response": response.content})
+        return {"messages": [response], "convo_end": False}
+
+
+def _build_streaming_graph(node: _ReplyNode):
+    builder = StateGraph(ChatState)
+    builder.add_node("REPLY", node)
+    builder.add_edge(START, "REPLY")
+    builder.add_edge("REPLY", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _run_turn(monkeypatch, interval: float) -> tuple[list[tuple[str, bool]], _ReplyNode]:
+    frames: list[tuple[str, bool]] = []
+
+    async def _broadcast(conversation_id, message, *, droppable=False):
+        frames.append((message, droppable))
+
+    monkeypatch.setattr(routes.manager, "broadcast", _broadcast)
+    monkeypatch.setattr(routes, "_history_langchain_messages", lambda conversation_id: [])
+    monkeypatch.setattr(routes.settings, "WS_DELTA_INTERVAL_SECONDS", interval)
+
+    node = _ReplyNode()
+    asyncio.run(routes._graph_output_from_compiled_graph(_build_streaming_graph(node), "hi", conversation_id="thread-1"))
+    return frames, node
+
+
+def test_deltas_are_broadcast_before_the_final_message(monkeypatch):
+    frames, node = _run_turn(monkeypatch, interval=0)
+
+    deltas = [json.loads(frame) for frame, _ in frames[:-1]]
+    assert len(deltas) > 1
+    assert {frame["resp_type"] for frame in deltas} == {"delta"}
+    assert "".join(frame["content"] for frame in deltas) == REPLY
+    assert all(droppable for _, droppable in frames[:-1])
+    final, final_droppable = frames[-1]
+    assert "'resp_type': 'message'" in final and not final_droppable
+    [response] = node.responses
+    assert type(response) is AIMessage and response.content == REPLY
+    assert response.usage_metadata["total_tokens"] > 0
+
+
+def test_deltas_are_coalesced_within_the_interval(monkeypatch):
+    frames, _ = _run_turn(monkeypatch, interval=60)
+
+    # The first token goes out at once; the rest are superseded by the final message.
+    assert [json.loads(frame)["content"] for frame, _ in frames[:-1]] == [REPLY.split()[0]]
+    assert "'resp_type': 'message'" in frames[-1][0]
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from typing import TypedDict
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, START, StateGraph
+
+from services.websockets import routes
+
+
+TURN_SECONDS = 0.4
+CONVERSATIONS = 5
+
+
+class SlowState(TypedDict):
+    messages: list
+    convo_end: bool
+
+
+def _slow_node(state: SlowState) -> SlowState:
+    # Blocking call standing in for a synchronous LLM completion.
+    time.sleep(TURN_SECONDS)
+    get_stream_writer()({"type": "ai_response", "response": "done"})
+    return {"messages": state["messages"], "convo_end": True}
+
+
+def _build_slow_graph():
+    builder = StateGraph(SlowState)
+    builder.add_node("SLOW", _slow_node)
+    builder.add_edge(START, "SLOW")
+    builder.add_edge("SLOW", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+@pytest.mark.parametrize("mode", ["async", "thread"])
+def test_conversations_run_concurrently(monkeypatch, mode):
+    broadcasts: list[str] = []
+
+    async def _record_broadcast(conversation_id: str, message: str) -> None:
+        broadcasts.append(conversation_id)
+
+    monkeypatch.setattr(routes.settings, "GRAPH_EXECUTION_MODE", mode)
+    monkeypatch.setattr(routes, "_history_langchain_messages", lambda conversation_id: [])
+    monkeypatch.setattr(routes.manager, "broadcast", _record_broadcast)
+
+    graph = _build_slow_graph()
+
+    async def _run_all() -> float:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                routes._graph_output_from_compiled_graph(graph, "hello", conversation_id=f"conversation-{index}")
+                for index in range(CONVERSATIONS)
+            )
+        )
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(_run_all())
+
+    assert sorted(broadcasts) == sorted(f"conversation-{index}" for index in range(CONVERSATIONS))
+    # Sequential execution would take CONVERSATIONS * TURN_SECONDS; concurrent runs finish near the slowest one.
+    assert elapsed < TURN_SECONDS * 2.5
+
+
+def test_event_loop_stays_responsive_during_turn(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_EXECUTION_MODE", "thread")
+    monkeypatch.setattr(routes, "_history_langchain_messages", lambda conversation_id: [])
+
+    async def _noop_broadcast(conversation_id: str, message: str) -> None:
+        return None
+
+    monkeypatch.setattr(routes.manager, "broadcast", _noop_broadcast)
+    graph = _build_slow_graph()
+
+    async def _measure_tick_gap() -> float:
+        turn = asyncio.create_task(routes._graph_output_from_compiled_graph(graph, "hello", conversation_id="solo"))
+        worst_gap = 0.0
+        while not turn.done():
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst_gap = max(worst_gap, time.perf_counter() - tick)
+        await turn
+        return worst_gap
+
+    assert asyncio.run(_measure_tick_gap()) < TURN_SECONDS / 2
+
+
+def test_unknown_execution_mode_is_rejected(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_EXECUTION_MODE", "fork")
+    monkeypatch.setattr(routes, "_history_langchain_messages", lambda conversation_id: [])
+
+    with pytest.raises(ValueError):
+        asyncio.run(routes._graph_output_from_compiled_graph(_build_slow_graph(), "hi", conversation_id="x"))
+
+
+class _CountingGraph:
+    def __init__(self, events: int | None = None) -> None:
+        self.produced = 0
+        self.events = events
+        self.closed = threading.Event()
+
+    def stream(self, **kwargs):
+        try:
+            while self.events is None or self.produced < self.events:
+                self.produced += 1
+                yield ("custom", {"type": "delta", "response": str(self.produced)})
+                time.sleep(0.001)
+        finally:
+            self.closed.set()
+
+
+def test_worker_stream_is_bounded_by_a_slow_consumer(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_STREAM_QUEUE_SIZE", 4)
+    graph = _CountingGraph(events=200)
+
+    async def _consume_slowly() -> tuple[int, int]:
+        stream = routes._stream_in_worker(graph, {})
+        consumed = 0
+        peak_ahead = 0
+        async for _ in stream:
+            consumed += 1
+            await asyncio.sleep(0.002 if consumed > 5 else 0.05)
+            peak_ahead = max(peak_ahead, graph.produced - consumed)
+        return consumed, peak_ahead
+
+    consumed, peak_ahead = asyncio.run(_consume_slowly())
+
+    assert consumed == 200
+    assert peak_ahead <= 4 + 1
+
+
+def test_cancelled_worker_stream_stops_without_waiting_for_the_turn(monkeypatch):
+    monkeypatch.setattr(routes.settings, "GRAPH_STREAM_QUEUE_SIZE", 2)
+    graph = _CountingGraph()
+
+    async def _cancel_after_first_event() -> float:
+        async def _consume() -> None:
+            async for _ in routes._stream_in_worker(graph, {}):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(_consume())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.perf_counter() - started
+
+    assert asyncio.run(_cancel_after_first_event()) < 1.0
+    assert graph.closed.wait(timeout=2)
+    assert graph.produced <= 2 + 2
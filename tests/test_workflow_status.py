@@ -0,0 +1,178 @@
+import re
+
+from sqlalchemy import func, inspect, select, text
+
+from services.api.sessions import services
+from services.api.sessions.model import ProjectSessionVersion
+from services.api.users.model import User
+from services.core.database import SessionLocal, init_db
+from tests.test_document_index import _create_project, _phase_session
+
+
+def test_status_and_history_reads_do_not_write_once_initialized(database, query_counter):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        services.initialize_project_workflow(db, project, user.id)
+        assert project.workflow_config_hash == services.workflow_config_hash()
+
+        query_counter.clear()
+        status = services.get_project_phase_session_status(db, project.id, user)
+        history = services.get_session_version_history(db, project.id, phase_id, session_id, user, previous_only=False)
+        statements = list(query_counter)
+    finally:
+        db.close()
+
+    assert not [sql for sql in statements if sql.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+    # Only the status query's grouped MAX, no per-session next-version lookups.
+    assert len([sql for sql in statements if "max(" in sql.lower()]) == 1
+    assert all(session.latest_version == 1 for phase in status.phases for session in phase.sessions)
+    assert [row.version for row in history.versions] == [1]
+
+
+def test_a_config_change_initializes_the_workflow_once(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        assert project.workflow_config_hash is None
+
+        services.get_project_phase_session_status(db, project.id, user)
+        assert project.workflow_config_hash == services.workflow_config_hash()
+
+        project.workflow_config_hash = "stale"
+        db.commit()
+        services.get_project_phase_session_status(db, project.id, user)
+        rows = db.execute(
+            select(func.count()).select_from(ProjectSessionVersion).where(ProjectSessionVersion.project_id == project.id)
+        ).scalar_one()
+    finally:
+        db.close()
+
+    assert project.workflow_config_hash == services.workflow_config_hash()
+    assert rows == sum(len(sessions) for sessions in services.load_phase_session_config().values())
+
+
+def test_init_db_adds_the_config_hash_column_to_an_existing_projects_table(database):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        user_id, project_id = user.id, project.id
+    finally:
+        db.close()
+    with database.begin() as connection:
+        connection.execute(text("ALTER TABLE projects DROP COLUMN workflow_config_hash"))
+
+    init_db()
+    init_db()
+
+    assert "workflow_config_hash" in {column["name"] for column in inspect(database).get_columns("projects")}
+    db = SessionLocal()
+    try:
+        services.get_project_phase_session_status(db, project_id, db.get(User, user_id))
+        project = services.get_project_by_id(db, project_id)
+        assert project.workflow_config_hash == services.workflow_config_hash()
+    finally:
+        db.close()
+
+
+def _history_queries(db, query_counter, user, project, phase_id, session_id) -> int:
+    query_counter.clear()
+    history = services.get_session_version_history(db, project.id, phase_id, session_id, user, previous_only=False)
+    assert all(row.approved_by for row in history.versions if row.version > 1)
+    return len(query_counter)
+
+
+def test_history_query_count_does_not_grow_with_versions(database, query_counter):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        services.initialize_project_workflow(db, project, user.id)
+        approvers = [User(email=f"approver{index}@example.com", full_name="Approver", hashed_password="x") for index in range(6)]
+        db.add_all(approvers)
+        db.flush()
+
+        def _add_versions(versions):
+            for version in versions:
+                db.add(
+                    ProjectSessionVersion(
+                        project_id=project.id,
+                        phase_id=phase_id,
+                        session_id=session_id,
+                        session_title="Session",
+                        version=version,
+                        conversation_id=f"conversation-{version}",
+                        approval_status="approved",
+                        approved_by_user_id=approvers[version % len(approvers)].id,
+                        created_by_user_id=user.id,
+                    )
+                )
+            db.commit()
+
+        _add_versions(range(2, 4))
+        few = _history_queries(db, query_counter, user, project, phase_id, session_id)
+        _add_versions(range(4, 13))
+        many = _history_queries(db, query_counter, user, project, phase_id, session_id)
+    finally:
+        db.close()
+
+    assert many == few
+
+
+def test_status_reads_only_the_latest_versions_without_output(database, query_counter):
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        services.initialize_project_workflow(db, project, user.id)
+        for version in (2, 3):
+            services.create_new_session_version(db, project.id, phase_id, session_id, f"remark {version}", user)
+
+        query_counter.clear()
+        status = services.get_project_phase_session_status(db, project.id, user)
+        statements = list(query_counter)
+    finally:
+        db.close()
+
+    session_statuses = {session.session_id: session for phase in status.phases for session in phase.sessions}
+    assert session_statuses[session_id].latest_version == 3
+    assert session_statuses[session_id].remark == "remark 3"
+    assert all(status.latest_version == 1 for key, status in session_statuses.items() if key != session_id)
+    version_reads = [sql for sql in statements if "FROM project_session_versions" in sql]
+    assert len(version_reads) == 1
+    assert "max(" in version_reads[0].lower() and not re.search(r"\.output\b", version_reads[0])
+
+
+def test_output_is_only_loaded_when_requested(database, query_counter):
+    from services.core.minio import MinioService
+    from tests.minio_stub import StubMinioClient
+
+    db = SessionLocal()
+    try:
+        user, project = _create_project(db)
+        phase_id, session_id = _phase_session(project.id)
+        services.initialize_project_workflow(db, project, user.id)
+        row = db.execute(
+            select(ProjectSessionVersion).where(
+                ProjectSessionVersion.project_id == project.id, ProjectSessionVersion.session_id == session_id
+            )
+        ).scalar_one()
+        row.output = '{"document_content": "body"}'
+        db.commit()
+        db.expire_all()
+        minio = MinioService(StubMinioClient())
+
+        query_counter.clear()
+        history = services.get_session_version_history(db, project.id, phase_id, session_id, user, previous_only=False)
+        lean_reads = [sql for sql in query_counter if "FROM project_session_versions" in sql]
+        full = services.get_session_version_history(
+            db, project.id, phase_id, session_id, user, previous_only=False, include_output=True, minio=minio
+        )
+        output = services.get_session_version_output(db, minio, project.id, phase_id, session_id, 1, user)
+    finally:
+        db.close()
+
+    assert history.versions[0].output is None
+    assert not re.search(r"\.output\b", lean_reads[0])
+    assert full.versions[0].output == output.output == '{"document_content": "body"}'
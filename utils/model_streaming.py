@@ -0,0 +1,45 @@
+from typing import Any
+
+from langchain_core.messages import AIMessage, message_chunk_to_message
+from langgraph.config import get_stream_writer
+
+
+DELTA_EVENT_TYPE = "delta"
+
+
+def _estimate_tokens(text: str) -> int:
+    """Same rough estimate the phase nodes use in `count_tokens`."""
+    return len(text.split()) // 4 * 3
+
+
+class StreamingNodeMixin:
+    """Streams `self.model_chain` completions as delta events on the LangGraph custom stream.
+
+    Shared by the phase/session `BaseNode` classes, which provide `model_chain`.
+    """
+
+    model_chain: Any
+
+    def _stream_model_response(self, model_input: Any) -> AIMessage:
+        """Stream the completion, forwarding text deltas on the writer stream, and return the full message."""
+        writer = get_stream_writer()
+        response = None
+        for chunk in self.model_chain.stream(model_input):
+            response = chunk if response is None else response + chunk
+            if isinstance(chunk.content, str) and chunk.content:
+                writer({
+                    "type": DELTA_EVENT_TYPE,
+                    "response": chunk.content
+                })
+
+        response = message_chunk_to_message(response) if response is not None else AIMessage(content="")
+        if not response.usage_metadata:
+            # Not every provider reports usage on streamed chunks.
+            input_tokens = _estimate_tokens(str(model_input))
+            output_tokens = _estimate_tokens(str(response.content))
+            response.usage_metadata = {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            }
+        return response